@@ -0,0 +1,25 @@
+from importlib import import_module
+
+
+def get_lazy_attributes(package_name, package_globals, members):
+	"""
+	makes the __getattr__ and __dir__ of a package (PEP 562) that import the modules behind some of its members
+	only when those members are first used, so that importing the package does not import heavy dependencies
+	:type package_name: str
+	:type package_globals: dict
+	:type members: dict[str, str]
+	:param members: key: name of the member, value: module it comes from, relative to the package
+	:rtype: (callable, callable)
+	"""
+	def __getattr__(name):
+		if name not in members:
+			raise AttributeError(f'module {package_name} has no attribute {name}')
+		value = getattr(import_module(members[name], package_name), name)
+		# later lookups find the member without coming here
+		package_globals[name] = value
+		return value
+
+	def __dir__():
+		return sorted(set(package_globals.keys()) | set(members.keys()))
+
+	return __getattr__, __dir__
@@ -1,5 +1,5 @@
 import colorsys
-from ._colour_schemes import hexadecimal_to_name, name_to_hexadecimal, colour_schemes
+from ._colour_schemes import get_hexadecimal_to_name, get_name_to_hexadecimal, get_colour_schemes
 from ._colourize import colourize
 
 DEFAULT_INCREASE_RATIO = 0.2
@@ -74,7 +74,7 @@ class Colour:
 			max_value = 255.0
 
 		elif name is not None:
-			hexadecimal = name_to_hexadecimal[name.lower()]
+			hexadecimal = get_name_to_hexadecimal()[name.lower()]
 			red, green, blue = self.convert_hexadecimal_to_rgb(hexadecimal=hexadecimal)
 			min_value = 0.0
 			max_value = 255.0
@@ -182,14 +182,14 @@ class Colour:
 		"""
 		:rtype: dict[str,str]
 		"""
-		return hexadecimal_to_name
+		return get_hexadecimal_to_name()
 
 	@staticmethod
 	def _get_hexadecimals():
 		"""
 		:rtype: dict[str, str]
 		"""
-		return name_to_hexadecimal
+		return get_name_to_hexadecimal()
 
 	@classmethod
 	def get_standard_colours(cls):
@@ -203,7 +203,7 @@ class Colour:
 		"""
 		:rtype: dict[str, list[str]]
 		"""
-		return colour_schemes.copy()
+		return get_colour_schemes().copy()
 
 	@staticmethod
 	def convert_hexadecimal_to_rgb(hexadecimal):
@@ -1,4 +1,4 @@
-from ._colour_schemes import colour_schemes
+from ._colour_schemes import get_colour_schemes
 from .Colour import Colour, DEFAULT_INCREASE_RATIO
 
 
@@ -17,7 +17,7 @@ class Scheme:
 		if colours is None and name.lower() in ADDITIONAL_SCHEMES:
 			colours = [Colour(hexadecimal=hex) for hex in ADDITIONAL_SCHEMES[name]]
 		else:
-			colours = colours or [Colour(hexadecimal=hex) for hex in colour_schemes[name.lower()]]
+			colours = colours or [Colour(hexadecimal=hex) for hex in get_colour_schemes()[name.lower()]]
 
 		if normalize_lightness is not None:
 			mean_lightness = sum([colour.lightness for colour in colours]) / len(colours)
@@ -1,5 +1,10 @@
 from .Colour import Colour
 from .Colour import Colour as Color
 from .Scheme import Scheme
-from ._colour_schemes import colour_schemes
 from .Gradient import Gradient
+from .._lazy import get_lazy_attributes
+
+# the colour schemes are read from their data file when they are first used
+__getattr__, __dir__ = get_lazy_attributes(
+	package_name=__name__, package_globals=globals(), members={'colour_schemes': '._colour_schemes'}
+)
@@ -1,30 +1,72 @@
 import pickle
 import os
+from functools import lru_cache
+
 my_path = os.path.abspath(os.path.dirname(__file__))
 data_dir = os.path.join(my_path, '../data_files')
 x11_path = os.path.join(data_dir, 'x11_colours.pickle')
 svg_path = os.path.join(data_dir, 'svg_colours.pickle')
 colour_schemes_path = os.path.join(data_dir, 'colour_schemes.pickle')
 
-with open(file=x11_path, mode='rb') as x11_file:
-	hexadecimal_to_x11 = pickle.load(file=x11_file)
 
-with open(file=svg_path, mode='rb') as svg_file:
-	hexadecimal_to_svg = pickle.load(file=svg_file)
+# the data files are read when they are first needed, not when atlantis.colour is imported
+
+@lru_cache(maxsize=None)
+def _get_names_and_hexadecimals():
+	with open(file=x11_path, mode='rb') as x11_file:
+		hexadecimal_to_x11 = pickle.load(file=x11_file)
+
+	with open(file=svg_path, mode='rb') as svg_file:
+		hexadecimal_to_svg = pickle.load(file=svg_file)
+
+	hexadecimal_to_name = {}
+	name_to_hexadecimal = {}
+	for hexadecimal, name in hexadecimal_to_svg.items():
+		if hexadecimal not in hexadecimal_to_name:
+			hexadecimal_to_name[hexadecimal] = name
+		if name not in name_to_hexadecimal:
+			name_to_hexadecimal[name] = hexadecimal
+
+	for hexadecimal, name in hexadecimal_to_x11.items():
+		if hexadecimal not in hexadecimal_to_name:
+			hexadecimal_to_name[hexadecimal] = name
+		if name not in name_to_hexadecimal:
+			name_to_hexadecimal[name] = hexadecimal
+
+	return hexadecimal_to_name, name_to_hexadecimal
+
+
+def get_hexadecimal_to_name():
+	"""
+	:rtype: dict[str, str]
+	"""
+	return _get_names_and_hexadecimals()[0]
+
+
+def get_name_to_hexadecimal():
+	"""
+	:rtype: dict[str, str]
+	"""
+	return _get_names_and_hexadecimals()[1]
+
+
+@lru_cache(maxsize=None)
+def get_colour_schemes():
+	"""
+	:rtype: dict[str, list[str]]
+	"""
+	with open(file=colour_schemes_path, mode='rb') as colour_schemes_file:
+		return pickle.load(file=colour_schemes_file)
+
 
-hexadecimal_to_name = {}
-name_to_hexadecimal = {}
-for hexadecimal, name in hexadecimal_to_svg.items():
-	if hexadecimal not in hexadecimal_to_name:
-		hexadecimal_to_name[hexadecimal] = name
-	if name not in name_to_hexadecimal:
-		name_to_hexadecimal[name] = hexadecimal
+_LAZY_ATTRIBUTES = {
+	'hexadecimal_to_name': get_hexadecimal_to_name,
+	'name_to_hexadecimal': get_name_to_hexadecimal,
+	'colour_schemes': get_colour_schemes,
+}
 
-for hexadecimal, name in hexadecimal_to_x11.items():
-	if hexadecimal not in hexadecimal_to_name:
-		hexadecimal_to_name[hexadecimal] = name
-	if name not in name_to_hexadecimal:
-		name_to_hexadecimal[name] = hexadecimal
 
-with open(file=colour_schemes_path, mode='rb') as colour_schemes_file:
-	colour_schemes = pickle.load(file=colour_schemes_file)
+def __getattr__(name):
+	if name in _LAZY_ATTRIBUTES:
+		return _LAZY_ATTRIBUTES[name]()
+	raise AttributeError(f'module {__name__} has no attribute {name}')
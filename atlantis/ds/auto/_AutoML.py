@@ -7,11 +7,12 @@ from pandas import DataFrame
 
 
 class AutoML:
-	def __init__(self):
+	def __init__(self, worker_context=None):
 		"""
-
+		:type worker_context: atlantis.multiprocessing.WorkerContext or NoneType
+		:param worker_context: the worker context the processor starts its workers with, the one of the session if None
 		"""
-		self._processor = Processor()
+		self._processor = Processor(worker_context=worker_context)
 		self._estimator_repositories = {}
 
 	@property
@@ -0,0 +1,189 @@
+import numpy as np
+from pandas import DataFrame
+
+
+def _get_rmse(actual, predicted):
+	return np.sqrt(np.mean((predicted - actual) ** 2, axis=-1))
+
+
+def _get_mse(actual, predicted):
+	return np.mean((predicted - actual) ** 2, axis=-1)
+
+
+def _get_mae(actual, predicted):
+	return np.mean(np.abs(predicted - actual), axis=-1)
+
+
+def _get_accuracy(actual, predicted):
+	return np.mean(predicted == actual, axis=-1)
+
+
+# key: name of the metric, value: (function of actual and a matrix of predictions, lowest_is_best)
+VECTORIZED_METRICS = {
+	'rmse': (_get_rmse, True),
+	'mse': (_get_mse, True),
+	'mae': (_get_mae, True),
+	'accuracy': (_get_accuracy, False)
+}
+
+
+class EnsembleSelection:
+	def __init__(self, estimators, counts, score, scores, metric):
+		"""
+		result of select_ensemble
+		:type estimators: list
+		:type counts: list[int]
+		:param counts: the number of times each estimator was picked, its weight is count / sum(counts)
+		:type score: float
+		:type scores: list[float]
+		:param scores: the score of the ensemble after each step
+		:type metric: str
+		"""
+		self._estimators = estimators
+		self._counts = counts
+		self._score = score
+		self._scores = scores
+		self._metric = metric
+
+	def __repr__(self):
+		members = ', '.join(f'{estimator}: {weight:.3f}' for estimator, weight in self.weights.items())
+		return f'EnsembleSelection: {self._metric} = {self._score} ({members})'
+
+	@property
+	def estimators(self):
+		return self._estimators
+
+	@property
+	def counts(self):
+		return self._counts
+
+	@property
+	def weights(self):
+		"""
+		:rtype: dict
+		"""
+		total = sum(self._counts)
+		return {estimator: count / total for estimator, count in zip(self._estimators, self._counts)}
+
+	@property
+	def score(self):
+		return self._score
+
+	@property
+	def scores(self):
+		"""
+		:rtype: list[float]
+		"""
+		return self._scores
+
+	@property
+	def table(self):
+		"""
+		:rtype: DataFrame
+		"""
+		return DataFrame({
+			'estimator': self._estimators, 'count': self._counts, 'weight': list(self.weights.values())
+		}).sort_values('weight', ascending=False).reset_index(drop=True)
+
+
+def select_ensemble(
+		predictions, actual, estimators=None, ensemble_size=20, metric='rmse', lowest_is_best=None,
+		problem_type='regression'
+):
+	"""
+	greedy ensemble selection with replacement (Caruana et al. 2004) from predictions that are already made:
+	at each step the estimator that improves the score of the ensemble the most is added to it,
+	all the candidates of a step are scored at once on the matrix of predictions;
+	the ensemble of the best step is returned so adding estimators never makes it worse
+
+	:type predictions: np.ndarray
+	:param predictions: one row per estimator and one column per row of data, such as out-of-fold predictions
+
+	:type actual: np.ndarray
+	:param actual: the values that are predicted, one per column of predictions
+
+	:type estimators: list or NoneType
+	:param estimators: names of the rows of predictions, their positions if None
+
+	:type ensemble_size: int
+	:param ensemble_size: number of steps, the same estimator can be picked more than once
+
+	:type metric: str or callable
+	:param metric: 	rmse, mse, mae, accuracy, or a function of actual and a matrix of predictions
+					that returns one score per row of the matrix
+
+	:type lowest_is_best: bool or NoneType
+	:param lowest_is_best: it should be provided if metric is a function
+
+	:type problem_type: str
+	:param problem_type: 	regression: predictions of the ensemble are weighted averages,
+							classification: predictions of the ensemble are weighted votes
+
+	:rtype: EnsembleSelection
+	"""
+	if isinstance(metric, str):
+		if metric not in VECTORIZED_METRICS:
+			raise ValueError(f'metric should be one of {list(VECTORIZED_METRICS)} or a function but it is {metric}')
+		metric_name = metric
+		metric, default_lowest_is_best = VECTORIZED_METRICS[metric]
+		lowest_is_best = default_lowest_is_best if lowest_is_best is None else lowest_is_best
+	else:
+		metric_name = getattr(metric, '__name__', 'score')
+		if lowest_is_best is None:
+			raise ValueError('lowest_is_best should be provided for a metric function')
+
+	predictions = np.asarray(predictions)
+	actual = np.asarray(actual)
+	if predictions.ndim != 2 or predictions.shape[1] != len(actual):
+		raise ValueError(f'predictions of shape {predictions.shape} do not match {len(actual)} actual values')
+	num_estimators, num_rows = predictions.shape
+	if estimators is None:
+		estimators = list(range(num_estimators))
+	sign = 1 if lowest_is_best else -1
+
+	is_regression = problem_type.lower().startswith('reg')
+	if is_regression:
+		predictions = predictions.astype(np.float64, copy=False)
+		total = np.zeros(num_rows)
+	else:
+		# votes are counted on the codes of the labels, the label of a code is labels[code]
+		labels, codes = np.unique(np.concatenate([predictions.ravel(), actual]), return_inverse=True)
+		codes = codes[:predictions.size].reshape(predictions.shape)
+		votes = np.zeros((num_rows, len(labels)))
+		rows = np.arange(num_rows)
+
+	counts = np.zeros(num_estimators, dtype=int)
+	scores = []
+	best_score = None
+	best_counts = None
+	for step in range(ensemble_size):
+		if is_regression:
+			candidates = (total + predictions) / (step + 1)
+		else:
+			# a vote changes the winner of a row only if the label it votes for gets more votes than the winner,
+			# ties go to the smallest code as in argmax
+			winners = votes.argmax(axis=1)
+			winner_votes = votes[rows, winners]
+			candidate_votes = votes[rows, codes] + 1
+			wins = (candidate_votes > winner_votes) | ((candidate_votes == winner_votes) & (codes < winners))
+			candidates = labels[np.where(wins, codes, winners)]
+
+		candidate_scores = np.asarray(metric(actual, candidates), dtype=float)
+		chosen = int(np.argmin(sign * candidate_scores))
+		counts[chosen] += 1
+		if is_regression:
+			total += predictions[chosen]
+		else:
+			votes[rows, codes[chosen]] += 1
+
+		score = float(candidate_scores[chosen])
+		scores.append(score)
+		if best_score is None or sign * score < sign * best_score:
+			best_score = score
+			best_counts = counts.copy()
+
+	members = np.flatnonzero(best_counts)
+	return EnsembleSelection(
+		estimators=[estimators[index] for index in members], counts=[int(best_counts[index]) for index in members],
+		score=best_score, scores=scores, metric=metric_name
+	)
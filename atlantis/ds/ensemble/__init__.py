@@ -1,2 +1,3 @@
 from .PrincipalComponentModelFactory import PrincipalComponentModel, PrincipalComponentModelFactory
 from .Ensemble import Ensemble
+from .EnsembleSelection import EnsembleSelection, select_ensemble
@@ -0,0 +1,177 @@
+from multiprocess.managers import BaseManager, Server
+from threading import Thread, Lock, Event
+from uuid import uuid4
+from time import time
+import pickle
+import socket
+import zlib
+
+
+DEFAULT_CHUNK_BYTES = 4 * 2 ** 20
+
+
+class Coordinator:
+	def __init__(self, processor, chunk_bytes=DEFAULT_CHUNK_BYTES, compression_level=1):
+		"""
+		what a processor exposes to remote workers over TCP: its to-do queue, its events queue,
+		the flags that stop workers, and the objects of its namespace;
+		data sets are sent compressed in chunks and each remote host keeps them in a cache, see RemoteDataStore
+		:type processor: atlantis.ds.parallel_computing.Processor
+
+		:type chunk_bytes: int
+		:param chunk_bytes: size of the pieces a compressed data set is sent in
+
+		:type compression_level: int
+		:param compression_level: zlib level, 1 is fast and compresses numeric data well enough
+		"""
+		self._processor = processor
+		self._chunk_bytes = chunk_bytes
+		self._compression_level = compression_level
+		self._payloads = {}  # key: data_id, value: (version, list of compressed chunks)
+		self._lock = Lock()
+
+	def register_worker(self, host):
+		"""
+		:type host: str
+		:rtype: str
+		:return: id of the new worker
+		"""
+		return self._processor._add_remote_worker(host=host)
+
+	def get_to_do(self, timeout):
+		"""
+		:type timeout: float
+		:return: a to-do item, raises queue.Empty if there is none
+		"""
+		return self._processor._to_do.get(timeout=timeout)
+
+	def get_to_do_nowait(self):
+		return self._processor._to_do.get_nowait()
+
+	def put_to_do(self, item):
+		self._processor._to_do.put(item)
+
+	def put_event(self, event):
+		"""
+		:type event: tuple
+		:param event: (event, worker_id, value), see worker
+		"""
+		self._processor._events.put(event)
+
+	def should_proceed(self, worker_id):
+		self.heartbeat(worker_id=worker_id)
+		return self._processor._proceed_worker[worker_id]
+
+	def heartbeat(self, worker_id):
+		"""
+		a remote worker that is not heard from for heartbeat_timeout seconds is taken for dead, see Processor.serve;
+		a worker that is no longer registered, e.g. after it was taken for dead, stays so until it ends
+		"""
+		last_seen = self._processor._remote_last_seen
+		if worker_id in last_seen:
+			last_seen[worker_id] = time()
+
+	def has_obj(self, obj_type, obj_id):
+		return self._processor.namespace.has(obj_type=obj_type, obj_id=obj_id)
+
+	def get_obj(self, obj_type, obj_id):
+		return self._processor.get_obj(obj_type=obj_type, obj_id=obj_id)
+
+	def _get_payload(self, data_id):
+		with self._lock:
+			if data_id not in self._payloads:
+				data = self._processor.get_data(data_id=data_id)
+				payload = zlib.compress(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL), self._compression_level)
+				chunks = [
+					payload[start:start + self._chunk_bytes] for start in range(0, len(payload), self._chunk_bytes)
+				]
+				self._payloads[data_id] = uuid4().hex, chunks
+			return self._payloads[data_id]
+
+	def get_data_info(self, data_id):
+		"""
+		:rtype: (str, int)
+		:return: version of the data set, it changes when the data set is replaced, and the number of chunks
+		"""
+		version, chunks = self._get_payload(data_id=data_id)
+		return version, len(chunks)
+
+	def get_data_chunk(self, data_id, version, chunk_number):
+		"""
+		:rtype: bytes
+		"""
+		current_version, chunks = self._get_payload(data_id=data_id)
+		if current_version != version:
+			raise RuntimeError(f'data {data_id} changed while it was being sent')
+		return chunks[chunk_number]
+
+	def invalidate(self, obj_type, obj_id):
+		"""
+		forgets the compressed copy of a data set that is replaced
+		"""
+		if obj_type == 'data':
+			with self._lock:
+				self._payloads.pop(obj_id, None)
+
+
+class CoordinatorClient(BaseManager):
+	"""
+	connects a remote worker to the coordinator of a processor
+	"""
+	pass
+
+
+CoordinatorClient.register('get_coordinator')
+
+
+class CoordinatorServer(Server):
+	"""
+	the server of a coordinator, it runs in threads of the processor instead of blocking it like serve_forever
+	"""
+	def start(self):
+		# serve_client of every connection runs until stop_event is set
+		self.stop_event = Event()
+		self._closed = False
+		Thread(target=self._accept, daemon=True).start()
+
+	def _accept(self):
+		while not self._closed:
+			try:
+				connection = self.listener.accept()
+			except OSError:
+				# the listener is closed, or a client failed to authenticate
+				continue
+			if self._closed:
+				connection.close()
+				break
+			Thread(target=self.handle_request, args=(connection, ), daemon=True).start()
+
+	def close(self):
+		"""
+		stops accepting workers, the ones that are connected keep their connections until they end
+		"""
+		self._closed = True
+		# accept does not return when the listener is closed from another thread, a connection wakes it up
+		host, port = self.address
+		try:
+			socket.create_connection(('127.0.0.1' if host == '0.0.0.0' else host, port), timeout=1).close()
+		except OSError:
+			pass
+		self.listener.close()
+
+
+def start_coordinator_server(coordinator, address, authkey):
+	"""
+	serves the coordinator from threads of the current process so that it reaches the queues of the processor directly
+	:type coordinator: Coordinator
+	:type address: (str, int)
+	:type authkey: bytes
+	:rtype: CoordinatorServer
+	:return: the server, its address has the port if port 0 was asked for
+	"""
+	# typeid: (callable, exposed, method_to_typeid, proxytype) like the registry of a BaseManager,
+	# the public methods of the coordinator are exposed
+	registry = {'get_coordinator': (lambda: coordinator, None, None, None)}
+	server = CoordinatorServer(registry=registry, address=address, authkey=authkey, serializer='pickle')
+	server.start()
+	return server
@@ -1,27 +1,60 @@
 from pandas import DataFrame
+from numpy import random
+import numpy as np
+from math import ceil
+import hashlib
 
 
 class DataSlice:
 	def __init__(self, data_id, indices, columns=None):
 		self._data_id = data_id
 		self._columns = columns
-		self._indices = indices
+		# numpy indices are smaller to send to workers than lists and cheap to fingerprint
+		self._indices = None if indices is None else np.asarray(indices)
 
 	@property
 	def data_id(self):
 		return self._data_id
 
-	def get_data(self, data):
+	@property
+	def fingerprint(self):
+		"""
+		changes when the indices or columns change, it is cheaper than slicing the data
+		and stays the same across processes and runs
+		:rtype: str
+		"""
+		hash_maker = hashlib.sha256()
+		if self._indices is None:
+			hash_maker.update(b'all rows')
+		else:
+			hash_maker.update(self._indices.dtype.str.encode())
+			hash_maker.update(self._indices.tobytes())
+		hash_maker.update(repr(self._columns).encode())
+		return hash_maker.hexdigest()
+
+	def get_data(self, data, fraction=None, random_state=0):
 		"""
 		:type data: DataFrame
+
+		:type fraction: float or NoneType
+		:param fraction: 	if provided, only this fraction of the rows is returned, the rows are taken from
+							the same shuffled order so the rows of a smaller fraction are among those of a larger one
+
+		:type random_state: int
 		:rtype: DataFrame
 		"""
 		if self._columns is not None:
 			data = data[self._columns]
 		if self._indices is not None:
-			return data.iloc[self._indices]
-		else:
-			return data
+			data = data.iloc[self._indices]
+
+		if fraction is not None and fraction < 1:
+			num_rows = max(ceil(data.shape[0] * fraction), 1)
+			positions = random.RandomState(random_state).permutation(data.shape[0])[:num_rows]
+			positions.sort()
+			data = data.iloc[positions]
+
+		return data
 
 
 class TrainingTestSlice:
@@ -33,8 +66,15 @@ class TrainingTestSlice:
 	def data_id(self):
 		return self._training_slice.data_id
 
-	def get_training_data(self, data):
-		return self._training_slice.get_data(data=data)
+	@property
+	def fingerprint(self):
+		"""
+		:rtype: (str, str)
+		"""
+		return self._training_slice.fingerprint, self._test_slice.fingerprint
+
+	def get_training_data(self, data, fraction=None):
+		return self._training_slice.get_data(data=data, fraction=fraction)
 
 	def get_test_data(self, data):
 		return self._test_slice.get_data(data=data)
\ No newline at end of file
@@ -0,0 +1,278 @@
+from pandas import DataFrame, RangeIndex, Index
+import numpy as np
+from threading import Lock
+
+try:
+	from multiprocess import shared_memory
+	from multiprocess import resource_tracker
+except ImportError:
+	shared_memory = None
+	resource_tracker = None
+
+
+# dtype kinds that can be kept as a flat numpy buffer: bool, int, uint, float, complex, timedelta, datetime
+SHAREABLE_KINDS = 'biufcmM'
+
+# each process keeps the frames it has attached to, so a worker attaches to a data set only once
+_ATTACHED_FRAMES = {}
+_TRACKER_LOCK = Lock()
+
+
+def _is_shareable(array_like):
+	dtype = getattr(array_like, 'dtype', None)
+	return isinstance(dtype, np.dtype) and dtype.kind in SHAREABLE_KINDS
+
+
+def _attach_to_block(name):
+	"""
+	attaches to an existing block without registering it with the resource tracker of this process,
+	otherwise a worker could unlink the block on exit; only the process that created the block unlinks it
+	:type name: str
+	:rtype: shared_memory.SharedMemory
+	"""
+	try:
+		return shared_memory.SharedMemory(name=name, track=False)
+	except TypeError:
+		# python < 3.13 has no track argument
+		with _TRACKER_LOCK:
+			register = resource_tracker.register
+			resource_tracker.register = lambda *args, **kwargs: None
+			try:
+				return shared_memory.SharedMemory(name=name)
+			finally:
+				resource_tracker.register = register
+
+
+class SharedArray:
+	def __init__(self, shared_memory_name, dtype, length):
+		"""
+		describes a one dimensional numpy array that lives in a shared memory block
+		:type shared_memory_name: str
+		:type dtype: str
+		:type length: int
+		"""
+		self._shared_memory_name = shared_memory_name
+		self._dtype = dtype
+		self._length = length
+
+	@property
+	def shared_memory_name(self):
+		return self._shared_memory_name
+
+	@classmethod
+	def create(cls, array):
+		"""
+		copies the array into a new shared memory block
+		:type array: np.ndarray
+		:rtype: (SharedArray, shared_memory.SharedMemory)
+		"""
+		array = np.ascontiguousarray(array)
+		block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+		view = np.ndarray(shape=array.shape, dtype=array.dtype, buffer=block.buf)
+		view[:] = array
+		return cls(shared_memory_name=block.name, dtype=array.dtype.str, length=len(array)), block
+
+	def attach(self):
+		"""
+		:rtype: (np.ndarray, shared_memory.SharedMemory)
+		"""
+		block = _attach_to_block(name=self.shared_memory_name)
+		array = np.ndarray(shape=(self._length,), dtype=np.dtype(self._dtype), buffer=block.buf)
+		array.flags.writeable = False
+		return array, block
+
+
+class SharedFrame:
+	def __init__(self, columns, shared_columns, other_columns, index):
+		"""
+		describes a DataFrame whose numeric columns live in shared memory, it is small enough to be pickled
+		:type columns: list
+		:type shared_columns: dict[str, SharedArray]
+		:type other_columns: DataFrame or NoneType
+		:type index: Index or SharedArray
+		"""
+		self._columns = columns
+		self._shared_columns = shared_columns
+		self._other_columns = other_columns
+		self._index = index
+
+	@property
+	def key(self):
+		"""
+		identifies the shared memory blocks behind this frame, it changes when data is overwritten
+		:rtype: tuple
+		"""
+		names = [array.shared_memory_name for array in self._shared_columns.values()]
+		if isinstance(self._index, SharedArray):
+			names.append(self._index.shared_memory_name)
+		return tuple(names)
+
+	@classmethod
+	def create(cls, data):
+		"""
+		:type data: DataFrame
+		:rtype: (SharedFrame, list[shared_memory.SharedMemory])
+		"""
+		blocks = []
+		shared_columns = {}
+		other_column_names = []
+		for column in data.columns:
+			if _is_shareable(data[column]):
+				shared_array, block = SharedArray.create(array=data[column].to_numpy())
+				shared_columns[column] = shared_array
+				blocks.append(block)
+			else:
+				other_column_names.append(column)
+
+		if len(other_column_names) > 0:
+			other_columns = data[other_column_names].copy()
+		else:
+			other_columns = None
+
+		if isinstance(data.index, RangeIndex) or not _is_shareable(data.index):
+			index = data.index
+		else:
+			index, block = SharedArray.create(array=data.index.to_numpy())
+			blocks.append(block)
+
+		shared_frame = cls(
+			columns=list(data.columns), shared_columns=shared_columns, other_columns=other_columns, index=index
+		)
+		return shared_frame, blocks
+
+	def attach(self):
+		"""
+		builds a DataFrame on top of the shared memory blocks without copying them
+		:rtype: (DataFrame, list[shared_memory.SharedMemory])
+		"""
+		blocks = []
+		arrays = {}
+		for column, shared_array in self._shared_columns.items():
+			array, block = shared_array.attach()
+			arrays[column] = array
+			blocks.append(block)
+
+		if isinstance(self._index, SharedArray):
+			index_array, block = self._index.attach()
+			index = Index(index_array, copy=False)
+			blocks.append(block)
+		else:
+			index = self._index
+
+		dictionary = {
+			column: arrays[column] if column in arrays else self._other_columns[column].array
+			for column in self._columns
+		}
+		data = DataFrame(dictionary, index=index, columns=self._columns, copy=False)
+		return data, blocks
+
+
+class DataStore:
+	def __init__(self, namespace, use_shared_memory=True):
+		"""
+		keeps objects on a manager namespace but puts the numeric columns of DataFrames in shared memory
+		so that workers can read them without copying the data out of the manager process
+		:type namespace: multiprocess.managers.Namespace
+		:type use_shared_memory: bool
+		"""
+		self._namespace = namespace
+		self._use_shared_memory = use_shared_memory and shared_memory is not None
+		self._blocks = {}
+
+	def __getstate__(self):
+		# the shared memory blocks are owned by the process that created the store and are not sent to workers
+		return {'_namespace': self._namespace, '_use_shared_memory': self._use_shared_memory, '_blocks': {}}
+
+	@property
+	def namespace(self):
+		return self._namespace
+
+	def has(self, obj_type, obj_id):
+		return hasattr(self._namespace, f'{obj_type}_{obj_id}')
+
+	def has_data(self, data_id):
+		return self.has(obj_type='data', obj_id=data_id)
+
+	def add_obj(self, obj_type, obj_id, obj, overwrite=False):
+		if self.has(obj_type=obj_type, obj_id=obj_id):
+			if not overwrite:
+				raise ValueError(f'{obj_type} {obj_id} already exists in the namespace')
+
+		if obj_type == 'data' and isinstance(obj, DataFrame) and self._use_shared_memory and obj.columns.is_unique:
+			shared_frame, blocks = SharedFrame.create(data=obj)
+			setattr(self._namespace, f'{obj_type}_{obj_id}', shared_frame)
+			self._release(data_id=obj_id)
+			self._blocks[obj_id] = blocks
+		else:
+			setattr(self._namespace, f'{obj_type}_{obj_id}', obj)
+
+	def remove_obj(self, obj_type, obj_id):
+		"""
+		takes an object out of the namespace, the shared memory of a data set is freed
+		"""
+		if self.has(obj_type=obj_type, obj_id=obj_id):
+			delattr(self._namespace, f'{obj_type}_{obj_id}')
+		if obj_type == 'data':
+			self._release(data_id=obj_id)
+
+	def add_data(self, data_id, data, overwrite=False):
+		self.add_obj(obj_type='data', obj_id=data_id, obj=data, overwrite=overwrite)
+
+	def get_obj(self, obj_type, obj_id):
+		obj = getattr(self._namespace, f'{obj_type}_{obj_id}')
+		if isinstance(obj, SharedFrame):
+			return self._attach(data_id=obj_id, shared_frame=obj)
+		return obj
+
+	def get_data(self, data_id):
+		"""
+		:rtype: DataFrame
+		"""
+		return self.get_obj(obj_type='data', obj_id=data_id)
+
+	@staticmethod
+	def _attach(data_id, shared_frame):
+		"""
+		:type shared_frame: SharedFrame
+		:rtype: DataFrame
+		"""
+		if data_id in _ATTACHED_FRAMES:
+			key, data, blocks = _ATTACHED_FRAMES[data_id]
+			if key == shared_frame.key:
+				return data
+			del _ATTACHED_FRAMES[data_id]
+			_close_blocks(blocks=blocks)
+
+		data, blocks = shared_frame.attach()
+		_ATTACHED_FRAMES[data_id] = shared_frame.key, data, blocks
+		return data
+
+	def _release(self, data_id):
+		if data_id in self._blocks:
+			blocks = self._blocks.pop(data_id)
+			_close_blocks(blocks=blocks, unlink=True)
+
+	def close(self):
+		"""
+		frees all the shared memory blocks created by this store
+		"""
+		for data_id in list(self._blocks.keys()):
+			self._release(data_id=data_id)
+
+
+def _close_blocks(blocks, unlink=False):
+	"""
+	:type blocks: list[shared_memory.SharedMemory]
+	:type unlink: bool
+	"""
+	for block in blocks:
+		try:
+			block.close()
+		except BufferError:
+			# a DataFrame built on the block is still referenced, the mapping goes away with it
+			pass
+		if unlink:
+			try:
+				block.unlink()
+			except FileNotFoundError:
+				pass
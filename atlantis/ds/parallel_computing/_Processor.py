@@ -1,56 +1,180 @@
-import multiprocess
-from pandas import DataFrame
-from time import sleep
-
-from ...time import get_elapsed, get_now
+import asyncio
+import heapq
+import threading
+import secrets
+import socket
+from collections import OrderedDict, deque, Counter
+from pandas import DataFrame, concat
+from time import sleep, time, monotonic
+from datetime import datetime, timedelta
+
+from ...time import get_elapsed, get_now, convert
 from ...time.progress import ProgressBar
 
 import atexit
 
 from ._worker import worker
+from ...multiprocessing._WorkerContext import get_worker_context
 from ._TimeEstimate import MissingTimeEstimate
 from .learning import LearningProject
 from .learning import CrossValidationProject
-from ._get_data_from_namespace import get_data_from_namespace, get_obj_from_namespace
-from ._get_data_from_namespace import add_obj_to_namespace
+from ._DataStore import DataStore
+from ._Trace import Trace, PROCESSOR_THREAD
+from ._memory import recommend_worker_count
+from ._ResultStore import ResultStore
+from ._Coordinator import Coordinator, start_coordinator_server
+from ...multiprocessing._CpuSlots import get_cpu_slots
 
 
 class Processor:
-	def __init__(self, time_unit='ms'):
+	def __init__(
+			self, time_unit='ms', task_timeout=None, max_crashes=3, crash_backoff=1, worker_context=None,
+			result_store=None, speculation_factor=None, queue_depth=None, cpu_slots=None
+	):
+		"""
+		:type time_unit: str
+
+		:type task_timeout: float or NoneType
+		:param task_timeout: 	wall-clock limit of every task in seconds, a worker that runs a task for longer
+								is killed and replaced and the task is marked as timeout, see set_timeout
+
+		:type max_crashes: int
+		:param max_crashes: 	a task that was being done by a worker that died is put back in the to-do queue,
+								after crashing this many workers it is quarantined as an error
+
+		:type crash_backoff: float
+		:param crash_backoff: 	seconds before a task that crashed a worker is put back in the to-do queue,
+								it doubles with every crash of the same task
+
+		:type worker_context: atlantis.multiprocessing.WorkerContext or NoneType
+		:param worker_context: 	workers are started with its context and its manager is shared,
+								the worker context of the session if None, see atlantis.multiprocessing.get_worker_context
+
+		:type result_store: ResultStore or str or NoneType
+		:param result_store: 	a ResultStore or the directory of one, processed tasks are written to it
+								instead of being kept in memory, task_table and the scoreboards read them back
+
+		:type speculation_factor: float or NoneType
+		:param speculation_factor: 	when the to-do queue is empty and workers are idle, a task that has been running
+									for longer than this many times its time estimate is sent again to an idle worker,
+									the copy that finishes first is kept and the worker doing the other one is killed;
+									None turns speculation off
+
+		:type queue_depth: int or NoneType
+		:param queue_depth: 	tasks are put in the to-do queue of the workers by deficit round-robin over the projects,
+								see set_project_weight; if None all the tasks that are sent are put in the queue at once,
+								interleaved, otherwise the queue holds at most this many tasks and the rest wait
+								in the processor so that the tasks of a project sent later do not queue behind
+								the ones sent before, they are released whenever workers are supervised
+
+		:type cpu_slots: atlantis.multiprocessing.CpuSlots or NoneType
+		:param cpu_slots: 	a worker takes the slots of a task, one per n_jobs of its estimator, before doing it
+							and limits its threads to their cpus, so that workers do not run more threads than cpus;
+							the slots of the session, shared with process controllers, are used if None
+		"""
 		self._processes = {}
-		self._manager = multiprocess.Manager()
+		self._worker_context = (worker_context or get_worker_context()).attach(owner=self)
+		self._cpu_slots = cpu_slots or get_cpu_slots()
+		self._manager = self._worker_context.manager
 		self._namespace = self._manager.Namespace()
+		self._data_store = DataStore(namespace=self._namespace)
 		self._namespace_dir = set()
 		self._estimators = {}
 
-		self._to_do = self._manager.list()
-		self._doing = self._manager.dict()
-		self._done = self._manager.list()
-		self._processed = []
+		self._to_do = self._worker_context.context.Queue()
+		# workers write their events straight to the pipe so that an event is not lost if the worker dies right after,
+		# a thread of the processor reads the pipe into a buffer so that workers never wait for the processor
+		self._events = self._worker_context.context.SimpleQueue()
+		self._received_events = deque()
+		self._event_lock = threading.Lock()
+		# futures of submit are resolved in the thread of their event loop, the event reader only wakes the loop up
+		self._futures = {}  # key: task_id, value: asyncio.Future
+		self._loop = None
+		self._wake_up_scheduled = False
+		self._event_reader = threading.Thread(target=self._read_events, daemon=True)
+		self._event_reader.start()
+		self._pending = OrderedDict()  # tasks sent to workers that are not done yet
+		self._doing = {}
+		self._done = deque()
+		self._processed = []  # empty if there is a result store
+		self._processed_count = 0
+		if isinstance(result_store, str):
+			result_store = ResultStore(path=result_store)
+		self._result_store = result_store
 		self._errors = []
 		self._proceed_worker = self._manager.dict()
-		self._worker_status = self._manager.dict()
+		self._worker_status = {}
 		self._projects = {}
 
+		# running totals so that progress does not need to go through the tasks
+		self._worker_status_counts = Counter()
+		self._pending_time_estimate_counts = Counter()  # key: (project_name, time_estimate_id)
+		self._done_time = 0
+
+		# supervision of workers
+		self._task_timeout = task_timeout
+		self._timeouts = {}  # key: estimator name, value: seconds
+		self._worker_settings = {}  # key: worker_id, value: arguments of add_worker to replace the worker
+		self._started = {}  # key: worker_id, value: (task_id, time.time() when the worker started the task)
+		self._replaced_by = {}  # key: worker_id of a worker that is gone, value: worker_id of the new worker
+		self._max_crashes = max_crashes
+		self._crash_backoff = crash_backoff
+		self._crash_counts = Counter()  # key: task_id
+		self._delayed = []  # heap of (time.time() to requeue, sequence, task_id) of tasks that crashed a worker
+		self._delayed_counter = 0
+		self._speculation_factor = speculation_factor
+		self._speculated = set()  # ids of tasks that have been sent twice
+
+		# fair share of the workers between projects, see _dispatch
+		self._queue_depth = queue_depth
+		self._backlogs = OrderedDict()  # key: project_name, value: deque of tasks waiting to be put in the to-do queue
+		self._project_weights = {}
+		self._deficits = Counter()  # key: project_name, value: estimated seconds the project can still put in the queue
+		self._served_this_round = set()
+
+		# timeline of the tasks, see Trace
+		self._trace = Trace()
+		self._sent_times = {}  # key: task_id, value: time.monotonic() when the task was put in the to-do queue
+
+		# remote workers, see serve
+		self._coordinator = None
+		self._coordinator_server = None
+		self._authkey = None
+		self._remote_workers = {}  # key: worker_id, value: host
+		self._remote_last_seen = {}  # key: worker_id, value: time.time() of the last heartbeat of a remote worker
+		self._heartbeat_timeout = None
+
 		self._tasks_by_id = {}
 		self._time_unit = time_unit
 		self._worker_id_counter = 0
+		self._worker_id_lock = threading.Lock()
 		atexit.register(self.terminate)
+		atexit.register(self._data_store.close)
 
 		self._last_error_task = None
 
 	def __repr__(self):
 		lines = [
 			'Processor',
-			f'to-do: {len(self._to_do)}',
+			f'to-do: {self.count_to_do()}',
 			f'doing: {len(self._doing)}',
 			f'done: {len(self._done)}'
 		]
 		return '\n'.join(lines)
 
+	@property
+	def result_store(self):
+		"""
+		:rtype: ResultStore or NoneType
+		"""
+		return self._result_store
+
 	@property
 	def namespace(self):
-		return self._namespace
+		"""
+		:rtype: DataStore
+		"""
+		return self._data_store
 
 	def add_data(self, data_id, data, overwrite=False):
 		"""
@@ -63,10 +187,16 @@ class Processor:
 		self.add_obj(obj_type='shape', obj_id=data_id, obj=data.shape, overwrite=True)
 
 	def add_obj(self, obj_type, obj_id, obj, overwrite=False):
-		add_obj_to_namespace(
-			namespace=self.namespace, obj_type=obj_type, obj_id=obj_id, obj=obj, overwrite=overwrite
-		)
+		self._data_store.add_obj(obj_type=obj_type, obj_id=obj_id, obj=obj, overwrite=overwrite)
 		self._namespace_dir.add(f'{obj_type}_{obj_id}')
+		if self._coordinator is not None:
+			self._coordinator.invalidate(obj_type=obj_type, obj_id=obj_id)
+
+	def remove_obj(self, obj_type, obj_id):
+		self._data_store.remove_obj(obj_type=obj_type, obj_id=obj_id)
+		self._namespace_dir.discard(f'{obj_type}_{obj_id}')
+		if self._coordinator is not None:
+			self._coordinator.invalidate(obj_type=obj_type, obj_id=obj_id)
 
 	@property
 	def obj_directory(self):
@@ -78,32 +208,124 @@ class Processor:
 		:type data_slice_id: int or str
 		:rtype: DataFrame
 		"""
-		return get_data_from_namespace(namespace=self.namespace, data_id=data_id, data_slice_id=data_slice_id)
+		return self._data_store.get_data(data_id=data_id)
 
 	def get_obj(self, obj_type, obj_id):
 		"""
 		:type obj_id: str
 		:rtype: object
 		"""
-		return get_obj_from_namespace(namespace=self.namespace, obj_type=obj_type, obj_id=obj_id)
+		return self._data_store.get_obj(obj_type=obj_type, obj_id=obj_id)
 
 	def get_data_columns(self, data_id):
 		"""
 		:type data_id: int or str
 		:rtype: list
 		"""
-		return getattr(self._namespace, f'columns_{data_id}')
+		return self._data_store.get_obj(obj_type='columns', obj_id=data_id)
 
 	def get_data_shape(self, data_id):
 		"""
 		:type data_id: int or str
 		:rtype: tuple
 		"""
-		return getattr(self._namespace, f'shape_{data_id}')
+		return self._data_store.get_obj(obj_type='shape', obj_id=data_id)
 
 	def generate_worker_id(self):
-		self._worker_id_counter += 1
-		return f'worker_{self._worker_id_counter}'
+		# remote workers get their ids from the thread that serves them
+		with self._worker_id_lock:
+			self._worker_id_counter += 1
+			return f'worker_{self._worker_id_counter}'
+
+	def serve(
+			self, host='0.0.0.0', port=0, authkey=None, chunk_bytes=None, compression_level=1, heartbeat_timeout=30,
+			echo=True
+	):
+		"""
+		lets workers on other hosts join: the processor listens on a TCP port and remote workers started with
+		atlantis-worker --connect host:port --authkey key take tasks from the same to-do queue as the local workers;
+		remote workers are stopped with the local ones but they are not replaced if they crash, and as their processes
+		cannot be killed, a remote worker that is on a task for longer than its time limit is stopped and taken for lost
+
+		:type host: str
+		:param host: the interface to listen on, all of them by default
+
+		:type port: int
+		:param port: a free port is picked if 0
+
+		:type authkey: str or NoneType
+		:param authkey: the workers need it to connect, a random one is made if None
+
+		:type chunk_bytes: int or NoneType
+		:param chunk_bytes: data sets are sent to the hosts compressed in pieces of this size, see Coordinator
+
+		:type compression_level: int
+
+		:type heartbeat_timeout: float or NoneType
+		:param heartbeat_timeout: 	a remote worker that has not sent a heartbeat for this many seconds, e.g. because
+									its host went down, is taken for crashed and its tasks go back to the to-do queue,
+									see atlantis-worker --heartbeat-interval; None waits for remote workers forever
+
+		:type echo: bool
+		:rtype: (str, int)
+		:return: the address the workers should connect to
+		"""
+		if self._coordinator_server is not None:
+			raise RuntimeError(f'the processor is already serving on {self.remote_address}')
+		if authkey is None:
+			authkey = secrets.token_hex(16)
+		coordinator_kwargs = {'compression_level': compression_level}
+		if chunk_bytes is not None:
+			coordinator_kwargs['chunk_bytes'] = chunk_bytes
+		self._coordinator = Coordinator(processor=self, **coordinator_kwargs)
+		self._coordinator_server = start_coordinator_server(
+			coordinator=self._coordinator, address=(host, port), authkey=authkey.encode()
+		)
+		self._authkey = authkey
+		self._heartbeat_timeout = heartbeat_timeout
+		if echo:
+			remote_host, remote_port = self.remote_address
+			print(
+				f'remote workers can connect with: '
+				f'atlantis-worker --connect {remote_host}:{remote_port} --authkey {authkey}'
+			)
+		return self.remote_address
+
+	@property
+	def remote_address(self):
+		"""
+		:rtype: (str, int) or NoneType
+		"""
+		if self._coordinator_server is None:
+			return None
+		host, port = self._coordinator_server.address
+		if host == '0.0.0.0':
+			host = socket.gethostname()
+		return host, port
+
+	@property
+	def authkey(self):
+		return self._authkey
+
+	@property
+	def remote_workers(self):
+		"""
+		:rtype: dict[str, str]
+		:return: key: worker_id, value: host
+		"""
+		return self._remote_workers
+
+	def _add_remote_worker(self, host):
+		"""
+		called by the coordinator when a remote worker connects
+		:type host: str
+		:rtype: str
+		"""
+		worker_id = self.generate_worker_id()
+		self._remote_workers[worker_id] = host
+		self._remote_last_seen[worker_id] = time()
+		self._proceed_worker[worker_id] = True
+		return worker_id
 
 	@property
 	def projects(self):
@@ -121,39 +343,150 @@ class Processor:
 		self._projects[project.name] = project
 		project._processor = self
 
-	def add_worker(self):
+	def set_project_weight(self, project_name, weight):
 		"""
+		projects share the workers in proportion to their weights in estimated CPU time, all weights are 1 by default
+		:type project_name: str
+		:type weight: float
+		"""
+		if project_name not in self._projects:
+			raise KeyError(f'project {project_name} does not exist')
+		if weight <= 0:
+			raise ValueError(f'weight should be positive but it is {weight}')
+		self._project_weights[project_name] = weight
+
+	def get_project_weight(self, project_name):
+		"""
+		:rtype: float
+		"""
+		return self._project_weights.get(project_name, 1)
+
+	def add_worker(
+			self, prefetch=1, fold_cache_bytes=None, max_tasks_per_worker=None, max_rss_bytes=None,
+			measure_memory=False, top_allocations=0
+	):
+		"""
+		:type prefetch: int
+		:param prefetch: number of tasks the worker takes from the to-do queue at once
+
+		:type fold_cache_bytes: int or NoneType
+		:param fold_cache_bytes: byte budget of the cache of prepared training-test arrays of the worker
+
+		:type max_tasks_per_worker: int or NoneType
+		:param max_tasks_per_worker: the worker is recycled after doing this many tasks
+
+		:type max_rss_bytes: int or NoneType
+		:param max_rss_bytes: the worker is recycled after a task if its resident memory is larger than this
+
+		:type measure_memory: bool
+		:param measure_memory: if True, the worker measures its memory during each task, see memory_summary
+
+		:type top_allocations: int
+		:param top_allocations: number of lines with the largest python allocations the worker reports per task
+
 		:rtype: multiprocess.Process
 		"""
 		worker_id = self.generate_worker_id()
-		process = multiprocess.Process(
+		self._worker_settings[worker_id] = {
+			'prefetch': prefetch, 'fold_cache_bytes': fold_cache_bytes,
+			'max_tasks_per_worker': max_tasks_per_worker, 'max_rss_bytes': max_rss_bytes,
+			'measure_memory': measure_memory, 'top_allocations': top_allocations
+		}
+		process = self._worker_context.Process(
 			target=worker,
 			kwargs={
 				'worker_id': worker_id,
-				'namespace': self._namespace,
+				'namespace': self._data_store,
 				'to_do': self._to_do,
-				'doing': self._doing,
-				'done': self._done,
+				'events': self._events,
 				'proceed': self._proceed_worker,
-				'status': self._worker_status
+				'prefetch': prefetch,
+				'fold_cache_bytes': fold_cache_bytes,
+				'max_tasks': max_tasks_per_worker,
+				'max_rss_bytes': max_rss_bytes,
+				'measure_memory': measure_memory,
+				'top_allocations': top_allocations,
+				'cpu_slots': self._cpu_slots
 			}
 		)
 		self._processes[worker_id] = process
+		self._proceed_worker[worker_id] = True
 		process.start()
 		return process
 
-	def add_workers(self, num_workers):
+	def add_workers(
+			self, num_workers, prefetch=1, fold_cache_bytes=None, max_tasks_per_worker=None, max_rss_bytes=None,
+			measure_memory=False, top_allocations=0
+	):
 		"""
 		:type num_workers: int
+
+		:type prefetch: int
+		:param prefetch: 	number of tasks each worker takes from the to-do queue at once,
+							larger numbers help with many short tasks
+
+		:type fold_cache_bytes: int or NoneType
+		:param fold_cache_bytes: 	byte budget of the cache of each worker that keeps the prepared numpy arrays
+									of training-test slices so estimators on the same slice share them
+
+		:type max_tasks_per_worker: int or NoneType
+		:param max_tasks_per_worker: 	each worker ends after doing this many tasks and is replaced by a new one,
+										this gives back the memory that leaks in long runs
+
+		:type max_rss_bytes: int or NoneType
+		:param max_rss_bytes: 	each worker ends after a task if its resident memory is larger than this
+								and is replaced by a new one
+
+		:type measure_memory: bool
+		:param measure_memory: 	if True, each worker measures its resident memory before and after each task
+								and its peak during the task, they go to task_table and memory_summary
+
+		:type top_allocations: int
+		:param top_allocations: 	if larger than 0, python allocations are traced and the lines that allocated
+									the most are kept in task.memory['top_allocations'], tracing slows the tasks down
 		"""
 		self.process_done_tasks()
 		for i in range(num_workers):
-			self.add_worker()
+			self.add_worker(
+				prefetch=prefetch, fold_cache_bytes=fold_cache_bytes,
+				max_tasks_per_worker=max_tasks_per_worker, max_rss_bytes=max_rss_bytes,
+				measure_memory=measure_memory, top_allocations=top_allocations
+			)
+
+	def set_timeout(self, timeout, estimator_class=None):
+		"""
+		sets the wall-clock limit of tasks in seconds, for all tasks or for the tasks of one estimator class;
+		the limit of a task is task.timeout if it is set, otherwise the limit of its estimator class,
+		otherwise the limit for all tasks
+		:type timeout: float or NoneType
+		:type estimator_class: type or str or NoneType
+		"""
+		if estimator_class is None:
+			self._task_timeout = timeout
+		else:
+			estimator_name = estimator_class if isinstance(estimator_class, str) else estimator_class.__name__
+			if timeout is None:
+				self._timeouts.pop(estimator_name, None)
+			else:
+				self._timeouts[estimator_name] = timeout
+
+	def _get_timeout(self, task):
+		"""
+		:rtype: float or NoneType
+		"""
+		if task.timeout is not None:
+			return task.timeout
+		estimator_name = getattr(task, 'estimator_name', None)
+		if estimator_name in self._timeouts:
+			return self._timeouts[estimator_name]
+		return self._task_timeout
 
 	def create_cross_validation_project(
 			self, name, y_column, problem_type, x_columns=None, time_unit='ms',
 			evaluation_function=None, main_metric=None, lowest_is_best=None, best_score=None,
-			scoreboard=None
+			scoreboard=None, group_estimator_families=False, result_cache=None,
+			successive_halving=False, min_training_fraction=1 / 9, halving_factor=3,
+			keep_out_of_fold_predictions=False, weight=1
 	):
 		"""
 
@@ -183,14 +516,37 @@ class Processor:
 		:type 	scoreboard: Scoreboard
 		:param 	scoreboard: a Scoreboard object that keeps score of all estimators, can be added later too
 
+		:type 	group_estimator_families: bool
+		:param 	group_estimator_families: see LearningProject
+
+		:type 	result_cache: ResultCache or str or NoneType
+		:param 	result_cache: a ResultCache or the path of its SQLite file, see LearningProject
+
+		:type 	successive_halving: bool
+		:param 	successive_halving: see CrossValidationProject
+
+		:type 	min_training_fraction: float
+		:type 	halving_factor: float
+
+		:type 	keep_out_of_fold_predictions: bool
+		:param 	keep_out_of_fold_predictions: see LearningProject
+
+		:type 	weight: float
+		:param 	weight: share of the workers the project gets when other projects have tasks too, see set_project_weight
+
 		:rtype: CrossValidationProject
 		"""
 		project = CrossValidationProject(
 			processor=self,
 			name=name, y_column=y_column, problem_type=problem_type, x_columns=x_columns, time_unit=time_unit,
 			evaluation_function=evaluation_function, main_metric=main_metric, lowest_is_best=lowest_is_best,
-			best_score=best_score, scoreboard=scoreboard
+			best_score=best_score, scoreboard=scoreboard, group_estimator_families=group_estimator_families,
+			result_cache=result_cache,
+			successive_halving=successive_halving,
+			min_training_fraction=min_training_fraction, halving_factor=halving_factor,
+			keep_out_of_fold_predictions=keep_out_of_fold_predictions
 		)
+		self.set_project_weight(project_name=name, weight=weight)
 		return project
 
 	def receive_to_do(self, project_name=None, num_tasks=None, echo=True, process_done_tasks=True, **kwargs):
@@ -213,49 +569,468 @@ class Processor:
 			self.process_done_tasks()
 
 		if project_name is None:
+			# all projects are loaded before any task is put in the queue so that their tasks are interleaved
 			for project_name in self.projects.keys():
-				self.receive_to_do(
-					project_name=project_name, num_tasks=num_tasks, echo=echo,
-					process_done_tasks=False, **kwargs
-				)
-
+				self._load_project(project_name=project_name, num_tasks=num_tasks, echo=echo, **kwargs)
 		else:
-			project = self.projects[project_name]
-			project.produce_tasks(ignore_error=True, echo=echo)
-			if num_tasks is not None:
-				if num_tasks > project.to_do_count:
-					# fill to do list in project
-					num_of_new_tasks = num_tasks - project.to_do_count
+			self._load_project(project_name=project_name, num_tasks=num_tasks, echo=echo, **kwargs)
+		self._dispatch()
 
-					# but cannot get more than what is available
-					num_of_new_tasks = min(num_of_new_tasks, project.new_count)
+	def _load_project(self, project_name, num_tasks=None, echo=True, **kwargs):
+		project = self.projects[project_name]
+		project.produce_tasks(ignore_error=True, echo=echo)
+		if num_tasks is not None:
+			if num_tasks > project.to_do_count:
+				# fill to do list in project
+				num_of_new_tasks = num_tasks - project.to_do_count
 
-					project.fill_to_do_list(num_tasks=num_of_new_tasks, **kwargs)
+				# but cannot get more than what is available
+				num_of_new_tasks = min(num_of_new_tasks, project.new_count)
 
-			loaded_count = 0
-			while project.to_do_count > 0:
-				task = project.pop_to_do()
-				self._to_do.append(task)
-				loaded_count += 1
+				project.fill_to_do_list(num_tasks=num_of_new_tasks, **kwargs)
+
+		loaded_count = 0
+		while project.to_do_count > 0:
+			task = project.pop_to_do()
+			self._send_to_workers(task=task)
+			loaded_count += 1
+
+		if echo:
+			print(f'{loaded_count} loaded from project {project_name}')
 
-			if echo:
-				print(f'{loaded_count} loaded from project {project_name}')
+	def _send_to_workers(self, task):
+		"""
+		the task waits in the backlog of its project until _dispatch puts it in the to-do queue
+		"""
+		self._pending[task.id] = task
+		self._pending_time_estimate_counts[(task.project_name, task.time_estimate_id)] += 1
+		if task.project_name not in self._backlogs:
+			self._backlogs[task.project_name] = deque()
+		self._backlogs[task.project_name].append(task)
+
+	def _count_backlog(self):
+		return sum(len(backlog) for backlog in self._backlogs.values())
+
+	def _get_queue_room(self):
+		"""
+		:rtype: int or float
+		:return: number of tasks that can be put in the to-do queue without going over queue_depth
+		"""
+		if self._queue_depth is None:
+			return float('inf')
+		# tasks that are sent and not held by a worker are roughly the ones in the queue
+		held_count = len({task_id for task_ids in self._doing.values() for task_id in task_ids})
+		queued_count = len(self._pending) - self._count_backlog() - held_count
+		return max(self._queue_depth - queued_count, 0)
+
+	def _get_estimated_seconds(self, task):
+		"""
+		:rtype: float or NoneType
+		"""
+		estimate = self.get_time_estimate(task=task)
+		if estimate == MissingTimeEstimate():
+			return None
+		project = self.projects[task.project_name]
+		return estimate / convert(timedelta(seconds=1), to_unit=project.time_unit)
+
+	def _get_costs(self, tasks):
+		"""
+		estimated seconds of tasks, a task without an estimate costs the mean of the others, or 1 if none has one
+		:type tasks: dict[str, Task]
+		:rtype: dict[str, float]
+		"""
+		costs = {key: self._get_estimated_seconds(task=task) for key, task in tasks.items()}
+		known = [cost for cost in costs.values() if cost is not None]
+		default = sum(known) / len(known) if len(known) > 0 else 1
+		return {key: default if cost is None else cost for key, cost in costs.items()}
+
+	def _dispatch(self):
+		"""
+		puts tasks from the backlogs of the projects in the to-do queue by deficit round-robin:
+		in every round each project with tasks earns its weight times a quantum of estimated seconds
+		and puts tasks in the queue while its deficit pays for them, so projects get the workers in proportion
+		to their weights in CPU time and a small project is not stuck behind a large one;
+		a round that runs out of room in the queue goes on in the next call
+		"""
+		room = self._get_queue_room()
+		while room > 0:
+			names = [name for name, backlog in self._backlogs.items() if len(backlog) > 0]
+			if len(names) == 0:
+				break
+			if all(name in self._served_this_round for name in names):
+				self._served_this_round.clear()
+			costs = self._get_costs(tasks={name: self._backlogs[name][0] for name in names})
+			quantum = max(costs.values())
+			for name in names:
+				if name in self._served_this_round or room == 0:
+					continue
+				self._served_this_round.add(name)
+				backlog = self._backlogs[name]
+				self._deficits[name] += quantum * self.get_project_weight(project_name=name)
+				while room > 0 and len(backlog) > 0 and self._deficits[name] >= costs[name]:
+					self._deficits[name] -= costs[name]
+					self._put_to_do(task=backlog.popleft())
+					room -= 1
+					if len(backlog) > 0:
+						costs[name] = self._get_costs(tasks={name: backlog[0]})[name]
+				if len(backlog) == 0:
+					# a project does not save up deficit while it has nothing to send
+					self._deficits[name] = 0
+
+	def _put_to_do(self, task):
+		self._sent_times[task.id] = monotonic()
+		self._to_do.put(self.projects[task.project_name].get_to_do_item(task=task))
+
+	def _set_worker_status(self, worker_id, status):
+		if worker_id in self._worker_status:
+			self._worker_status_counts[self._worker_status[worker_id]] -= 1
+		self._worker_status[worker_id] = status
+		self._worker_status_counts[status] += 1
+
+	def _receive_done_task(self, task):
+		if task.id not in self._pending:
+			# the task was requeued after its worker was terminated and its result has already arrived
+			return
+		self._pending.pop(task.id)
+		self._sent_times.pop(task.id, None)
+		self._pending_time_estimate_counts[(task.project_name, task.time_estimate_id)] -= 1
+		if task.is_done():
+			self._done_time += self.get_time_estimate(task=task)
+		self._done.append(task)
+
+	def _read_events(self):
+		while True:
+			# waits for the pipe without holding the lock so that _drain_events can run meanwhile
+			self._events._reader.poll(1)
+			self._drain_events()
+			if len(self._futures) > 0:
+				# also once a second without events so that workers are supervised while tasks are awaited
+				self._schedule_wake_up()
+
+	def _drain_events(self):
+		with self._event_lock:
+			while not self._events.empty():
+				self._received_events.append(self._events.get())
+
+	def _trace_done_task(self, task, worker_id, result_sent_at):
+		received_at = monotonic()
+		self._trace.add_task_spans(task=task, thread=worker_id)
+		if worker_id in self._remote_workers:
+			# the monotonic clock of another host cannot be compared with the one of the processor
+			self._sent_times.pop(task.id, None)
+			return
+		sent_at = self._sent_times.pop(task.id, None)
+		if sent_at is not None and len(task.spans) > 0:
+			self._trace.add(
+				task=task, thread=worker_id, phase='queue_wait',
+				start=sent_at, end=min(start for phase, start, end in task.spans)
+			)
+		if result_sent_at is not None:
+			self._trace.add(task=task, thread=worker_id, phase='result_drain', start=result_sent_at, end=received_at)
+
+	@property
+	def trace(self):
+		"""
+		:rtype: Trace
+		"""
+		return self._trace
+
+	@property
+	def trace_summary(self):
+		"""
+		time spent in each phase of the tasks, e.g. queue_wait, data, fit, predict, evaluate
+		:rtype: DataFrame
+		"""
+		return self._trace.summary
+
+	def export_chrome_trace(self, path):
+		"""
+		writes the timeline of the tasks in the trace-event JSON format of chrome://tracing and Perfetto
+		:type path: str
+		"""
+		self._trace.export_chrome_trace(path=path)
+
+	def receive_events(self, supervise=True):
+		"""
+		updates the state of workers and tasks from the events the workers have put in the events queue
+		:type supervise: bool
+		:param supervise: if True, workers are supervised after the events are received, see supervise
+		:rtype: int
+		"""
+		count = 0
+		while True:
+			try:
+				event, worker_id, value = self._received_events.popleft()
+			except IndexError:
+				break
+
+			if event != 'done' and self._worker_status.get(worker_id) in ('crashed', 'killed'):
+				# e.g. a remote worker that was taken for dead and came back, its tasks are already back in the queue
+				pass
+			elif event == 'status':
+				self._set_worker_status(worker_id=worker_id, status=value)
+			elif event == 'doing':
+				task_ids, started_at = value
+				if len(task_ids) > 0:
+					self._doing[worker_id] = task_ids
+				else:
+					self._doing.pop(worker_id, None)
+				if started_at is None:
+					self._started.pop(worker_id, None)
+				else:
+					self._started[worker_id] = task_ids[0], started_at
+			elif event == 'done':
+				task_id, result = value
+				if task_id in self._pending:
+					task = self._pending[task_id]
+					task.set_result(result=result)
+					self._trace_done_task(task=task, worker_id=worker_id, result_sent_at=result.get('sent_at'))
+					self._receive_done_task(task=task)
+					if task_id in self._speculated:
+						self._cancel_copies(task_id=task_id, winner_id=worker_id)
+			else:
+				raise RuntimeError(f'do not know what to do with event: {event}')
+			count += 1
+
+		if supervise:
+			self.supervise()
+		return count
+
+	def supervise(self):
+		"""
+		kills and replaces the workers that have been on a task for longer than its time limit,
+		replaces the workers that died and puts their tasks back in the to-do queue,
+		replaces the workers that ended to be recycled,
+		it runs whenever events are received, e.g. in show_progress and process_done_tasks
+		"""
+		now = time()
+		crashed_worker_ids = [
+			worker_id for worker_id, process in self._processes.items()
+			if process.exitcode is not None and process.exitcode != 0
+		]
+		if len(crashed_worker_ids) > 0:
+			# events a worker sent right before it died might still be in the pipe
+			self._drain_events()
+			self.receive_events(supervise=False)
+			for worker_id in crashed_worker_ids:
+				self._handle_crash(worker_id=worker_id)
+
+		if self._heartbeat_timeout is not None:
+			for worker_id, last_seen in list(self._remote_last_seen.items()):
+				if self._worker_status.get(worker_id) in ('ended', 'recycled', 'crashed', 'killed'):
+					del self._remote_last_seen[worker_id]
+				elif now - last_seen > self._heartbeat_timeout:
+					self._handle_lost_remote_worker(worker_id=worker_id)
+
+		recycled_worker_ids = [
+			worker_id for worker_id in self._processes.keys() if self._worker_status.get(worker_id) == 'recycled'
+		]
+		for worker_id in recycled_worker_ids:
+			self._processes.pop(worker_id).join(timeout=5)
+			self._replace_worker(worker_id=worker_id)
+
+		while len(self._delayed) > 0 and self._delayed[0][0] <= now:
+			requeue_time, sequence, task_id = heapq.heappop(self._delayed)
+			if task_id in self._pending:
+				self._put_to_do(task=self._pending[task_id])
+
+		for worker_id, (task_id, started_at) in list(self._started.items()):
+			task = self._pending.get(task_id)
+			if task is None:
+				continue
+			timeout = self._get_timeout(task=task)
+			if timeout is None or now - started_at <= timeout:
+				continue
+			if worker_id in self._remote_workers:
+				self._time_out_remote_worker(worker_id=worker_id, task=task, started_at=started_at)
+			else:
+				self._time_out(worker_id=worker_id, task=task, started_at=started_at)
+
+		if self._speculation_factor is not None:
+			self._speculate(now=now)
+
+		self._dispatch()
+
+	def _is_straggler(self, task, started_at, now):
+		"""
+		:rtype: bool
+		:return: True if the task has been running for longer than speculation_factor times its time estimate
+		"""
+		estimated_seconds = self._get_estimated_seconds(task=task)
+		if estimated_seconds is None:
+			return False
+		return now - started_at > self._speculation_factor * estimated_seconds
+
+	def _speculate(self, now):
+		"""
+		sends a second copy of the stragglers at the end of a run, one per idle worker;
+		copies are put in the queue directly so that the trace keeps the time the task was first sent
+		"""
+		idle_count = self._worker_status_counts['idle']
+		if idle_count == 0 or not self._to_do.empty() or self._count_backlog() > 0:
+			return
+		for worker_id, (task_id, started_at) in list(self._started.items()):
+			if idle_count == 0:
+				break
+			task = self._pending.get(task_id)
+			if task is None or task_id in self._speculated or not self._is_straggler(task, started_at, now):
+				continue
+			self._speculated.add(task_id)
+			self._to_do.put(self.projects[task.project_name].get_to_do_item(task=task))
+			idle_count -= 1
+
+	def _cancel_copies(self, task_id, winner_id):
+		"""
+		kills and replaces the local workers that are still doing a task another worker has finished,
+		the result of a copy that is not killed, e.g. on a remote worker, is ignored when it arrives
+		"""
+		self._speculated.discard(task_id)
+		for worker_id, (started_task_id, started_at) in list(self._started.items()):
+			if started_task_id == task_id and worker_id != winner_id and worker_id in self._processes:
+				self._kill_worker(worker_id=worker_id, status='killed')
+				self._replace_worker(worker_id=worker_id)
+
+	def _is_being_done_by_another_worker(self, task_id, worker_id):
+		return any(
+			started_task_id == task_id and _worker_id != worker_id
+			for _worker_id, (started_task_id, started_at) in self._started.items()
+		)
+
+	def _kill_worker(self, worker_id, status):
+		"""
+		kills the process of a worker and puts the tasks it has prefetched back in the to-do queue
+		:rtype: list[tuple]
+		:return: ids of the tasks the worker held, the one it was doing comes first
+		"""
+		process = self._processes.pop(worker_id)
+		process.kill()
+		process.join(timeout=5)
+		self._cpu_slots.release_process(pid=process.pid)
+		task_ids = self._doing.pop(worker_id, [])
+		self._started.pop(worker_id, None)
+		for task_id in task_ids[1:]:
+			if task_id in self._pending:
+				self._put_to_do(task=self._pending[task_id])
+		self._set_worker_status(worker_id=worker_id, status=status)
+		return task_ids
+
+	@property
+	def cpu_slots(self):
+		"""
+		:rtype: atlantis.multiprocessing.CpuSlots
+		"""
+		return self._cpu_slots
+
+	def _replace_worker(self, worker_id):
+		"""
+		starts a new worker with the settings of a worker that is gone
+		:rtype: multiprocess.Process
+		"""
+		process = self.add_worker(**self._worker_settings[worker_id])
+		self._replaced_by[worker_id] = f'worker_{self._worker_id_counter}'
+		return process
+
+	def _handle_crash(self, worker_id):
+		"""
+		replaces a worker whose process died, e.g. killed by the operating system when it ran out of memory;
+		the tasks it had prefetched go back to the to-do queue right away,
+		the task it was doing goes back after a delay or is quarantined as an error if it crashed too many workers
+		"""
+		process = self._processes.pop(worker_id)
+		process.join(timeout=5)
+		# the slots the worker held when it died
+		self._cpu_slots.release_process(pid=process.pid)
+		self._requeue_tasks_of_crashed_worker(worker_id=worker_id, exitcode=process.exitcode)
+		self._replace_worker(worker_id=worker_id)
+
+	def _handle_lost_remote_worker(self, worker_id):
+		"""
+		a remote worker without a heartbeat is handled like a local worker that crashed, but it cannot be replaced;
+		if it comes back it is stopped, and its results are still taken if its tasks are not done yet
+		"""
+		self._proceed_worker[worker_id] = False
+		del self._remote_last_seen[worker_id]
+		self._requeue_tasks_of_crashed_worker(worker_id=worker_id, exitcode=None)
+
+	def _requeue_tasks_of_crashed_worker(self, worker_id, exitcode):
+		task_ids = self._doing.pop(worker_id, [])
+		started = self._started.pop(worker_id, None)
+		self._set_worker_status(worker_id=worker_id, status='crashed')
+
+		if started is None:
+			prefetched_ids = task_ids
+		elif self._is_being_done_by_another_worker(task_id=started[0], worker_id=worker_id):
+			# the other copy of a speculated task goes on
+			prefetched_ids = task_ids[1:]
+		else:
+			prefetched_ids = task_ids[1:]
+			self._handle_crashed_task(task_id=started[0], exitcode=exitcode)
+
+		for task_id in prefetched_ids:
+			if task_id in self._pending:
+				self._put_to_do(task=self._pending[task_id])
+
+	def _handle_crashed_task(self, task_id, exitcode):
+		if task_id not in self._pending:
+			return
+		self._crash_counts[task_id] += 1
+		crash_count = self._crash_counts[task_id]
+		if crash_count >= self._max_crashes:
+			task = self._pending[task_id]
+			error = RuntimeError(f'task {task_id} crashed {crash_count} workers, the last exit code was {exitcode}')
+			task.add_error(error=error)
+			self._receive_done_task(task=task)
+		else:
+			requeue_time = time() + self._crash_backoff * 2 ** (crash_count - 1)
+			self._delayed_counter += 1
+			heapq.heappush(self._delayed, (requeue_time, self._delayed_counter, task_id))
+
+	def _time_out(self, worker_id, task, started_at):
+		self._kill_worker(worker_id=worker_id, status='killed')
+		task.time_out(worker_id=worker_id, starting_time=datetime.fromtimestamp(started_at))
+		self._receive_done_task(task=task)
+		self._replace_worker(worker_id=worker_id)
+
+	def _time_out_remote_worker(self, worker_id, task, started_at):
+		"""
+		the processor cannot kill the process of a remote worker, so the worker is stopped and taken for lost:
+		the tasks it prefetched go to the other workers and it ends if it ever finishes the task
+		"""
+		self._proceed_worker[worker_id] = False
+		self._remote_last_seen.pop(worker_id, None)
+		task_ids = self._doing.pop(worker_id, [])
+		self._started.pop(worker_id, None)
+		self._set_worker_status(worker_id=worker_id, status='killed')
+		for task_id in task_ids[1:]:
+			if task_id in self._pending:
+				self._put_to_do(task=self._pending[task_id])
+		task.time_out(worker_id=worker_id, starting_time=datetime.fromtimestamp(started_at))
+		self._receive_done_task(task=task)
 
 	def process_done_tasks(self, ignore_errors=False, echo=True):
+		self.receive_events()
 		processed_count = {}
 		while True:
 			try:
-				task = self._done.pop(0)
+				task = self._done.popleft()
 
-				if task.status == 'done':
+				if task.status == 'done' or task.status == 'timeout':
+					start = monotonic()
 					self.projects[task.project_name].add_time_estimate(task=task)
 					project = self.projects[task.project_name]
 					project.add_done_task(task=task)
+					self._trace.add(task=task, thread=PROCESSOR_THREAD, phase='process', start=start, end=monotonic())
+					self._resolve_future(task=task)
 					if task.project_name not in processed_count:
 						processed_count[task.project_name] = 1
 					else:
 						processed_count[task.project_name] += 1
 				elif task.status == 'error':
+					self._resolve_future(task=task)
+					if task.project_name in self.projects:
+						project = self.projects[task.project_name]
+						project.process_error(task=task)
+						self._send_produced_tasks(project=project)
 					if not ignore_errors:
 						self._last_error_task = task
 						print(f'trace:{task._errors[0][1]}')
@@ -263,70 +1038,65 @@ class Processor:
 				else:
 					raise RuntimeError(f'do not know what to do with status: {task.status}')
 
-				self._processed.append(task)
+				self._processed_count += 1
+				if self._result_store is None:
+					self._processed.append(task)
+				elif task.status == 'error':
+					# done tasks are written to the result store by their project
+					self._result_store.add_task(task=task)
 
 			except IndexError:
 				break
+
+		# tasks promoted while processing (successive halving) go to the workers without waiting for receive_to_do
+		for project_name in processed_count.keys():
+			self._send_produced_tasks(project=self.projects[project_name])
+		self._dispatch()
+
 		if echo:
 			for project_name, number in processed_count.items():
 				print(f'{number} tasks from project {project_name} processed.')
 
+	def _send_produced_tasks(self, project):
+		if project.produces_tasks_on_process:
+			while project.to_do_count > 0:
+				self._send_to_workers(task=project.pop_to_do())
+
 	def get_time_estimate(self, task):
 		return self.projects[task.project_name].get_time_estimate(task=task)
 
 	def count_to_do(self):
-		return len(self._to_do) + len(self._doing)
+		return len(self._pending)
 
 	def count_done(self):
-		return len(self._processed) + len(self._done)
+		return self._processed_count + len(self._done)
 
 	def get_to_do_time(self):
 		if self.count_to_do() == 0:
 			return 0
 
 		total = 0
-		for task in self._doing.values():
-			estimate = self.get_time_estimate(task=task)
-			if estimate == MissingTimeEstimate():
-				return estimate
-			total += estimate
-
-		for task in self._to_do:
-			estimate = self.get_time_estimate(task=task)
+		for key, count in self._pending_time_estimate_counts.items():
+			if count == 0:
+				continue
+			project_name, time_estimate_id = key
+			estimate = self.projects[project_name].get_time_estimate_by_id(time_estimate_id=time_estimate_id)
 			if estimate == MissingTimeEstimate():
 				return estimate
-			total += self.get_time_estimate(task=task)
+			total += estimate * count
 
 		return total
 
 	def get_done_time(self):
-		total = 0
-
-		for task in self._processed:
-			estimate = self.get_time_estimate(task=task)
-			if estimate == MissingTimeEstimate():
-				return estimate
-			total += estimate
-
-		for task in self._done:
-			estimate = self.get_time_estimate(task=task)
-			if estimate == MissingTimeEstimate():
-				return estimate
-			total += estimate
-
-		return total
+		return self._done_time
 
 	def _get_worker_count_string(self):
-		active = 0
-		idle = 0
-		terminated_or_ended = 0
-		for worker_status in self._worker_status.values():
-			if worker_status in {'started', 'active'}:
-				active += 1
-			elif worker_status == 'idle':
-				idle += 1
-			elif worker_status in {'ended', 'terminated'}:
-				terminated_or_ended += 1
+		counts = self._worker_status_counts
+		active = counts['started'] + counts['active']
+		idle = counts['idle']
+		terminated_or_ended = (
+			counts['ended'] + counts['terminated'] + counts['killed'] + counts['crashed'] + counts['recycled']
+		)
 		result = []
 		if active > 0:
 			result.append(f'{active} active{", " if idle + terminated_or_ended > 0 else ""}')
@@ -339,7 +1109,11 @@ class Processor:
 		return ' '.join(result)
 
 	def get_worker_count(self):
-		return len(self._processes)
+		remote_count = sum(
+			self._worker_status.get(worker_id) not in ('ended', 'recycled', 'crashed', 'killed')
+			for worker_id in self._remote_workers
+		)
+		return len(self._processes) + remote_count
 
 	def _update_progress_bay_by_count(self, progress_bar, next_line):
 		to_do_count = self.count_to_do()
@@ -363,9 +1137,6 @@ class Processor:
 			return self._update_progress_bay_by_count(progress_bar=progress_bar, next_line=next_line)
 
 		done_time = self.get_done_time()
-		if done_time == MissingTimeEstimate():
-			return self._update_progress_bay_by_count(progress_bar=progress_bar)
-
 		progress_bar.set_total(to_do_time + done_time)
 		to_do_count = self.count_to_do()
 		done_count = self.count_done()
@@ -378,7 +1149,7 @@ class Processor:
 		return to_do_count
 
 	def show_progress(self, time_limit=None, time_unit='s'):
-		if len(self._processes) == 0:
+		if self.get_worker_count() == 0:
 			raise RuntimeError('there are no workers')
 		start_time = get_now()
 		progress_bar = ProgressBar(total=100)
@@ -398,42 +1169,178 @@ class Processor:
 		except KeyboardInterrupt:
 			self._update_progress_bar(progress_bar=progress_bar, next_line=True)
 
+	def _schedule_wake_up(self):
+		"""
+		makes the event loop of the futures process the done tasks soon, it can be called from any thread
+		"""
+		if self._wake_up_scheduled or self._loop is None:
+			return
+		self._wake_up_scheduled = True
+		try:
+			self._loop.call_soon_threadsafe(self._wake_up)
+		except RuntimeError:
+			# the event loop is closed
+			self._wake_up_scheduled = False
+
+	def _wake_up(self):
+		self._wake_up_scheduled = False
+		try:
+			self.process_done_tasks(ignore_errors=True, echo=False)
+		except Exception as error:
+			# the futures would otherwise wait forever for tasks that cannot be processed
+			for future in self._futures.values():
+				if not future.done():
+					future.set_exception(error)
+			self._futures.clear()
+
+	def _resolve_future(self, task):
+		future = self._futures.pop(task.id, None)
+		if future is None or future.done():
+			# nobody awaits the task or the future was cancelled
+			return
+		if task.status == 'error':
+			future.set_exception(task.errors[0][0])
+		else:
+			future.set_result(task)
+
+	def submit(self, task):
+		"""
+		sends a task to the workers unless it is already sent and returns a future that is resolved with the task
+		when it is processed, or with its error; the task should be popped from the to-do list of its project;
+		the processor should then be used from the thread of the event loop
+		:type task: Task
+		:rtype: asyncio.Future
+		"""
+		loop = asyncio.get_running_loop()
+		if self._loop is not loop:
+			if len(self._futures) > 0:
+				raise RuntimeError('the futures of the processor belong to another event loop')
+			self._loop = loop
+
+		if task.id not in self._futures:
+			self._futures[task.id] = loop.create_future()
+		future = self._futures[task.id]
+		if task.id not in self._pending and task not in self._done:
+			self._send_to_workers(task=task)
+			self._dispatch()
+		# results might have arrived before anything awaited them
+		self._schedule_wake_up()
+		return future
+
+	async def as_completed(self, tasks=None, project_name=None, ignore_errors=False):
+		"""
+		yields tasks as they are processed, in an async for loop
+
+		:type tasks: list[Task] or NoneType
+		:param tasks: 	the tasks that are being done if None, then the tasks that processing them sends to the workers
+						such as promotions of successive halving are followed too
+
+		:type project_name: str or NoneType
+		:param project_name: only the tasks of this project are followed if tasks is None
+
+		:type ignore_errors: bool
+		:param ignore_errors: if True tasks with errors are yielded too, otherwise their error is raised
+		"""
+		if self.get_worker_count() == 0:
+			raise RuntimeError('there are no workers')
+		follow_pending = tasks is None
+
+		def get_pending_tasks():
+			return [
+				task for task in list(self._pending.values()) + list(self._done)
+				if project_name is None or task.project_name == project_name
+			]
+
+		waiting = {task.id: (task, self.submit(task=task)) for task in (get_pending_tasks() if tasks is None else tasks)}
+		while len(waiting) > 0:
+			await asyncio.wait([future for task, future in waiting.values()], return_when=asyncio.FIRST_COMPLETED)
+			for task_id in [task_id for task_id, (task, future) in waiting.items() if future.done()]:
+				task, future = waiting.pop(task_id)
+				if future.exception() is not None and not ignore_errors:
+					raise future.exception()
+				yield task
+
+			if follow_pending:
+				for task in get_pending_tasks():
+					if task.id not in waiting:
+						waiting[task.id] = task, self.submit(task=task)
+
 	@property
 	def worker_status_table(self):
 		return DataFrame.from_records([
-			{'id': worker_id, 'status': worker_status}
+			{
+				'id': worker_id, 'status': worker_status, 'replaced_by': self._replaced_by.get(worker_id),
+				'host': self._remote_workers.get(worker_id, 'local')
+			}
 			for worker_id, worker_status in self._worker_status.items()
 		])
 
 	@property
 	def tasks(self):
 		"""
+		tasks kept in memory, processed tasks are not among them if there is a result store
 		:rtype: list[TrainingTestTask]
 		"""
-		d = {}
-		for task in self._processed:
-			d[task.name] = task
-		for task in self._done:
-			d[task.name] = task
-		for task in self._doing.values():
-			d[task.name] = task
-		for task in self._to_do:
-			d[task.name] = task
-		return list(d.values())
+		return self._processed + list(self._done) + list(self._pending.values())
 
 	@property
 	def task_table(self):
-		return DataFrame.from_records([
-			task.record
+		table = DataFrame.from_records([
+			record
 			for task in self.tasks
+			for record in task.records
 		])
+		if self._result_store is None or len(self._result_store) == 0:
+			return table
+		stored = self._result_store.read_records()
+		if table.shape[0] == 0:
+			return stored
+		return concat([stored, table], ignore_index=True)
+
+	@property
+	def memory_summary(self):
+		"""
+		memory per estimator in bytes from the tasks done by workers that measure memory
+		:rtype: DataFrame
+		"""
+		table = self.task_table
+		if 'peak_rss' not in table.columns:
+			return DataFrame(columns=['estimator_name', 'task_count', 'mean_peak_rss', 'max_peak_rss', 'max_peak_increase'])
+		table = table[table['peak_rss'].notna()]
+		return table.groupby('estimator_name').agg(
+			task_count=('peak_rss', 'count'),
+			mean_peak_rss=('peak_rss', 'mean'),
+			max_peak_rss=('peak_rss', 'max'),
+			max_peak_increase=('peak_increase', 'max')
+		).reset_index().sort_values('max_peak_rss', ascending=False).reset_index(drop=True)
+
+	def recommend_worker_count(self, memory_budget=None, safety_factor=0.8, estimator_names=None, max_workers=None):
+		"""
+		the number of workers that fit in the memory budget if every worker reaches the largest peak measured so far
+		:type memory_budget: int or NoneType
+		:param memory_budget: bytes the workers can use, the available memory of the machine if None
+		:type safety_factor: float
+		:type estimator_names: list[str] or NoneType
+		:param estimator_names: only the peaks of these estimators are used, e.g. the ones still to be tried
+		:type max_workers: int or NoneType
+		:rtype: int
+		"""
+		summary = self.memory_summary
+		if estimator_names is not None:
+			summary = summary[summary['estimator_name'].isin(estimator_names)]
+		if summary.shape[0] == 0:
+			raise RuntimeError('no memory measurements, add workers with measure_memory=True and do some tasks first')
+		return recommend_worker_count(
+			worker_peak_bytes=summary['max_peak_rss'].max(), memory_budget=memory_budget,
+			safety_factor=safety_factor, max_workers=max_workers
+		)
 
 	def stop(self, worker_id=None):
 		if worker_id is not None:
 			self._proceed_worker[worker_id] = False
 
 		else:
-			for _worker_id in self._processes.keys():
+			for _worker_id in list(self._processes.keys()) + list(self._remote_workers.keys()):
 				self.stop(worker_id=_worker_id)
 
 		return self._done
@@ -442,18 +1349,32 @@ class Processor:
 		self.stop(worker_id=worker_id)
 		if worker_id is None:
 			sleep(1)
+		self.receive_events(supervise=False)
 
 		if worker_id is not None:
+			if worker_id in self._remote_workers:
+				# a remote worker ends after its current task and puts the tasks it has prefetched back
+				return self._done
 			if worker_id not in self._processes:
 				raise KeyError(f'worker {worker_id}')
 
 			self._processes[worker_id].terminate()
-			if worker_id in self._doing:
-				self._to_do.append(self._doing[worker_id])
-				del self._doing[worker_id]
+			self._processes[worker_id].join(timeout=5)
+			self._cpu_slots.release_process(pid=self._processes[worker_id].pid)
+			# the last events of the worker tell which tasks it still held
+			self._drain_events()
+			self.receive_events(supervise=False)
+			task_ids = self._doing.pop(worker_id, [])
+			started = self._started.pop(worker_id, None)
+			if started is not None and self._is_being_done_by_another_worker(task_id=started[0], worker_id=worker_id):
+				# the other copy of a speculated task goes on
+				task_ids = task_ids[1:]
+			for task_id in task_ids:
+				if task_id in self._pending:
+					self._put_to_do(task=self._pending[task_id])
 			del self._processes[worker_id]
-			if self._worker_status[worker_id] != 'ended':
-				self._worker_status[worker_id] = 'terminated'
+			if self._worker_status.get(worker_id) not in ('ended', 'recycled'):
+				self._set_worker_status(worker_id=worker_id, status='terminated')
 				if echo:
 					print(f'worker {worker_id} terminated!')
 			else:
@@ -464,5 +1385,10 @@ class Processor:
 			worker_ids = list(self._processes.keys())
 			for _worker_id in worker_ids:
 				self.terminate(worker_id=_worker_id, echo=echo)
+			if self._coordinator_server is not None:
+				# the remote workers that are connected are stopped and end on their own
+				self._coordinator_server.close()
+				self._coordinator_server = None
+			self._worker_context.detach(owner=self)
 
 		return self._done
@@ -38,6 +38,10 @@ class Project:
 	def name(self):
 		return self._name
 
+	@property
+	def time_unit(self):
+		return self._time_unit
+
 	@property
 	def time_estimates(self):
 		"""
@@ -49,7 +53,7 @@ class Project:
 		"""
 		:type task: TrainingTestTask
 		"""
-		if task.estimator_name not in self.time_estimates:
+		if task.time_estimate_id not in self.time_estimates:
 			self.time_estimates[task.time_estimate_id] = TimeEstimate()
 		self.time_estimates[task.time_estimate_id].append(task.get_elapsed(unit=self._time_unit))
 
@@ -60,8 +64,16 @@ class Project:
 		if task.is_done():
 			return task.get_elapsed(unit=self._time_unit)
 
-		if task.estimator_name in self.time_estimates:
-			return self.time_estimates[task.time_estimate_id].get_mean()
+		return self.get_time_estimate_by_id(time_estimate_id=task.time_estimate_id)
+
+	def get_time_estimate_by_id(self, time_estimate_id):
+		"""
+		estimates the time of a task that is not done yet
+		:type time_estimate_id: str
+		:rtype: float or MissingTimeEstimate
+		"""
+		if time_estimate_id in self.time_estimates:
+			return self.time_estimates[time_estimate_id].get_mean()
 
 		elif len(self.time_estimates) > 0:
 			total = 0
@@ -127,21 +139,66 @@ class Project:
 	def add_done_task(self, task):
 		"""
 		:type task: Task
+		:rtype: bool
+		:return: 	False if the task already has a result, e.g. from the other copy of a speculated task,
+					then the new result is ignored
 		"""
 		if not isinstance(task, Task):
 			raise TypeError(f'task should be of type Task but it is of type {type(task)}')
+		if task.id in self._done:
+			return False
 		if task.id not in self._being_done_ids:
 			raise KeyError(f'task_id {task.id} does not exist in being_done_ids')
-		if task.id in self._done:
-			raise KeyError(f'task {task} already exists in done!')
 
 		self.process(task=task)
 		self._being_done_ids.remove(task.id)
-		self._done[task.id] = task
+		self._keep_done_task(task=task)
+		return True
+
+	@property
+	def result_store(self):
+		"""
+		:rtype: atlantis.ds.parallel_computing.ResultStore or NoneType
+		"""
+		return self._processor.result_store
+
+	def _keep_done_task(self, task):
+		"""
+		keeps a done task, or only its id after writing it to the result store of the processor if there is one
+		:type task: Task
+		"""
+		if self.result_store is None:
+			self._done[task.id] = task
+		else:
+			self.result_store.add_task(task=task)
+			self._done[task.id] = None
+
+	def get_to_do_item(self, task):
+		"""
+		what the processor puts in the to-do queue of the workers for a task, the task itself by default
+		:type task: Task
+		:rtype: Task or tuple
+		"""
+		return task
+
+	@property
+	def produces_tasks_on_process(self):
+		"""
+		True if processing done tasks can add tasks to the to-do list, the processor sends those right away
+		:rtype: bool
+		"""
+		return False
 
 	def process(self, task):
 		raise NotImplementedError(f'this method should be implemented for class {self.__class__}')
 
+	def process_error(self, task):
+		"""
+		called for a task that ended with an error before the processor raises it, nothing is done by default
+		:type task: Task
+		"""
+		pass
+
 	def produce_tasks(self, **kwargs):
 		raise NotImplementedError(f'this method should be implemented for class {self.__class__}')
 
@@ -153,6 +210,21 @@ class Project:
 			project_name=self.name, num_tasks=num_tasks, echo=echo, process_done_tasks=True, **kwargs
 		)
 
+	async def run(self, num_tasks=None, ignore_errors=False, echo=False, **kwargs):
+		"""
+		sends tasks to the workers like send_to_do and waits for them, and for the tasks that processing them sends,
+		without blocking the event loop
+		:type num_tasks: int or NoneType
+		:type ignore_errors: bool
+		:type echo: bool
+		:rtype: list[Task]
+		:return: the tasks in the order they were processed
+		"""
+		self.send_to_do(num_tasks=num_tasks, echo=echo, **kwargs)
+		return [
+			task async for task in self._processor.as_completed(project_name=self.name, ignore_errors=ignore_errors)
+		]
+
 	def do(self, num_tasks=None, echo=True, disable_warnings=True, **kwargs):
 		if not self._all_tasks_produced:
 			self.produce_tasks(ignore_error=True, echo=echo)
@@ -174,9 +246,10 @@ class Project:
 			num_done += 1
 		progress_bar.show(amount=num_done, text=f'done: {num_done} / {to_do_count} (to-do)')
 
-		while num_tasks > num_done:
+		while num_tasks > num_done and self.to_do_count + self.new_count > 0:
 			progress_bar.show(amount=num_done, text=f'done: {num_done} / {num_tasks} (all tasks)')
-			self.fill_to_do_list(num_tasks=1, echo=False, **kwargs)
+			if self.to_do_count == 0:
+				self.fill_to_do_list(num_tasks=1, echo=False, **kwargs)
 			task = self.pop_to_do()
 			if disable_warnings:
 				with warnings.catch_warnings():
@@ -0,0 +1,98 @@
+from urllib.parse import quote
+import tempfile
+import pickle
+import zlib
+import glob
+import os
+
+try:
+	import fcntl
+except ImportError:
+	fcntl = None
+
+
+DEFAULT_CACHE_DIRECTORY = os.path.join(tempfile.gettempdir(), 'atlantis_remote_cache')
+
+# each process keeps the data sets it has loaded, key: data_id, value: (version, DataFrame)
+_REMOTE_FRAMES = {}
+
+
+class RemoteDataStore:
+	def __init__(self, coordinator, cache_directory=DEFAULT_CACHE_DIRECTORY):
+		"""
+		the namespace of a remote worker, it gets objects from the coordinator of the processor;
+		data sets are downloaded in compressed chunks once per host and kept in cache_directory,
+		so the other workers on the host read them from the disk
+		:type coordinator: multiprocess.managers.BaseProxy
+		:param coordinator: proxy of a Coordinator
+
+		:type cache_directory: str
+		"""
+		self._coordinator = coordinator
+		self._cache_directory = cache_directory
+		os.makedirs(cache_directory, exist_ok=True)
+
+	def has(self, obj_type, obj_id):
+		return self._coordinator.has_obj(obj_type, obj_id)
+
+	def has_data(self, data_id):
+		return self.has(obj_type='data', obj_id=data_id)
+
+	def get_obj(self, obj_type, obj_id):
+		if obj_type == 'data':
+			return self.get_data(data_id=obj_id)
+		return self._coordinator.get_obj(obj_type, obj_id)
+
+	def _get_cache_path(self, data_id, version):
+		return os.path.join(self._cache_directory, f'{quote(str(data_id), safe="")}-{version}.pickle.z')
+
+	def _download(self, data_id, version, num_chunks):
+		"""
+		:rtype: bytes
+		"""
+		return b''.join(self._coordinator.get_data_chunk(data_id, version, number) for number in range(num_chunks))
+
+	def _get_payload(self, data_id, version, num_chunks):
+		"""
+		the compressed data set from the cache of the host, the first worker that needs it downloads it
+		:rtype: bytes
+		"""
+		path = self._get_cache_path(data_id=data_id, version=version)
+		with open(f'{path}.lock', 'w') as lock:
+			# the other workers of the host wait for the one that is downloading instead of downloading too
+			if fcntl is not None:
+				fcntl.flock(lock, fcntl.LOCK_EX)
+			try:
+				if os.path.exists(path):
+					with open(path, 'rb') as file:
+						return file.read()
+
+				payload = self._download(data_id=data_id, version=version, num_chunks=num_chunks)
+				temporary_path = f'{path}.{os.getpid()}'
+				with open(temporary_path, 'wb') as file:
+					file.write(payload)
+				os.replace(temporary_path, path)
+
+				# versions of the data set from before it was replaced are not used again, versions are 32 hex digits
+				pattern = glob.escape(self._get_cache_path(data_id=data_id, version='')[:-len('.pickle.z')])
+				for old_path in glob.glob(f'{pattern}{"?" * 32}.pickle.z'):
+					if old_path != path:
+						os.remove(old_path)
+				return payload
+			finally:
+				if fcntl is not None:
+					fcntl.flock(lock, fcntl.LOCK_UN)
+
+	def get_data(self, data_id):
+		"""
+		:rtype: DataFrame
+		"""
+		version, num_chunks = self._coordinator.get_data_info(data_id)
+		if data_id in _REMOTE_FRAMES and _REMOTE_FRAMES[data_id][0] == version:
+			# the same DataFrame object is returned so that the fold cache of the worker recognizes it
+			return _REMOTE_FRAMES[data_id][1]
+
+		payload = self._get_payload(data_id=data_id, version=version, num_chunks=num_chunks)
+		data = pickle.loads(zlib.decompress(payload))
+		_REMOTE_FRAMES[data_id] = version, data
+		return data
@@ -0,0 +1,286 @@
+from pandas import DataFrame, concat
+from collections import defaultdict
+from urllib.parse import quote
+import hashlib
+import os
+
+
+FORMATS = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+# columns of task records that are not part of the evaluation
+RECORD_COLUMNS = (
+	'project_name', 'estimator_name', 'estimator_id', 'training_test_id', 'rung', 'training_fraction',
+	'worker_id', 'status', 'starting_time', 'ending_time', 'elapsed_ms',
+	'rss_before', 'rss_after', 'peak_rss', 'peak_increase', 'python_peak'
+)
+
+
+def _get_pyarrow():
+	# pyarrow is optional and slow to import, it is only needed once something is written or read
+	try:
+		import pyarrow
+		import pyarrow.parquet
+		import pyarrow.feather
+	except ImportError as error:
+		raise ImportError('ResultStore needs pyarrow, install it with: pip install pyarrow') from error
+	return pyarrow
+
+
+def _get_task_key(task_id):
+	return hashlib.sha1(repr(task_id).encode()).hexdigest()
+
+
+def _make_writable(frame):
+	"""
+	columns with values of more than one type, such as estimator ids that are int for some estimators
+	and str for others, become str because an arrow column has one type
+	:type frame: DataFrame
+	:rtype: DataFrame
+	"""
+	for column in frame.columns:
+		if frame[column].dtype == object:
+			types = {type(value) for value in frame[column] if value is not None}
+			if len(types) > 1:
+				frame[column] = [None if value is None else str(value) for value in frame[column]]
+	return frame
+
+
+class ResultStore:
+	def __init__(self, path, file_format='parquet', batch_size=1000):
+		"""
+		keeps the records, predictions, and feature importances of done tasks in files under path,
+		one directory per project, so that the processor and the projects only keep small indexes in memory;
+		records and feature importances are written in parts of batch_size rows, predictions in one file per task
+		:type path: str
+
+		:type file_format: str
+		:param file_format: parquet or arrow (the arrow ipc / feather format, faster to read and larger)
+
+		:type batch_size: int
+		:param batch_size: records of a project are kept in memory until there are this many
+		"""
+		if file_format not in FORMATS:
+			raise ValueError(f'file_format should be one of {list(FORMATS)} but it is {file_format}')
+		_get_pyarrow()
+		self._path = path
+		self._file_format = file_format
+		self._batch_size = batch_size
+		os.makedirs(path, exist_ok=True)
+
+		self._records = defaultdict(list)  # key: project_name, value: records not written yet
+		self._feature_importances = defaultdict(list)
+		self._record_files = defaultdict(list)  # key: project_name, value: paths of the parts
+		self._feature_importance_files = defaultdict(list)
+		# key: task_key, value: path of the part with the feature importances of the task, None while they are in memory
+		self._feature_importance_parts = {}
+		self._prediction_files = {}  # key: task_id, value: path
+		self._evaluation_columns = defaultdict(set)  # key: project_name
+		self._record_counts = defaultdict(int)
+
+	def __repr__(self):
+		return f'ResultStore: {self._path} ({len(self)} records, {len(self._prediction_files)} predictions)'
+
+	def __len__(self):
+		return sum(self._record_counts.values())
+
+	def __getstate__(self):
+		raise TypeError('ResultStore belongs to the main process and cannot be sent to workers')
+
+	@property
+	def path(self):
+		return self._path
+
+	@property
+	def file_format(self):
+		return self._file_format
+
+	@property
+	def project_names(self):
+		"""
+		:rtype: list
+		"""
+		return list(self._record_counts.keys())
+
+	def get_record_count(self, project_name=None):
+		"""
+		:rtype: int
+		"""
+		if project_name is None:
+			return len(self)
+		return self._record_counts.get(project_name, 0)
+
+	def _get_directory(self, project_name, kind):
+		directory = os.path.join(self._path, f'project_name={quote(str(project_name), safe="")}', kind)
+		os.makedirs(directory, exist_ok=True)
+		return directory
+
+	def _write(self, frame, path):
+		pyarrow = _get_pyarrow()
+		table = pyarrow.Table.from_pandas(_make_writable(frame))
+		if self._file_format == 'parquet':
+			pyarrow.parquet.write_table(table, path)
+		else:
+			pyarrow.feather.write_feather(table, path)
+
+	def _read(self, path):
+		pyarrow = _get_pyarrow()
+		if self._file_format == 'parquet':
+			table = pyarrow.parquet.read_table(path)
+		else:
+			table = pyarrow.feather.read_table(path)
+		return table.to_pandas()
+
+	def _write_part(self, buffers, files, project_name, kind):
+		if len(buffers[project_name]) == 0:
+			return
+		path = os.path.join(
+			self._get_directory(project_name=project_name, kind=kind),
+			f'part-{len(files[project_name]):05d}{FORMATS[self._file_format]}'
+		)
+		self._write(frame=DataFrame.from_records(buffers[project_name]), path=path)
+		files[project_name].append(path)
+		if buffers is self._feature_importances:
+			for record in buffers[project_name]:
+				self._feature_importance_parts[record['task_key']] = path
+		buffers[project_name] = []
+
+	def add_task(self, task):
+		"""
+		writes the records of a done task and its predictions and feature importances if it has them,
+		the predictions of the task are dropped from memory and read from the store when they are used again
+		:type task: Task
+		"""
+		project_name = task.project_name
+		for record in task.records:
+			self._records[project_name].append(record)
+			self._evaluation_columns[project_name].update(key for key in record if key not in RECORD_COLUMNS)
+		self._record_counts[project_name] += len(task.records)
+
+		for member in getattr(task, 'tasks', [task]):
+			if getattr(member, '_predictions', None) is not None:
+				self.add_predictions(task=member)
+
+		if len(self._records[project_name]) >= self._batch_size:
+			self._write_part(
+				buffers=self._records, files=self._record_files, project_name=project_name, kind='records'
+			)
+		if len(self._feature_importances[project_name]) >= self._batch_size:
+			self._write_part(
+				buffers=self._feature_importances, files=self._feature_importance_files,
+				project_name=project_name, kind='feature_importances'
+			)
+
+	def add_predictions(self, task):
+		"""
+		:type task: LearningTask
+		"""
+		key = _get_task_key(task_id=task.id)
+		path = os.path.join(
+			self._get_directory(project_name=task.project_name, kind='predictions'),
+			f'{key}{FORMATS[self._file_format]}'
+		)
+		self._write(frame=task._predictions, path=path)
+		self._prediction_files[task.id] = path
+
+		for feature, importance in (task._feature_importances or {}).items():
+			self._feature_importance_parts[key] = None
+			self._feature_importances[task.project_name].append({
+				'task_key': key, 'estimator_name': task.estimator_name, 'estimator_id': task.estimator_id,
+				'training_test_id': task.training_test_id, 'feature': feature, 'importance': importance
+			})
+		task.spill(result_store=self)
+
+	def flush(self):
+		"""
+		writes the records and feature importances that are kept in memory
+		"""
+		for project_name in list(self._records.keys()):
+			self._write_part(
+				buffers=self._records, files=self._record_files, project_name=project_name, kind='records'
+			)
+		for project_name in list(self._feature_importances.keys()):
+			self._write_part(
+				buffers=self._feature_importances, files=self._feature_importance_files,
+				project_name=project_name, kind='feature_importances'
+			)
+
+	def _read_parts(self, files, buffers, project_name=None, columns=None):
+		# the records in memory are read along with the parts, flushing them on every read would write tiny parts
+		project_names = list(files.keys() | buffers.keys()) if project_name is None else [project_name]
+		frames = [self._read(path=path) for name in project_names for path in files.get(name, [])]
+		frames += [
+			DataFrame.from_records(buffers[name]) for name in project_names if len(buffers.get(name, [])) > 0
+		]
+		if len(frames) == 0:
+			return DataFrame(columns=columns)
+		result = concat(frames, ignore_index=True)
+		# parts written before a column first appeared do not have it
+		return result if columns is None else result.reindex(columns=columns)
+
+	def read_records(self, project_name=None, columns=None):
+		"""
+		:type project_name: str or NoneType
+		:param project_name: all the projects if None
+		:type columns: list[str] or NoneType
+		:rtype: DataFrame
+		"""
+		return self._read_parts(
+			files=self._record_files, buffers=self._records, project_name=project_name, columns=columns
+		)
+
+	def read_evaluations(self, project_name, rung=None):
+		"""
+		evaluations of the done tasks of a project on one rung of successive halving, the full fits if rung is None
+		:type project_name: str
+		:type rung: int or NoneType
+		:rtype: DataFrame
+		:return: estimator_name, estimator_id, training_test_id, and one column per metric
+		"""
+		columns = ['estimator_name', 'estimator_id', 'training_test_id', 'rung', 'status']
+		columns += sorted(self._evaluation_columns[project_name] - set(columns))
+		records = self.read_records(project_name=project_name, columns=columns)
+		if records.shape[0] == 0:
+			return records.drop(columns=['rung', 'status'])
+		is_rung = records['rung'].isna() if rung is None else records['rung'] == rung
+		records = records[is_rung & (records['status'] == 'done')]
+		return records.drop(columns=['rung', 'status']).reset_index(drop=True)
+
+	def read_feature_importances(self, project_name=None):
+		"""
+		:rtype: DataFrame
+		:return: estimator_name, estimator_id, training_test_id, feature, and importance of the tasks with predictions
+		"""
+		return self._read_parts(
+			files=self._feature_importance_files, buffers=self._feature_importances, project_name=project_name
+		)
+
+	def read_task_feature_importances(self, task_id, project_name):
+		"""
+		:type task_id: tuple
+		:type project_name: str
+		:rtype: dict or NoneType
+		:return: key: feature, value: importance, None if the estimator of the task has no feature importances
+		"""
+		key = _get_task_key(task_id=task_id)
+		if key not in self._feature_importance_parts:
+			return None
+		path = self._feature_importance_parts[key]
+		if path is None:
+			records = [record for record in self._feature_importances[project_name] if record['task_key'] == key]
+			return {record['feature']: record['importance'] for record in records}
+		# only the part of the task is read
+		table = self._read(path=path)
+		table = table[table['task_key'] == key]
+		return dict(zip(table['feature'], table['importance']))
+
+	def has_predictions(self, task_id):
+		return task_id in self._prediction_files
+
+	def read_predictions(self, task_id):
+		"""
+		:type task_id: tuple
+		:rtype: DataFrame
+		"""
+		if task_id not in self._prediction_files:
+			raise KeyError(f'there are no predictions of task {task_id} in the result store')
+		return self._read(path=self._prediction_files[task_id])
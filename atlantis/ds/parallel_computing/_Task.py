@@ -1,6 +1,8 @@
 from ...time import get_elapsed
 from ._get_data_from_namespace import get_data_from_namespace
 from datetime import datetime
+from contextlib import contextmanager
+from time import monotonic
 import traceback
 
 class Task:
@@ -12,6 +14,9 @@ class Task:
 		self._starting_time = None
 		self._ending_time = None
 		self._id = task_id
+		self._timeout = None
+		self._memory = None
+		self._spans = []  # (phase, start, end) in seconds of time.monotonic, which is the same clock in all processes
 
 	def __str__(self):
 		return f'{self.id} ({self._status})'
@@ -35,6 +40,27 @@ class Task:
 	def project_name(self):
 		return self._project_name
 
+	@property
+	def cpu_count(self):
+		"""
+		number of cpus the task uses, a worker takes as many slots before doing it, see atlantis.multiprocessing.CpuSlots;
+		negative counts are read like n_jobs of joblib
+		:rtype: int
+		"""
+		return 1
+
+	@property
+	def timeout(self):
+		"""
+		wall-clock limit of the task in seconds, it overrides the limits set on the processor
+		:rtype: float or NoneType
+		"""
+		return self._timeout
+
+	@timeout.setter
+	def timeout(self, timeout):
+		self._timeout = timeout
+
 	@property
 	def starting_time(self):
 		return self._starting_time
@@ -47,8 +73,41 @@ class Task:
 		self._status = 'started'
 		self._starting_time = datetime.now()
 
-	def get_data_from_namespace(self, namespace, data_id=None, data_slice_id=None):
-		return get_data_from_namespace(namespace=namespace, data_id=data_id, data_slice_id=data_slice_id)
+	@property
+	def memory(self):
+		"""
+		memory of the worker while it did the task if the worker measures it, see MemoryMonitor
+		:rtype: dict or NoneType
+		"""
+		return self._memory
+
+	def set_memory(self, memory):
+		"""
+		:type memory: dict
+		"""
+		self._memory = memory
+
+	@property
+	def spans(self):
+		"""
+		:rtype: list[(str, float, float)]
+		"""
+		return self._spans
+
+	@contextmanager
+	def trace(self, phase):
+		"""
+		records the time spent in the with block as a span of the phase
+		:type phase: str
+		"""
+		start = monotonic()
+		try:
+			yield
+		finally:
+			self._spans.append((phase, start, monotonic()))
+
+	def get_data_from_namespace(self, namespace, data_id=None):
+		return get_data_from_namespace(namespace=namespace, data_id=data_id)
 
 	def do(self, namespace, worker_id):
 		try:
@@ -80,6 +139,18 @@ class Task:
 		self._ending_time = ending_time
 		self._worker_id = worker_id
 
+	def time_out(self, worker_id, starting_time=None):
+		"""
+		marks the task as stopped by the processor because it ran longer than its time limit
+		:type worker_id: int or str
+		:type starting_time: datetime or NoneType
+		"""
+		self._status = 'timeout'
+		self._worker_id = worker_id
+		if starting_time is not None:
+			self._starting_time = starting_time
+		self._ending_time = datetime.now()
+
 	def get_elapsed(self, unit='ms'):
 		if self._starting_time is not None and self._ending_time is not None:
 			return get_elapsed(start=self.starting_time, end=self.ending_time, unit=unit)
@@ -90,6 +161,44 @@ class Task:
 	def status(self):
 		return self._status
 
+	@property
+	def records(self):
+		"""
+		one record per result of the task, tasks that produce several results override this
+		:rtype: list[dict]
+		"""
+		return [self.record]
+
+	@property
+	def result(self):
+		"""
+		what a worker sends back when the task is done instead of the whole task,
+		tasks that produce more than a status add to it
+		:rtype: dict
+		"""
+		return {
+			'status': self._status,
+			'worker_id': self._worker_id,
+			'starting_time': self._starting_time,
+			'ending_time': self._ending_time,
+			'errors': self._errors,
+			'spans': self._spans,
+			'memory': self._memory
+		}
+
+	def set_result(self, result):
+		"""
+		updates the task from the result of the same task done by a worker
+		:type result: dict
+		"""
+		self._status = result['status']
+		self._worker_id = result['worker_id']
+		self._starting_time = result['starting_time']
+		self._ending_time = result['ending_time']
+		self._errors = result['errors']
+		self._spans = result['spans']
+		self._memory = result['memory']
+
 	def add_error(self, error, trace=None):
 		self._errors.append((error, trace))
 		self._status = 'error'
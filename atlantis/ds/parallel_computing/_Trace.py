@@ -0,0 +1,107 @@
+from pandas import DataFrame
+import json
+
+
+PROCESSOR_THREAD = 'processor'
+
+# spans of tasks waiting between processes, they overlap each other so they are drawn as async events
+WAIT_PHASES = ('queue_wait', 'result_drain')
+
+
+class Trace:
+	def __init__(self):
+		"""
+		spans of the phases of tasks in all the processes of a processor, in seconds of time.monotonic;
+		phases done by workers: build (making the task from its to-do item), data, fit, predict, evaluate, etc.
+		phases done by the processor: queue_wait (from being sent until the worker starts it),
+		result_drain (from the worker sending the result until the processor receives it), process
+		"""
+		self._spans = []  # (task_id, project_name, thread, phase, start, end)
+
+	def __len__(self):
+		return len(self._spans)
+
+	def add(self, task, thread, phase, start, end):
+		"""
+		:type task: Task
+		:type thread: str
+		:type phase: str
+		:type start: float
+		:type end: float
+		"""
+		self._spans.append((task.id, task.project_name, thread, phase, start, end))
+
+	def add_task_spans(self, task, thread):
+		"""
+		:type task: Task
+		:type thread: str
+		"""
+		for phase, start, end in task.spans:
+			self.add(task=task, thread=thread, phase=phase, start=start, end=end)
+
+	def clear(self):
+		self._spans = []
+
+	@property
+	def table(self):
+		"""
+		:rtype: DataFrame
+		"""
+		table = DataFrame.from_records(
+			self._spans, columns=['task_id', 'project_name', 'thread', 'phase', 'start', 'end']
+		)
+		table['duration_ms'] = (table['end'] - table['start']) * 1000
+		return table
+
+	@property
+	def summary(self):
+		"""
+		time per phase, the share is the fraction of the time of all the phases
+		:rtype: DataFrame
+		"""
+		table = self.table
+		if table.shape[0] == 0:
+			return DataFrame(columns=['phase', 'count', 'total_ms', 'mean_ms', 'max_ms', 'share'])
+		summary = table.groupby('phase')['duration_ms'].agg(
+			count='count', total_ms='sum', mean_ms='mean', max_ms='max'
+		).reset_index()
+		summary['share'] = summary['total_ms'] / summary['total_ms'].sum()
+		return summary.sort_values('total_ms', ascending=False).reset_index(drop=True)
+
+	def to_chrome_trace(self):
+		"""
+		trace-event format that chrome://tracing and Perfetto open, one thread per worker and one for the processor
+		:rtype: dict
+		"""
+		if len(self._spans) == 0:
+			return {'traceEvents': []}
+
+		origin = min(span[4] for span in self._spans)
+		thread_ids = {PROCESSOR_THREAD: 0}
+		events = []
+		for index, (task_id, project_name, thread, phase, start, end) in enumerate(self._spans):
+			if phase in WAIT_PHASES:
+				for event_type, time in (('b', start), ('e', end)):
+					events.append({
+						'name': phase, 'cat': 'wait', 'ph': event_type, 'id': index, 'pid': 1,
+						'ts': (time - origin) * 1e6, 'args': {'task_id': str(task_id), 'worker': str(thread)}
+					})
+				continue
+
+			if thread not in thread_ids:
+				thread_ids[thread] = len(thread_ids)
+			events.append({
+				'name': phase, 'cat': str(project_name), 'ph': 'X', 'pid': 1, 'tid': thread_ids[thread],
+				'ts': (start - origin) * 1e6, 'dur': (end - start) * 1e6,
+				'args': {'task_id': str(task_id)}
+			})
+		for thread, thread_id in thread_ids.items():
+			events.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': thread_id, 'args': {'name': str(thread)}})
+		return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+	def export_chrome_trace(self, path):
+		"""
+		:type path: str
+		"""
+		with open(path, 'w') as file:
+			json.dump(self.to_chrome_trace(), file)
@@ -1,2 +1,12 @@
-from ._Processor import Processor
-from ._DataSlice import DataSlice, TrainingTestSlice
+from ..._lazy import get_lazy_attributes
+
+# the processor imports the learning modules, they are imported when it is first used
+__getattr__, __dir__ = get_lazy_attributes(
+	package_name=__name__, package_globals=globals(),
+	members={
+		'Processor': '._Processor',
+		'ResultStore': '._ResultStore',
+		'DataSlice': '._DataSlice',
+		'TrainingTestSlice': '._DataSlice',
+	}
+)
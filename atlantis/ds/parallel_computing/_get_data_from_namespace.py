@@ -1,4 +1,10 @@
+from ._DataStore import DataStore
+from ._RemoteDataStore import RemoteDataStore
+
+
 def namespace_has(namespace, obj_type, obj_id):
+	if isinstance(namespace, (DataStore, RemoteDataStore)):
+		return namespace.has(obj_type=obj_type, obj_id=obj_id)
 	return hasattr(namespace, f'{obj_type}_{obj_id}')
 
 
@@ -7,6 +13,10 @@ def namespace_has_data(namespace, data_id):
 
 
 def add_obj_to_namespace(namespace, obj_type, obj_id, obj, overwrite=False):
+	if isinstance(namespace, (DataStore, RemoteDataStore)):
+		namespace.add_obj(obj_type=obj_type, obj_id=obj_id, obj=obj, overwrite=overwrite)
+		return
+
 	if namespace_has(namespace=namespace, obj_type=obj_type, obj_id=obj_id):
 		if not overwrite:
 			raise ValueError(f'{obj_type} {obj_id} already exists in the namespace')
@@ -19,4 +29,6 @@ def get_data_from_namespace(namespace, data_id):
 
 
 def get_obj_from_namespace(namespace, obj_type, obj_id):
+	if isinstance(namespace, (DataStore, RemoteDataStore)):
+		return namespace.get_obj(obj_type=obj_type, obj_id=obj_id)
 	return getattr(namespace, f'{obj_type}_{obj_id}')
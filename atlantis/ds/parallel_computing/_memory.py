@@ -0,0 +1,131 @@
+from threading import Thread, Event
+import os
+import resource
+import tracemalloc
+
+
+def get_rss_bytes():
+	"""
+	resident set size of the current process in bytes, from /proc on linux and the peak size elsewhere
+	:rtype: int
+	"""
+	try:
+		with open('/proc/self/statm') as file:
+			return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+	except (OSError, ValueError, IndexError):
+		return get_max_rss_bytes()
+
+
+def get_max_rss_bytes():
+	"""
+	largest resident set size the current process has had
+	:rtype: int
+	"""
+	# ru_maxrss is in kilobytes on linux and in bytes on macOS
+	max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	return max_rss if os.uname().sysname == 'Darwin' else max_rss * 1024
+
+
+def get_available_memory():
+	"""
+	memory that can be used without swapping, in bytes
+	:rtype: int
+	"""
+	try:
+		with open('/proc/meminfo') as file:
+			for line in file:
+				if line.startswith('MemAvailable:'):
+					return int(line.split()[1]) * 1024
+	except OSError:
+		pass
+	return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+
+
+class MemoryMonitor:
+	def __init__(self, interval=0.01, top_allocations=0):
+		"""
+		measures the memory of the process while a task is done: the resident set size before and after
+		and the peak, which is sampled by a thread and also read from getrusage when the task sets a new maximum
+		:type interval: float
+		:param interval: seconds between samples of the sampling thread
+
+		:type top_allocations: int
+		:param top_allocations: 	if larger than 0, python allocations are traced with tracemalloc
+									and the lines that allocated the most memory are reported
+		"""
+		self._interval = interval
+		self._top_allocations = top_allocations
+		self._stop = Event()
+		self._thread = None
+		self._peak = 0
+		self._before = None
+		self._max_rss_before = None
+		if top_allocations > 0 and not tracemalloc.is_tracing():
+			tracemalloc.start()
+
+	def _sample(self):
+		while not self._stop.wait(self._interval):
+			self._peak = max(self._peak, get_rss_bytes())
+
+	def start(self):
+		self._before = get_rss_bytes()
+		self._max_rss_before = get_max_rss_bytes()
+		self._peak = self._before
+		if self._top_allocations > 0:
+			tracemalloc.reset_peak()
+		self._stop.clear()
+		self._thread = Thread(target=self._sample, daemon=True)
+		self._thread.start()
+
+	def stop(self):
+		"""
+		:rtype: dict
+		:return: rss_before, rss_after, peak_rss, and peak_increase in bytes,
+				and python_peak and top_allocations if allocations are traced
+		"""
+		self._stop.set()
+		self._thread.join()
+		after = get_rss_bytes()
+		peak = max(self._peak, after)
+		max_rss_after = get_max_rss_bytes()
+		if max_rss_after > self._max_rss_before:
+			# the process reached its largest size during the task, getrusage has the exact peak
+			peak = max(peak, max_rss_after)
+
+		result = {
+			'rss_before': self._before,
+			'rss_after': after,
+			'peak_rss': peak,
+			'peak_increase': peak - self._before
+		}
+		if self._top_allocations > 0:
+			result['python_peak'] = tracemalloc.get_traced_memory()[1]
+			statistics = tracemalloc.take_snapshot().statistics('lineno')[:self._top_allocations]
+			result['top_allocations'] = [(str(statistic.traceback), statistic.size) for statistic in statistics]
+		return result
+
+
+def recommend_worker_count(worker_peak_bytes, memory_budget=None, safety_factor=0.8, max_workers=None):
+	"""
+	the number of workers whose peak memory fits in the budget
+	:type worker_peak_bytes: int or float
+	:param worker_peak_bytes: the largest resident set size one worker reaches
+
+	:type memory_budget: int or NoneType
+	:param memory_budget: bytes the workers can use, the available memory of the machine if None
+
+	:type safety_factor: float
+	:param safety_factor: the fraction of the budget the workers plan to use
+
+	:type max_workers: int or NoneType
+	:param max_workers: the result is not larger than this, the number of cpus if None
+	:rtype: int
+	:return: 0 if one worker does not fit
+	"""
+	if memory_budget is None:
+		memory_budget = get_available_memory()
+	if max_workers is None:
+		max_workers = os.cpu_count() or 1
+	if worker_peak_bytes <= 0:
+		return max_workers
+	return int(min(max_workers, memory_budget * safety_factor // worker_peak_bytes))
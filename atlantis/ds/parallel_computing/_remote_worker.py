@@ -0,0 +1,176 @@
+from argparse import ArgumentParser
+from multiprocess.connection import wait
+from threading import Thread
+from time import sleep
+import socket
+import sys
+import os
+
+from ...multiprocessing._WorkerContext import get_worker_context
+from ...multiprocessing._CpuSlots import CpuSlots
+from ._worker import worker
+from ._Coordinator import CoordinatorClient
+from ._RemoteDataStore import RemoteDataStore, DEFAULT_CACHE_DIRECTORY
+
+
+# exit code of a remote worker that ended to be recycled, the atlantis-worker command starts a new one
+RECYCLED_EXIT_CODE = 3
+
+
+class _RemoteQueue:
+	def __init__(self, coordinator):
+		"""
+		the to-do queue of the processor as the worker function uses it
+		"""
+		self._coordinator = coordinator
+
+	def get(self, timeout=None):
+		return self._coordinator.get_to_do(timeout)
+
+	def get_nowait(self):
+		return self._coordinator.get_to_do_nowait()
+
+	def put(self, item):
+		self._coordinator.put_to_do(item)
+
+
+class _RemoteEvents:
+	def __init__(self, coordinator):
+		self._coordinator = coordinator
+
+	def put(self, event):
+		self._coordinator.put_event(event)
+
+
+class _RemoteProceed:
+	def __init__(self, coordinator):
+		"""
+		the flags of the processor that stop workers, a remote worker is registered by the coordinator
+		"""
+		self._coordinator = coordinator
+
+	def __contains__(self, worker_id):
+		return True
+
+	def __getitem__(self, worker_id):
+		return self._coordinator.should_proceed(worker_id)
+
+
+def _send_heartbeats(coordinator, worker_id, interval):
+	# from its own thread so that the processor hears from the worker during long tasks too
+	while True:
+		try:
+			coordinator.heartbeat(worker_id)
+		except (EOFError, OSError):
+			# the processor is gone
+			return
+		sleep(interval)
+
+
+def parse_address(address):
+	"""
+	:type address: str
+	:param address: host:port
+	:rtype: (str, int)
+	"""
+	host, _, port = address.rpartition(':')
+	if host == '' or not port.isdigit():
+		raise ValueError(f'address should be host:port but it is {address}')
+	return host, int(port)
+
+
+def run_remote_worker(
+		address, authkey, prefetch=1, fold_cache_bytes=None, max_tasks=None, max_rss_bytes=None,
+		measure_memory=False, cache_directory=DEFAULT_CACHE_DIRECTORY, cpu_slots=None, heartbeat_interval=5
+):
+	"""
+	connects to the coordinator of a processor, see Processor.serve, and does its tasks until the processor stops it
+	:type address: (str, int)
+	:type authkey: bytes
+	:type prefetch: int
+	:type fold_cache_bytes: int or NoneType
+	:type max_tasks: int or NoneType
+	:type max_rss_bytes: int or NoneType
+	:type measure_memory: bool
+	:type cache_directory: str
+	:type cpu_slots: atlantis.multiprocessing.CpuSlots or NoneType
+
+	:type heartbeat_interval: float
+	:param heartbeat_interval: seconds between heartbeats, it should be well below the heartbeat_timeout of the processor
+	"""
+	client = CoordinatorClient(address=address, authkey=authkey)
+	client.connect()
+	coordinator = client.get_coordinator()
+	worker_id = coordinator.register_worker(socket.gethostname())
+	Thread(
+		target=_send_heartbeats, kwargs={'coordinator': coordinator, 'worker_id': worker_id, 'interval': heartbeat_interval},
+		daemon=True
+	).start()
+	end_status = worker(
+		worker_id=worker_id,
+		namespace=RemoteDataStore(coordinator=coordinator, cache_directory=cache_directory),
+		to_do=_RemoteQueue(coordinator=coordinator),
+		events=_RemoteEvents(coordinator=coordinator),
+		proceed=_RemoteProceed(coordinator=coordinator),
+		prefetch=prefetch, fold_cache_bytes=fold_cache_bytes, max_tasks=max_tasks, max_rss_bytes=max_rss_bytes,
+		measure_memory=measure_memory, cpu_slots=cpu_slots
+	)
+	if end_status == 'recycled':
+		sys.exit(RECYCLED_EXIT_CODE)
+
+
+def main(arguments=None):
+	"""
+	atlantis-worker --connect host:port --authkey key --workers 4
+	"""
+	parser = ArgumentParser(description='starts workers that do the tasks of a processor on another host')
+	parser.add_argument('--connect', required=True, help='host:port printed by Processor.serve')
+	parser.add_argument(
+		'--authkey', default=os.environ.get('ATLANTIS_AUTHKEY'),
+		help='the authkey of Processor.serve, it can also be in the environment variable ATLANTIS_AUTHKEY'
+	)
+	parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='number of worker processes')
+	parser.add_argument('--prefetch', type=int, default=1)
+	parser.add_argument('--fold-cache-bytes', type=int, default=None)
+	parser.add_argument('--max-tasks', type=int, default=None, help='a worker is recycled after this many tasks')
+	parser.add_argument('--max-rss-bytes', type=int, default=None)
+	parser.add_argument('--measure-memory', action='store_true')
+	parser.add_argument('--cache-directory', default=DEFAULT_CACHE_DIRECTORY)
+	parser.add_argument(
+		'--heartbeat-interval', type=float, default=5,
+		help='seconds between heartbeats, the processor takes a worker for dead after heartbeat_timeout of Processor.serve'
+	)
+	arguments = parser.parse_args(arguments)
+	if arguments.authkey is None:
+		parser.error('--authkey or ATLANTIS_AUTHKEY is needed')
+
+	kwargs = {
+		'address': parse_address(arguments.connect), 'authkey': arguments.authkey.encode(),
+		'prefetch': arguments.prefetch, 'fold_cache_bytes': arguments.fold_cache_bytes,
+		'max_tasks': arguments.max_tasks, 'max_rss_bytes': arguments.max_rss_bytes,
+		'measure_memory': arguments.measure_memory, 'cache_directory': arguments.cache_directory,
+		'heartbeat_interval': arguments.heartbeat_interval
+	}
+	worker_context = get_worker_context()
+	# the workers of this host share its cpus
+	kwargs['cpu_slots'] = CpuSlots(context=worker_context.context)
+
+	def start_worker():
+		process = worker_context.Process(target=run_remote_worker, kwargs=kwargs)
+		process.start()
+		return process
+
+	processes = [start_worker() for _ in range(arguments.workers)]
+	while len(processes) > 0:
+		wait([process.sentinel for process in processes])
+		for process in [process for process in processes if process.exitcode is not None]:
+			processes.remove(process)
+			# the slots of a worker that died during a task
+			kwargs['cpu_slots'].release_process(pid=process.pid)
+			# the processor cannot start processes on this host so recycled workers are replaced here
+			if process.exitcode == RECYCLED_EXIT_CODE:
+				processes.append(start_worker())
+
+
+if __name__ == '__main__':
+	main()
@@ -1,46 +1,148 @@
-from multiprocess.managers import Namespace
-from time import sleep
+from collections import deque
+from time import time, monotonic
+import queue
+from ._memory import get_rss_bytes, MemoryMonitor
+from ...multiprocessing._CpuSlots import pin_threads
+from .learning._FoldCache import get_fold_cache
+from .learning._TaskTemplate import get_task_from_to_do_item
 
-def worker(worker_id, namespace, to_do, doing, done, proceed, status):
+
+def worker(
+		worker_id, namespace, to_do, events, proceed, prefetch=1, wait_time=0.5, fold_cache_bytes=None,
+		max_tasks=None, max_rss_bytes=None, measure_memory=False, top_allocations=0, cpu_slots=None
+):
 	"""
 	:type worker_id: int or str
-	:type namespace: Namespace
-	:type to_do: list[TrainingTestTask]
-	:type doing: dict[int or str, Task]
-	:type done: list[Task]
+	:type namespace: DataStore
+	:type to_do: multiprocess.Queue
+	:type events: multiprocess.SimpleQueue
 	:type proceed: dict[str, bool]
-	:type status: dict[str, str]
 
-	each item in the queue is tuple or list that has:
-	estimator_id, data_id, estimator class, dictionary of kwargs, training, test
+	:type prefetch: int
+	:param prefetch: number of tasks the worker takes from the queue at once
+
+	:type wait_time: float
+	:param wait_time: 	seconds to block on an empty queue before checking if the worker should proceed,
+						it does not delay tasks because the worker wakes up as soon as a task is put in the queue
+
+	:type fold_cache_bytes: int or NoneType
+	:param fold_cache_bytes: 	byte budget of the cache of prepared training-test arrays of the worker,
+								the default of FoldCache is used if None
+
+	:type max_tasks: int or NoneType
+	:param max_tasks: the worker ends after doing this many tasks so that the processor replaces it with a new one
+
+	:type max_rss_bytes: int or NoneType
+	:param max_rss_bytes: the worker ends after a task if its resident memory is larger than this
+
+	:type measure_memory: bool
+	:param measure_memory: if True, the memory of the worker during each task is put in task.memory, see MemoryMonitor
+
+	:type top_allocations: int
+	:param top_allocations: number of lines with the largest python allocations to report, it needs measure_memory
+
+	:type cpu_slots: atlantis.multiprocessing.CpuSlots or NoneType
+	:param cpu_slots: 	the worker takes the slots of a task, see Task.cpu_count, before starting it
+						and limits its BLAS and OpenMP threads and its cpu affinity to them
 
+	each item in the to-do queue is a Task or a tuple made by LearningProject.get_to_do_item,
+	the worker reports to the processor by putting (event, worker_id, value) tuples in the events queue:
+		('status', worker_id, status)
+		('doing', worker_id, (ids of the tasks held by the worker, the one being done comes first,
+								time.time() when the first one started or None if it has not started))
+		('done', worker_id, (task_id, result of the task))
+
+	:rtype: str
+	:return: the status the worker ended with: ended, or recycled if it ended to be replaced by a new worker
 	"""
-	status[worker_id] = 'started'
-	if worker_id in proceed:
-		error = ValueError(f'{worker_id} already exists in proceed')
-		status[worker_id] = f'error: {error}'
-		raise error
-	else:
+	events.put(('status', worker_id, 'started'))
+	# the processor registers the worker before starting it so that it can be stopped before it gets here
+	if worker_id not in proceed:
 		proceed[worker_id] = True
 
+	if fold_cache_bytes is not None:
+		get_fold_cache().max_bytes = fold_cache_bytes
+
+	held = deque()  # (to-do item, task)
+	memory_monitor = MemoryMonitor(top_allocations=top_allocations) if measure_memory else None
+	current_status = 'started'
+	task_count = 0
+	end_status = 'ended'
+
+	def set_status(new_status):
+		nonlocal current_status
+		if new_status != current_status:
+			events.put(('status', worker_id, new_status))
+			current_status = new_status
+
+	def hold(item):
+		if isinstance(item, tuple):
+			start = monotonic()
+			task = get_task_from_to_do_item(namespace=namespace, item=item)
+			task.spans.append(('build', start, monotonic()))
+			held.append((item, task))
+		else:
+			held.append((item, item))
+
 	while proceed[worker_id]:
-		try:
-			task = to_do.pop(0)
-			doing[worker_id] = task
-			status[worker_id] = 'active'
+		if len(held) == 0:
+			try:
+				hold(to_do.get(timeout=wait_time))
+			except queue.Empty:
+				set_status('idle')
+				continue
 
-		except IndexError:
-			status[worker_id] = 'idle'
-			continue
+			while len(held) < prefetch:
+				try:
+					hold(to_do.get_nowait())
+				except queue.Empty:
+					break
+			# before waiting for cpu slots, so that the tasks go back to the queue if the worker dies while it waits
+			events.put(('doing', worker_id, ([held_task.id for _, held_task in held], None)))
 
+		item, task = held.popleft()
+		cpu_ids = None
+		if cpu_slots is not None:
+			# waits for the cpus of the task but still ends when the processor stops it
+			while cpu_ids is None and proceed[worker_id]:
+				cpu_ids = cpu_slots.acquire(cpu_count=task.cpu_count, timeout=wait_time)
+			if cpu_ids is None:
+				held.appendleft((item, task))
+				break
+			pin_threads(cpu_ids=cpu_ids)
+		events.put(('doing', worker_id, ([task.id] + [held_task.id for _, held_task in held], time())))
+		set_status('active')
+
+		if memory_monitor is not None:
+			memory_monitor.start()
 		try:
 			task.do(namespace=namespace, worker_id=worker_id)
 
 		except Exception as error:
 			task.add_error(error=error)
-		sleep(0.1)
+		if memory_monitor is not None:
+			task.set_memory(memory=memory_monitor.stop())
+
+		result = task.result
+		result['sent_at'] = monotonic()
+		events.put(('done', worker_id, (task.id, result)))
+		events.put(('doing', worker_id, ([held_task.id for _, held_task in held], None)))
+		if cpu_ids is not None:
+			cpu_slots.release(cpu_ids=cpu_ids)
 
-		del doing[worker_id]
-		done.append(task)
+		# memory that leaks in long runs is given back by ending the worker after its current task
+		task_count += 1
+		if max_tasks is not None and task_count >= max_tasks:
+			end_status = 'recycled'
+			break
+		if max_rss_bytes is not None and get_rss_bytes() > max_rss_bytes:
+			end_status = 'recycled'
+			break
 
-	status[worker_id] = 'ended'
+	# tasks that were prefetched but not started go back to the queue for other workers
+	while len(held) > 0:
+		item, task = held.popleft()
+		to_do.put(item)
+	events.put(('doing', worker_id, ([], None)))
+	events.put(('status', worker_id, end_status))
+	return end_status
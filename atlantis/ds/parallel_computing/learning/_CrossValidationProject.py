@@ -11,16 +11,193 @@ class CrossValidationProject(LearningProject):
 			self, name, y_column, problem_type, x_columns=None,
 			time_unit='ms', evaluation_function=None, main_metric=None,
 			lowest_is_best=None, best_score=None,
-			scoreboard=None, processor=None
+			scoreboard=None, processor=None, group_estimator_families=False, result_cache=None,
+			successive_halving=False, min_training_fraction=1 / 9, halving_factor=3,
+			keep_out_of_fold_predictions=False
 	):
+		"""
+		:type 	successive_halving: bool
+		:param 	successive_halving: 	if True, every estimator is first fitted on min_training_fraction of the
+										training rows of each training-test slice, the best 1 / halving_factor of
+										the estimators move up to halving_factor times more rows and so on
+										until the last rung which uses all the training rows;
+										scores of the smaller rungs are kept in scoreboard.get_rung_scoreboard(rung);
+										tasks on the smaller rungs are not grouped by group_estimator_families
+
+		:type 	min_training_fraction: float
+		:type 	halving_factor: float
+
+		:type 	keep_out_of_fold_predictions: bool
+		:param 	keep_out_of_fold_predictions: see LearningProject, the predictions of the folds are used by select_ensemble
+		"""
 		super().__init__(
 			name=name, y_column=y_column, problem_type=problem_type, x_columns=x_columns,
 			time_unit=time_unit, evaluation_function=evaluation_function, main_metric=main_metric,
-			lowest_is_best=lowest_is_best, best_score=best_score, scoreboard=scoreboard, processor=processor
+			lowest_is_best=lowest_is_best, best_score=best_score, scoreboard=scoreboard, processor=processor,
+			group_estimator_families=group_estimator_families, result_cache=result_cache,
+			keep_out_of_fold_predictions=keep_out_of_fold_predictions
 		)
 		self._validation_holdout_slice_id = None
 		self._full_data_slice_id = None
 
+		self._successive_halving = successive_halving
+		self._halving_factor = halving_factor
+		if successive_halving:
+			self._rung_fractions = self._get_rung_fractions(
+				min_training_fraction=min_training_fraction, halving_factor=halving_factor
+			)
+		else:
+			self._rung_fractions = [1]
+		self._rung_members = {}  # key: rung, value: set of estimators fitted on that rung
+		self._rung_completed = {}  # key: rung, value: list of estimators with a score on every training-test slice
+
+	@staticmethod
+	def _get_rung_fractions(min_training_fraction, halving_factor):
+		"""
+		:rtype: list[float]
+		"""
+		if not 0 < min_training_fraction <= 1:
+			raise ValueError(f'min_training_fraction should be in (0, 1] but it is {min_training_fraction}')
+		if halving_factor <= 1:
+			raise ValueError(f'halving_factor should be larger than 1 but it is {halving_factor}')
+
+		fractions = []
+		fraction = min_training_fraction
+		while fraction < 1 - 1e-9:
+			fractions.append(fraction)
+			fraction *= halving_factor
+		fractions.append(1)
+		return fractions
+
+	@property
+	def successive_halving(self):
+		return self._successive_halving
+
+	@property
+	def produces_tasks_on_process(self):
+		return self._successive_halving
+
+	@property
+	def rung_fractions(self):
+		"""
+		:rtype: list[float]
+		"""
+		return self._rung_fractions
+
+	@property
+	def num_rungs(self):
+		return len(self._rung_fractions)
+
+	def _get_task_rung(self, rung):
+		# tasks of the last rung are ordinary tasks and their scores go to the main scoreboard
+		return None if rung == self.num_rungs - 1 else rung
+
+	def _produce_rung_tasks(self, rung, estimator, ignore_error=True):
+		"""
+		:type rung: int
+		:type estimator: (str, int)
+		:rtype: list[LearningTask]
+		"""
+		estimator_name, estimator_id = estimator
+		estimator_class_and_arguments = self._estimators[estimator]
+		fraction = self._rung_fractions[rung]
+		tasks = []
+		for training_test_slice_id in self._training_test_slice_ids:
+			task = self.produce_task(
+				estimator_name=estimator_name, estimator_id=estimator_id,
+				estimator_class=estimator_class_and_arguments['class'],
+				estimator_arguments=estimator_class_and_arguments['arguments'],
+				training_test_slice_id=training_test_slice_id,
+				ignore_error=ignore_error,
+				training_fraction=None if fraction >= 1 else fraction,
+				rung=self._get_task_rung(rung)
+			)
+			if task is not None:
+				tasks.append(task)
+		return tasks
+
+	def produce_tasks(self, ignore_error=False, echo=True):
+		if not self._successive_halving:
+			return super().produce_tasks(ignore_error=ignore_error, echo=echo)
+
+		# every estimator starts on the first rung,
+		# estimators on the other rungs get tasks for training-test slices added after their promotion
+		self._rung_members.setdefault(0, set()).update(self._estimators.keys())
+		task_count = 0
+		cached_count = 0
+		for rung, members in list(self._rung_members.items()):
+			for estimator in list(members):
+				for task in self._produce_rung_tasks(rung=rung, estimator=estimator, ignore_error=ignore_error):
+					task_count += 1
+					if self._take_cached_result(task=task):
+						cached_count += 1
+					elif rung == 0:
+						self._pre_to_do[task.id] = task
+						self._scheduler.add_task(task=task)
+					else:
+						self._to_do[task.id] = task
+
+		if echo:
+			cached = f' ({cached_count} done from the result cache)' if cached_count > 0 else ''
+			print(f'{task_count} tasks produced for project {self.name}{cached}')
+		self._all_tasks_produced = True
+
+	def process(self, task):
+		"""
+		:type task: LearningTask
+		"""
+		super().process(task=task)
+		if task.rung is not None:
+			self._promote(rung=task.rung, estimator=(task.estimator_name, task.estimator_id))
+
+	def process_error(self, task):
+		"""
+		a task of a smaller rung that fails gets the worst score, like one that times out,
+		so that the rung still completes and the other estimators are promoted
+		:type task: LearningTask or GroupedLearningTask
+		"""
+		super().process_error(task=task)
+		rung = getattr(task, 'rung', None)
+		if rung is None:
+			return
+		self.scoreboard.get_rung_scoreboard(rung=rung).add_timeout(
+			estimator_name=task.estimator_name, estimator_id=task.estimator_id, training_test_id=task.training_test_id
+		)
+		self._promote(rung=rung, estimator=(task.estimator_name, task.estimator_id))
+
+	def _promote(self, rung, estimator):
+		"""
+		promotes the best estimators of a rung to the next rung as soon as they are known to be among the best,
+		so workers do not wait for the slowest estimator of the rung (asynchronous successive halving)
+		:type rung: int
+		:type estimator: (str, int)
+		"""
+		rung_scoreboard = self.scoreboard.get_rung_scoreboard(rung=rung)
+		estimator_name, estimator_id = estimator
+		count = rung_scoreboard.get_score_count(estimator_name=estimator_name, estimator_id=estimator_id)
+		if count < rung_scoreboard.num_training_tests:
+			return
+
+		completed = self._rung_completed.setdefault(rung, [])
+		completed.append(estimator)
+		members = self._rung_members[rung]
+		if len(completed) >= len(members):
+			num_promoted = max(int(len(members) / self._halving_factor), 1)
+		else:
+			num_promoted = int(len(completed) / self._halving_factor)
+		if num_promoted == 0:
+			return
+
+		sign = 1 if rung_scoreboard.lowest_is_best else -1
+		completed.sort(key=lambda x: sign * rung_scoreboard.get_mean_score(estimator_name=x[0], estimator_id=x[1]))
+		next_members = self._rung_members.setdefault(rung + 1, set())
+		for promoted in completed[:num_promoted]:
+			if promoted not in next_members:
+				next_members.add(promoted)
+				for task in self._produce_rung_tasks(rung=rung + 1, estimator=promoted):
+					if not self._take_cached_result(task=task):
+						self._to_do[task.id] = task
+
 	def add_validation(
 			self, data, validation,
 			id_prefix='fold_',
@@ -127,6 +304,8 @@ class CrossValidationProject(LearningProject):
 			evaluation_function=self.evaluation_function
 		)
 		task.do(namespace=self.processor.namespace, worker_id='main', return_predictions=True)
+		if self.result_store is not None and not task.has_error():
+			self.result_store.add_predictions(task=task)
 		return task
 
 	def get_complete_model(self):
@@ -141,4 +320,6 @@ class CrossValidationProject(LearningProject):
 			evaluation_function=self.evaluation_function
 		)
 		task.do(namespace=self.processor.namespace, worker_id='main', return_predictions=True)
+		if self.result_store is not None and not task.has_error():
+			self.result_store.add_predictions(task=task)
 		return task
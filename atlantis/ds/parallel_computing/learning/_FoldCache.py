@@ -0,0 +1,198 @@
+from collections import OrderedDict
+import weakref
+import numpy as np
+from pandas import DataFrame
+
+
+DEFAULT_MAX_BYTES = 256 * 2 ** 20
+
+
+class FoldArrays:
+	def __init__(self, training_x, training_y, test_x, test_y, test_not_null, x_columns):
+		"""
+		prepared arrays of one training-test slice: contiguous x matrices and y vectors,
+		the training rows with a null y are dropped and the test rows with a null y are marked by test_not_null
+		:type training_x: np.ndarray
+		:type training_y: np.ndarray
+		:type test_x: np.ndarray
+		:type test_y: np.ndarray
+		:type test_not_null: np.ndarray
+		:type x_columns: list[str]
+		:param x_columns: names of the columns of the x matrices, see get_training_x and get_test_x
+		"""
+		self.x_columns = list(x_columns)
+		self.training_x = training_x
+		self.training_y = training_y
+		self.test_x = test_x
+		self.test_y = test_y
+		self.test_not_null = test_not_null
+		for array in (training_x, training_y, test_x, test_y, test_not_null):
+			# the arrays are shared by all the estimators fitted on the slice
+			array.flags.writeable = False
+
+	def get_training_x(self):
+		"""
+		the training matrix as a data frame over the cached array, so estimators see the names of the columns
+		:rtype: DataFrame
+		"""
+		return DataFrame(self.training_x, columns=self.x_columns, copy=False)
+
+	def get_test_x(self):
+		"""
+		:rtype: DataFrame
+		"""
+		return DataFrame(self.test_x, columns=self.x_columns, copy=False)
+
+	@property
+	def nbytes(self):
+		return (
+			self.training_x.nbytes + self.training_y.nbytes + self.test_x.nbytes + self.test_y.nbytes +
+			self.test_not_null.nbytes
+		)
+
+
+class FoldCache:
+	def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+		"""
+		least recently used cache of FoldArrays with a budget in bytes, each process has its own
+		:type max_bytes: int
+		"""
+		self._max_bytes = max_bytes
+		self._entries = OrderedDict()  # key: fold key, value: (weak reference to the data, FoldArrays)
+		self._nbytes = 0
+		self._hits = 0
+		self._misses = 0
+
+	def __len__(self):
+		return len(self._entries)
+
+	def __contains__(self, key):
+		return key in self._entries
+
+	@property
+	def nbytes(self):
+		return self._nbytes
+
+	@property
+	def max_bytes(self):
+		return self._max_bytes
+
+	@max_bytes.setter
+	def max_bytes(self, max_bytes):
+		self._max_bytes = max_bytes
+		self._evict()
+
+	@property
+	def hits(self):
+		return self._hits
+
+	@property
+	def misses(self):
+		return self._misses
+
+	def get(self, key, data):
+		"""
+		:type key: tuple
+		:type data: DataFrame
+		:param data: the arrays are only returned if they were made from this very DataFrame
+		:rtype: FoldArrays or NoneType
+		"""
+		if key in self._entries:
+			data_reference, fold_arrays = self._entries[key]
+			if data_reference() is data:
+				self._entries.move_to_end(key)
+				self._hits += 1
+				return fold_arrays
+			self._remove(key=key)
+		self._misses += 1
+		return None
+
+	def put(self, key, data, fold_arrays):
+		"""
+		:type key: tuple
+		:type data: DataFrame
+		:type fold_arrays: FoldArrays
+		"""
+		if key in self._entries:
+			self._remove(key=key)
+		if fold_arrays.nbytes > self._max_bytes:
+			return
+		self._entries[key] = weakref.ref(data), fold_arrays
+		self._nbytes += fold_arrays.nbytes
+		self._evict()
+
+	def _remove(self, key):
+		data_reference, fold_arrays = self._entries.pop(key)
+		self._nbytes -= fold_arrays.nbytes
+
+	def _evict(self):
+		while self._nbytes > self._max_bytes and len(self._entries) > 0:
+			self._remove(key=next(iter(self._entries)))
+
+	def clear(self):
+		self._entries.clear()
+		self._nbytes = 0
+
+
+_FOLD_CACHE = FoldCache()
+
+
+def get_fold_cache():
+	"""
+	:rtype: FoldCache
+	"""
+	return _FOLD_CACHE
+
+
+def _get_x_dtype(data, x_columns):
+	"""
+	:rtype: np.dtype or NoneType
+	:return: float32 if all the x columns are float32, float64 if they are all numeric, None otherwise
+	"""
+	dtypes = data.dtypes[x_columns] if len(x_columns) > 0 else []
+	if len(dtypes) == 0:
+		return None
+	for dtype in dtypes:
+		if not isinstance(dtype, np.dtype) or dtype.kind not in 'biuf':
+			return None
+	if all(dtype == np.float32 for dtype in dtypes):
+		return np.dtype(np.float32)
+	return np.dtype(np.float64)
+
+
+def get_fold_arrays(training_test_slice, training_test_id, data, x_columns, y_column, fraction=None):
+	"""
+	prepares the arrays of a training-test slice once per process and keeps them in the fold cache
+	:type training_test_slice: atlantis.ds.parallel_computing.TrainingTestSlice
+	:type training_test_id: str
+	:type data: DataFrame
+	:type x_columns: list[str]
+	:type y_column: str
+	:type fraction: float or NoneType
+	:rtype: FoldArrays or NoneType
+	:return: None if some of the x columns are not numeric
+	"""
+	x_dtype = _get_x_dtype(data=data, x_columns=x_columns)
+	if x_dtype is None:
+		return None
+
+	key = training_test_id, training_test_slice.fingerprint, tuple(x_columns), y_column, fraction
+	fold_arrays = _FOLD_CACHE.get(key=key, data=data)
+	if fold_arrays is not None:
+		return fold_arrays
+
+	training_data = training_test_slice.get_training_data(data=data, fraction=fraction)
+	training_data = training_data[training_data[y_column].notna()]
+	test_data = training_test_slice.get_test_data(data=data)
+	test_y = test_data[y_column].to_numpy()
+
+	fold_arrays = FoldArrays(
+		training_x=np.ascontiguousarray(training_data[x_columns].to_numpy(dtype=x_dtype)),
+		training_y=np.ascontiguousarray(training_data[y_column].to_numpy()),
+		test_x=np.ascontiguousarray(test_data[x_columns].to_numpy(dtype=x_dtype)),
+		test_y=np.ascontiguousarray(test_y),
+		test_not_null=np.ascontiguousarray(test_data[y_column].notna().to_numpy()),
+		x_columns=x_columns
+	)
+	_FOLD_CACHE.put(key=key, data=data, fold_arrays=fold_arrays)
+	return fold_arrays
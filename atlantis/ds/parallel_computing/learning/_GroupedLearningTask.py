@@ -0,0 +1,229 @@
+from .._Task import Task
+import traceback
+
+
+# estimators whose grid members can share work when only one argument changes between them
+# 	parameter: 	the argument that changes along the path
+# 	method: 	warm_start: 		refit one estimator with warm_start=True after changing the parameter
+# 				staged: 			fit the largest model once and read each member from staged_predict
+# 				iteration_range: 	fit the largest model once and predict with the first trees (xgboost)
+# 	descending: the order of the path, regularization paths go from the sparsest model (largest alpha) down
+ESTIMATOR_FAMILIES = {
+	'Lasso': {'parameter': 'alpha', 'method': 'warm_start', 'descending': True},
+	'ElasticNet': {'parameter': 'alpha', 'method': 'warm_start', 'descending': True},
+	'MultiTaskLasso': {'parameter': 'alpha', 'method': 'warm_start', 'descending': True},
+	'MultiTaskElasticNet': {'parameter': 'alpha', 'method': 'warm_start', 'descending': True},
+	'RandomForestRegressor': {'parameter': 'n_estimators', 'method': 'warm_start', 'descending': False},
+	'RandomForestClassifier': {'parameter': 'n_estimators', 'method': 'warm_start', 'descending': False},
+	'ExtraTreesRegressor': {'parameter': 'n_estimators', 'method': 'warm_start', 'descending': False},
+	'ExtraTreesClassifier': {'parameter': 'n_estimators', 'method': 'warm_start', 'descending': False},
+	'GradientBoostingRegressor': {'parameter': 'n_estimators', 'method': 'staged', 'descending': False},
+	'GradientBoostingClassifier': {'parameter': 'n_estimators', 'method': 'staged', 'descending': False},
+	'AdaBoostRegressor': {'parameter': 'n_estimators', 'method': 'staged', 'descending': False},
+	'AdaBoostClassifier': {'parameter': 'n_estimators', 'method': 'staged', 'descending': False},
+	'XGBRegressor': {'parameter': 'n_estimators', 'method': 'iteration_range', 'descending': False},
+	'XGBClassifier': {'parameter': 'n_estimators', 'method': 'iteration_range', 'descending': False},
+}
+
+
+def get_family_key(estimator_class, estimator_arguments):
+	"""
+	estimators with the same family key differ only in the path parameter of their family
+	:type estimator_class: type
+	:type estimator_arguments: dict
+	:rtype: tuple or NoneType
+	"""
+	family = ESTIMATOR_FAMILIES.get(estimator_class.__name__)
+	if family is None or family['parameter'] not in estimator_arguments:
+		return None
+	other_arguments = {
+		key: value for key, value in estimator_arguments.items()
+		if key != family['parameter'] and key != 'warm_start'
+	}
+	try:
+		key = estimator_class, tuple(sorted(other_arguments.items()))
+		hash(key)
+		return key
+	except TypeError:
+		# arguments that cannot be sorted or hashed are compared by their representation
+		return estimator_class, repr(sorted(other_arguments.items(), key=lambda item: item[0]))
+
+
+class GroupedLearningTask(Task):
+	def __init__(self, tasks):
+		"""
+		fits the members of an estimator family on the same training-test slice in one pass along the path
+		of the family and evaluates each member, the scores are posted per member
+		:type tasks: list[LearningTask]
+		"""
+		if len(tasks) == 0:
+			raise ValueError('tasks should not be empty')
+		first = tasks[0]
+		super().__init__(project_name=first.project_name, task_id=None)
+
+		family = ESTIMATOR_FAMILIES.get(first.estimator_class.__name__)
+		if family is None:
+			raise ValueError(f'{first.estimator_name} does not belong to a known family')
+		for task in tasks:
+			if task.rung is not None or task.training_fraction is not None:
+				raise ValueError(f'task {task} is fitted on a subsample and cannot be grouped')
+			if task.training_test_id != first.training_test_id:
+				raise ValueError('tasks of a group should have the same training_test_id')
+
+		self._family = family
+		self._tasks = sorted(
+			tasks, key=lambda x: x.estimator_arguments[family['parameter']], reverse=family['descending']
+		)
+		self._id = (
+			self.project_name, first.estimator_name, tuple(task.estimator_id for task in self._tasks),
+			first.training_test_id, first.y_column
+		)
+
+	@property
+	def tasks(self):
+		"""
+		:rtype: list[LearningTask]
+		"""
+		return self._tasks
+
+	@property
+	def estimator_name(self):
+		return self._tasks[0].estimator_name
+
+	@property
+	def cpu_count(self):
+		return self._tasks[0].cpu_count
+
+	@property
+	def training_test_id(self):
+		return self._tasks[0].training_test_id
+
+	@property
+	def rung(self):
+		# grouped tasks always fit on all the training rows
+		return None
+
+	@property
+	def time_estimate_id(self):
+		return f'{self.estimator_name}_group'
+
+	def __hash__(self):
+		return hash(self.id)
+
+	@property
+	def records(self):
+		"""
+		:rtype: list[dict]
+		"""
+		return [task.record for task in self._tasks]
+
+	@property
+	def record(self):
+		return self._tasks[0].record
+
+	@property
+	def result(self):
+		result = super().result
+		result['tasks'] = {task.id: task.result for task in self._tasks}
+		return result
+
+	def set_result(self, result):
+		super().set_result(result=result)
+		for task in self._tasks:
+			task.set_result(result=result['tasks'][task.id])
+
+	def set_memory(self, memory):
+		# the members are done together, each of them gets the memory of the group
+		super().set_memory(memory=memory)
+		for task in self._tasks:
+			task.set_memory(memory=memory)
+
+	def time_out(self, worker_id, starting_time=None):
+		super().time_out(worker_id=worker_id, starting_time=starting_time)
+		for task in self._tasks:
+			task.time_out(worker_id=worker_id, starting_time=starting_time)
+
+	def _get_predictions(self, training_x, training_y, test_x):
+		"""
+		yields each member with the predictions of its estimator, in the order of the path
+		"""
+		parameter = self._family['parameter']
+		method = self._family['method']
+		first = self._tasks[0]
+
+		if method == 'warm_start':
+			estimator = first.estimator_class(**{**first.estimator_arguments, 'warm_start': True})
+			for task in self._tasks:
+				estimator.set_params(**{parameter: task.estimator_arguments[parameter]})
+				estimator.fit(X=training_x, y=training_y)
+				yield task, estimator.predict(test_x)
+
+		else:
+			last = self._tasks[-1]
+			estimator = last.estimator_class(**last.estimator_arguments)
+			estimator.fit(X=training_x, y=training_y)
+
+			if method == 'staged':
+				remaining = list(self._tasks)
+				predicted = None
+				for stage, predicted in enumerate(estimator.staged_predict(test_x), start=1):
+					while len(remaining) > 0 and remaining[0].estimator_arguments[parameter] <= stage:
+						yield remaining.pop(0), predicted
+				# boosting can stop before the last stage, the members after that get the final model
+				for task in remaining:
+					yield task, predicted
+
+			elif method == 'iteration_range':
+				for task in self._tasks:
+					yield task, estimator.predict(test_x, iteration_range=(0, task.estimator_arguments[parameter]))
+
+			else:
+				raise ValueError(f'method {method} is unknown!')
+
+	def do(self, namespace, worker_id):
+		"""
+		:type namespace: Namespace
+		:type worker_id: int or str
+		"""
+		try:
+			self.start()
+			# each member is timed from the end of the one before it, so the times of the members add up to the group
+			self._tasks[0].start()
+
+			with self.trace('data'):
+				fold_arrays = self._tasks[0].get_fold_arrays(namespace=namespace)
+				if fold_arrays is None:
+					training_x, training_y, test_x, actual_all = self._tasks[0].get_training_and_test(namespace=namespace)
+					not_null = actual_all.notna().to_numpy()
+					actual_evaluation = actual_all[not_null]
+				else:
+					training_x, training_y, test_x = (
+						fold_arrays.get_training_x(), fold_arrays.training_y, fold_arrays.get_test_x()
+					)
+					not_null = fold_arrays.test_not_null
+					actual_evaluation = fold_arrays.test_y[not_null]
+
+			# fitting and predicting are interleaved along the path, each step of the path is one fit_predict span
+			predictions = self._get_predictions(training_x=training_x, training_y=training_y, test_x=test_x)
+			for task in self._tasks:
+				if task.status == 'new':
+					task.start()
+				with self.trace('fit_predict'):
+					predicted_task, predicted_all = next(predictions)
+				if predicted_task is not task:
+					raise RuntimeError(f'{predicted_task} is predicted out of the order of the path')
+				task.set_test_predictions(predicted=predicted_all)
+				with self.trace('evaluate'):
+					task.evaluate(actual=actual_evaluation, predicted=predicted_all[not_null])
+				if task.evaluation is None:
+					raise RuntimeError('evaluation is None')
+				task.end(worker_id=worker_id)
+
+			self.end(worker_id=worker_id)
+		except Exception as error:
+			trace = traceback.format_exc()
+			self.add_error(error=error, trace=trace)
+			# the members done before the error keep their scores, see LearningProject.process_error
+			for task in self._tasks:
+				if task.status != 'done':
+					task.add_error(error=error, trace=trace)
@@ -1,11 +1,15 @@
-from pandas import concat, DataFrame
-from numpy import random
+from pandas import concat
 
 from .._Project import Project
 from ...evaluation import evaluate_regression, evaluate_classification
 from .._DataSlice import TrainingTestSlice
 from ...validation import Scoreboard, TrainingTestContainer
 from ._LearningTask import LearningTask
+from ._GroupedLearningTask import GroupedLearningTask, get_family_key
+from ._TaskScheduler import TaskScheduler
+from ._TaskTemplate import TaskTemplate
+from ._ResultCache import ResultCache, get_data_fingerprint, get_task_key
+from ._OutOfFoldPredictions import OutOfFoldPredictions
 from ....collections.OrderedSet import OrderedSet
 
 
@@ -13,7 +17,8 @@ class LearningProject(Project):
 	def __init__(
 			self, name, y_column, problem_type, x_columns=None,
 			time_unit='ms', evaluation_function=None, main_metric=None, lowest_is_best=None, best_score=None,
-			scoreboard=None, processor=None
+			scoreboard=None, processor=None, group_estimator_families=False, result_cache=None,
+			keep_out_of_fold_predictions=False
 	):
 		"""
 
@@ -42,6 +47,21 @@ class LearningProject(Project):
 
 		:type 	scoreboard: Scoreboard
 		:param 	scoreboard: a Scoreboard object that keeps score of all estimators, can be added later too
+
+		:type 	group_estimator_families: bool
+		:param 	group_estimator_families: 	if True, estimators that differ only along a path (such as the alpha of Lasso
+											or the n_estimators of a forest or of boosting) are fitted together
+											in one task per training-test slice, see GroupedLearningTask
+
+		:type 	result_cache: ResultCache or str or NoneType
+		:param 	result_cache: 	a ResultCache or the path of its SQLite file, tasks that were done in an earlier run
+								on the same data are scored from the cache instead of being sent to workers
+
+		:type 	keep_out_of_fold_predictions: bool
+		:param 	keep_out_of_fold_predictions: 	if True, workers send back the predictions of the full fits on the test rows
+												as float32 arrays and the project keeps them in out_of_fold_predictions
+												so that select_ensemble can build ensembles without fitting again;
+												tasks scored from the result cache have no predictions
 		"""
 		super().__init__(name=name, time_unit=time_unit, processor=processor)
 		self._estimators = {}
@@ -81,9 +101,27 @@ class LearningProject(Project):
 
 		if scoreboard is None:
 			scoreboard = Scoreboard(main_metric=main_metric, lowest_is_best=lowest_is_best, best_score=best_score)
+		if self.result_store is not None:
+			scoreboard.set_result_store(result_store=self.result_store, project_name=name)
 		self._scoreboard = scoreboard
+		self._scheduler = TaskScheduler(project=self)
 		self._all_tasks_produced = False
 
+		self._group_estimator_families = group_estimator_families
+		self._families = {}  # key: estimator, value: family key
+		self._family_members = {}  # key: family key, value: list of estimators
+		self._grouped_task_ids = set()  # ids of the tasks that are done as part of a GroupedLearningTask
+
+		if isinstance(result_cache, str):
+			result_cache = ResultCache(path=result_cache)
+		self._result_cache = result_cache
+		self._data_fingerprints = {}  # key: data_id
+		self._training_test_fingerprints = {}  # key: training_test_slice_id, value: (data, slice) fingerprints
+		self._result_cache_keys = {}  # key: task_id of a task that is not in the cache yet
+		self._template_id = None  # id of the current TaskTemplate in the namespace, None when it is outdated
+		self._template_task_ids = {}  # key: id of a TaskTemplate in the namespace, value: ids of its unfinished tasks
+		self._out_of_fold_predictions = OutOfFoldPredictions() if keep_out_of_fold_predictions else None
+
 	def __repr__(self):
 		lines = [
 			super().__repr__(),
@@ -147,6 +185,11 @@ class LearningProject(Project):
 
 		if add_to_training_test_ids:
 			self._training_test_slice_ids.add(training_test_slice_id)
+			if self._result_cache is not None:
+				self._add_fingerprints(
+					training_test_slice_id=training_test_slice_id, training_test_slice=training_test_slice,
+					data=data, overwrite=overwrite
+				)
 
 		self.processor.add_obj(
 			obj_type='tts', obj_id=training_test_slice_id, obj=training_test_slice,
@@ -155,8 +198,54 @@ class LearningProject(Project):
 
 		if add_to_training_test_ids:
 			self.scoreboard.add_training_test_id(training_test_id=training_test_slice_id)
+			self._scheduler.reset_priorities()
 			self._all_tasks_produced = False
 
+	def _add_fingerprints(self, training_test_slice_id, training_test_slice, data=None, overwrite=False):
+		"""
+		:type training_test_slice_id: str
+		:type training_test_slice: TrainingTestSlice
+		"""
+		data_id = training_test_slice.data_id
+		if data_id not in self._data_fingerprints or data is not None or overwrite:
+			if data is None:
+				data = self.processor.get_data(data_id=data_id)
+			self._data_fingerprints[data_id] = get_data_fingerprint(data=data)
+		self._training_test_fingerprints[training_test_slice_id] = (
+			self._data_fingerprints[data_id], training_test_slice.fingerprint
+		)
+
+	@property
+	def result_cache(self):
+		"""
+		:rtype: ResultCache or NoneType
+		"""
+		return self._result_cache
+
+	def _take_cached_result(self, task):
+		"""
+		scores a new task from the result cache if it was done in an earlier run
+		:type task: LearningTask
+		:rtype: bool
+		:return: True if the task is done from the cache
+		"""
+		if self._result_cache is None:
+			return False
+
+		data_fingerprint, training_test_fingerprint = self._training_test_fingerprints[task.training_test_id]
+		key = get_task_key(
+			task=task, data_fingerprint=data_fingerprint, training_test_fingerprint=training_test_fingerprint
+		)
+		evaluation = self._result_cache.get(key=key)
+		if evaluation is None:
+			self._result_cache_keys[task.id] = key
+			return False
+
+		task.set_cached_evaluation(evaluation=evaluation)
+		self.process(task=task)
+		self._keep_done_task(task=task)
+		return True
+
 	def add_training_test_container(self, container, training_test_slice_id=None, overwrite=False):
 		"""
 		:type training_test_slice_id: str
@@ -205,8 +294,14 @@ class LearningProject(Project):
 		estimator_name = self._get_estimator_name(estimator_class)
 		key = estimator_name, estimator_id
 		self._estimators[key] = {'class': estimator_class, 'arguments': estimator_arguments}
+		family_key = get_family_key(estimator_class=estimator_class, estimator_arguments=estimator_arguments)
+		if family_key is not None and key not in self._families:
+			self._families[key] = family_key
+			self._family_members.setdefault(family_key, []).append(key)
 		self.scoreboard.add_estimator(estimator_name=estimator_name, estimator_id=estimator_id)
+		self._scheduler.reset_priorities()
 		self._all_tasks_produced = False
+		self._template_id = None
 		return estimator_name, estimator_id
 
 	def add_estimator_repository(self, repository):
@@ -248,10 +343,72 @@ class LearningProject(Project):
 		"""
 		return self._scoreboard
 
+	def _get_template_id(self):
+		"""
+		puts the current TaskTemplate of the project in the namespace if it is not there yet
+		:rtype: str
+		"""
+		if self._template_id is None:
+			template = TaskTemplate(
+				project_name=self.name, y_column=self.y_column, x_columns=self.x_columns,
+				evaluation_function=self.evaluation_function, estimators=dict(self._estimators),
+				keep_test_predictions=self._out_of_fold_predictions is not None
+			)
+			# the id changes with the content so that workers never use an outdated template they have kept
+			template_id = f'{self.name}_{template.fingerprint[:32]}'
+			if template_id not in self._template_task_ids:
+				self.processor.add_obj(obj_type='template', obj_id=template_id, obj=template)
+				self._template_task_ids[template_id] = set()
+			self._template_id = template_id
+			self._remove_unused_templates()
+		return self._template_id
+
+	def _release_template(self, task_id):
+		"""
+		a task is finished, the template it was made from is removed when no other task needs it
+		"""
+		for task_ids in self._template_task_ids.values():
+			task_ids.discard(task_id)
+		self._remove_unused_templates()
+
+	def _remove_unused_templates(self):
+		for template_id, task_ids in list(self._template_task_ids.items()):
+			if template_id != self._template_id and len(task_ids) == 0:
+				self.processor.remove_obj(obj_type='template', obj_id=template_id)
+				del self._template_task_ids[template_id]
+
+	def get_to_do_item(self, task):
+		"""
+		a learning task goes to the workers as (template_id, estimator keys, training_test_id, training_fraction, rung),
+		the workers build the task from the TaskTemplate of the project that they get from the namespace once
+		:type task: LearningTask or GroupedLearningTask
+		:rtype: tuple or LearningTask or GroupedLearningTask
+		"""
+		if isinstance(task, GroupedLearningTask):
+			tasks = task.tasks
+		elif isinstance(task, LearningTask):
+			tasks = [task]
+		else:
+			return task
+
+		for member in tasks:
+			estimator = self._estimators.get((member.estimator_name, member.estimator_id))
+			if (
+				estimator is None or estimator['arguments'] is not member.estimator_arguments or
+				member.x_columns is not self.x_columns
+			):
+				# the task was not made from the current estimators of the project
+				return task
+
+		estimator_keys = tuple((member.estimator_name, member.estimator_id) for member in tasks)
+		template_id = self._get_template_id()
+		self._template_task_ids[template_id].add(task.id)
+		return template_id, estimator_keys, task.training_test_id, tasks[0].training_fraction, task.rung
+
 	def produce_task(
 			self, estimator_name, estimator_id, estimator_class, estimator_arguments,
 			training_test_slice_id,
-			ignore_error=False
+			ignore_error=False, training_fraction=None, rung=None
 	):
 		"""
 
@@ -261,6 +418,8 @@ class LearningProject(Project):
 		:param estimator_arguments:
 		:param training_test_slice_id:
 		:param ignore_error:
+		:param training_fraction: fraction of the training rows used for fitting
+		:param rung: rung of successive halving
 		:rtype: LearningTask
 		"""
 		if self.x_columns is None:
@@ -272,7 +431,9 @@ class LearningProject(Project):
 			estimator_arguments=estimator_arguments,
 			training_test_slice_id=training_test_slice_id,
 			y_column=self.y_column, x_columns=self.x_columns,
-			evaluation_function=self.evaluation_function
+			evaluation_function=self.evaluation_function,
+			training_fraction=training_fraction, rung=rung,
+			keep_test_predictions=self._out_of_fold_predictions is not None and rung is None
 		)
 		if self.contains_task(task_id=task.id):
 			if ignore_error:
@@ -283,6 +444,7 @@ class LearningProject(Project):
 
 	def produce_tasks(self, ignore_error=False, echo=True):
 		task_count = 0
+		cached_count = 0
 		for training_test_slice_id in self._training_test_slice_ids:
 			for estimator_name_and_id, estimator_class_and_arguments in self._estimators.items():
 				estimator_name, estimator_id = estimator_name_and_id
@@ -295,101 +457,163 @@ class LearningProject(Project):
 				)
 				if task is not None:
 					task_count += 1
+					if self._take_cached_result(task=task):
+						cached_count += 1
+						continue
 
 					self._pre_to_do[task.id] = task
+					self._scheduler.add_task(task=task)
 
 		if echo:
-			print(f'{task_count} tasks produced for project {self.name}')
+			cached = f' ({cached_count} done from the result cache)' if cached_count > 0 else ''
+			print(f'{task_count} tasks produced for project {self.name}{cached}')
 		self._all_tasks_produced = True
 
 	def _get_new_to_do_list(self, num_tasks=1, method='upper_bound', random_state=None, echo=True):
+		"""
+		:param method: upper_bound, random, or cost_aware (see TaskScheduler)
+		:rtype: list[tuple]
+		"""
 		if num_tasks > self.new_count:
 			raise ValueError(f'num_tasks {num_tasks} is too large! There are only {self.new_count} available')
 		if len(self._pre_to_do) == 0:
 			if echo:
 				print('no new tasks to fill the to-do list')
-			return None
+			return []
 
-		data = DataFrame.from_records([
-			{
-				'estimator_name': task.estimator_name, 'estimator_id': task.estimator_id,
-				'training_test_id': task.training_test_id,
-				'task_id': task.id
-			}
-			for task in self._pre_to_do.values()
-		])
-		if method == 'upper_bound':
-			mean_per_data = self.scoreboard.mean_score_per_data.rename(columns={'score': 'data_score'})
-			data = data.merge(mean_per_data, on='training_test_id', how='left')
-
-			best_per_estimator = self.scoreboard.best_possible_score_per_estimator
-			best_per_estimator = best_per_estimator.rename(columns={'score': 'estimator_score'})
-			data = data.merge(best_per_estimator, on=['estimator_name', 'estimator_id'], how='left')
-			if random_state is not None:
-				random.seed(random_state)
-
-			# we want to try the estimators that have the best shot
-			# also we want to avoid repeating the same estimator
-			# (hence estimator_repetition counts the number of
-			# times an estimator appears, we put estimator_repetition first
-			# because it is useless if it comes after estimator_score
-			# and we want to prioritize data sets that have the worst outcome, sooner rather than later
-			# on top of all that, when everything is equal, randomize
-
-			data['random'] = random.uniform(size=data.shape[0])
-			if data['estimator_score'].isnull().values.any():
-				raise RuntimeError('there are nulls among estimator_scores')
-
-			ascending = [self.scoreboard.lowest_is_best, not self.scoreboard.lowest_is_best, True]
-
-			data.sort_values(
-				by=['estimator_score', 'data_score', 'random'],
-				ascending=ascending,
-				na_position='first',
-				inplace=True
-			)
+		if random_state is not None:
+			self._scheduler.seed(random_state=random_state)
 
-			data['estimator_repetition'] = data.groupby(['estimator_name', 'estimator_id']).cumcount()
-			data.sort_values(
-				by=['estimator_repetition', 'estimator_score', 'data_score', 'random'],
-				ascending=[True] + ascending,
-				na_position='first',
-				inplace=True
-			)
+		# we want to try the estimators that have the best shot
+		# also we want to avoid repeating the same estimator
+		# (hence the scheduler takes one task per estimator in each round)
+		# and we want to prioritize data sets that have the worst outcome, sooner rather than later
+		# on top of all that, when everything is equal, randomize
+		return self._scheduler.pop(num_tasks=num_tasks, method=method)
 
-		elif method == 'random':
-			data = data.sample(frac=1, random_state=random_state)
+	def contains_task(self, task_id):
+		return super().contains_task(task_id=task_id) or task_id in self._grouped_task_ids
 
-		else:
-			raise ValueError(f'method {method} is unknown!')
+	def _get_family_tasks(self, task):
+		"""
+		new tasks of the estimators in the family of the task on the same training-test slice, including the task
+		:type task: LearningTask
+		:rtype: list[LearningTask]
+		"""
+		estimator = task.estimator_name, task.estimator_id
+		if task.rung is not None or estimator not in self._families:
+			return [task]
+		result = []
+		for estimator_name, estimator_id in self._family_members[self._families[estimator]]:
+			member_id = LearningTask.get_id(
+				project_name=self.name, estimator_name=estimator_name, estimator_id=estimator_id,
+				training_test_id=task.training_test_id, y_column=self.y_column
+			)
+			if member_id in self._pre_to_do:
+				result.append(self._pre_to_do[member_id])
+		return result
 
-		return [row['task_id'] for index, row in data.head(num_tasks).iterrows()]
+	def _add_group_to_to_do(self, tasks):
+		"""
+		:type tasks: list[LearningTask]
+		"""
+		group = GroupedLearningTask(tasks=tasks)
+		for task in tasks:
+			self._pre_to_do.pop(task.id)
+			self._scheduler.remove(task_id=task.id)
+			self._grouped_task_ids.add(task.id)
+		self._to_do[group.id] = group
 
 	def fill_to_do_list(self, num_tasks=1, method='upper_bound', random_state=None, echo=True):
 		task_ids = self._get_new_to_do_list(num_tasks=num_tasks, method=method, random_state=random_state, echo=echo)
 
 		filled_count = 0
 		for task_id in task_ids:
-			self._take_from_pre_and_add_to_to_do(task_id=task_id)
-			filled_count += 1
+			if task_id not in self._pre_to_do:
+				# already taken by the group of another task
+				continue
+
+			if self._group_estimator_families:
+				family_tasks = self._get_family_tasks(task=self._pre_to_do[task_id])
+			else:
+				family_tasks = []
+
+			if len(family_tasks) > 1:
+				self._add_group_to_to_do(tasks=family_tasks)
+				filled_count += len(family_tasks)
+			else:
+				self._take_from_pre_and_add_to_to_do(task_id=task_id)
+				filled_count += 1
 
 		if echo:
 			print(f'{filled_count} to-do tasks added to project {self.name}')
 
 	def process(self, task):
 		"""
-		:type task: LearningTask
+		:type task: LearningTask or GroupedLearningTask
 		"""
 		if task.has_error():
 			for error, trace in task.errors:
 				print(f'trace: {trace}')
 			raise task.errors[0][0]
-		if task.status != 'done':
+		if task.status != 'done' and task.status != 'timeout':
 			raise RuntimeError(f'task is not done. Task status is {task.status}')
+		self._release_template(task_id=task.id)
 
-		if not isinstance(task.evaluation, dict):
-			raise TypeError(f'evaluation is of type {type(task.evaluation)}')
-		self._scoreboard.add_task_score(task=task)
+		if isinstance(task, GroupedLearningTask):
+			for member in task.tasks:
+				self._process_learning_task(task=member)
+		else:
+			self._process_learning_task(task=task)
+
+	def process_error(self, task):
+		"""
+		the members of a group that were done before the error are processed, the others fail with the group
+		:type task: LearningTask or GroupedLearningTask
+		"""
+		self._release_template(task_id=task.id)
+		if isinstance(task, GroupedLearningTask):
+			for member in task.tasks:
+				if member.is_done():
+					self.add_time_estimate(task=member)
+					self._process_learning_task(task=member)
+
+	def add_time_estimate(self, task):
+		"""
+		:type task: LearningTask or GroupedLearningTask
+		"""
+		super().add_time_estimate(task=task)
+		if isinstance(task, GroupedLearningTask):
+			# each member is timed on its own step of the path, so the estimator gets its time also when grouped
+			for member in task.tasks:
+				if member.is_done():
+					super().add_time_estimate(task=member)
+
+	def _process_learning_task(self, task):
+		"""
+		:type task: LearningTask
+		"""
+		if task.status == 'timeout':
+			# the scoreboard records the worst score, it is not kept in the result cache
+			self._scoreboard.add_task_score(task=task)
+			self._result_cache_keys.pop(task.id, None)
+
+		else:
+			if not isinstance(task.evaluation, dict):
+				raise TypeError(f'evaluation is of type {type(task.evaluation)}')
+			self._scoreboard.add_task_score(task=task)
+			if self._out_of_fold_predictions is not None and task.test_predictions is not None:
+				self._add_out_of_fold_predictions(task=task)
+			if task.id in self._result_cache_keys:
+				self._result_cache.put(
+					key=self._result_cache_keys.pop(task.id), evaluation=task.evaluation,
+					elapsed_ms=task.get_elapsed(unit='ms')
+				)
+		if task.rung is None:
+			self._scheduler.update(
+				estimator_name=task.estimator_name, estimator_id=task.estimator_id,
+				training_test_id=task.training_test_id
+			)
 
 	def get_best_estimators(self, num_estimators=1):
 		scores = self.scoreboard.mean_score_per_estimator.sort_values(
@@ -412,3 +636,103 @@ class LearningProject(Project):
 
 	def get_best_estimator(self):
 		return self.get_best_estimators(num_estimators=1)[0]
+
+	@property
+	def out_of_fold_predictions(self):
+		"""
+		:rtype: OutOfFoldPredictions or NoneType
+		"""
+		return self._out_of_fold_predictions
+
+	def _add_out_of_fold_predictions(self, task):
+		"""
+		:type task: LearningTask
+		"""
+		if not self._out_of_fold_predictions.has_actual(training_test_id=task.training_test_id):
+			training_test_slice = self.processor.get_obj(obj_type='tts', obj_id=task.training_test_id)
+			data = self.processor.get_data(data_id=training_test_slice.data_id)
+			self._out_of_fold_predictions.set_actual(
+				training_test_id=task.training_test_id,
+				actual=training_test_slice.get_test_data(data=data)[self.y_column]
+			)
+		self._out_of_fold_predictions.add(
+			estimator_name=task.estimator_name, estimator_id=task.estimator_id,
+			training_test_id=task.training_test_id, predictions=task.test_predictions
+		)
+
+	def _get_ensemble_metric(self, metric):
+		"""
+		:rtype: (str or callable, bool)
+		"""
+		from ...ensemble.EnsembleSelection import VECTORIZED_METRICS
+
+		if metric is None:
+			metric = self.scoreboard.main_metric
+		if metric in VECTORIZED_METRICS:
+			return metric, VECTORIZED_METRICS[metric][1]
+
+		def get_scores(actual, predicted):
+			return [
+				self.evaluation_function(actual=actual, predicted=predicted_row)[metric] for predicted_row in predicted
+			]
+		get_scores.__name__ = metric
+		return get_scores, self.scoreboard.lowest_is_best
+
+	def select_ensemble(self, num_candidates=None, ensemble_size=20, metric=None):
+		"""
+		greedy ensemble selection from the out-of-fold predictions, no estimator is fitted again,
+		see atlantis.ds.ensemble.select_ensemble
+		:type num_candidates: int or NoneType
+		:param num_candidates: 	only this many of the best estimators by mean score are candidates,
+								all the estimators with predictions on every training-test slice if None
+
+		:type ensemble_size: int
+		:type metric: str or NoneType
+		:param metric: the main metric of the scoreboard if None
+		:rtype: atlantis.ds.ensemble.EnsembleSelection
+		"""
+		from ...ensemble import select_ensemble
+
+		if self._out_of_fold_predictions is None:
+			raise RuntimeError('out-of-fold predictions are not kept, use keep_out_of_fold_predictions=True')
+		training_test_ids = list(self._training_test_slice_ids)
+		estimators = self._out_of_fold_predictions.get_complete_estimators(training_test_ids=training_test_ids)
+		if len(estimators) == 0:
+			raise RuntimeError('no estimator has predictions on all the training-test slices yet')
+
+		if num_candidates is not None:
+			complete = set(estimators)
+			scores = self.scoreboard.mean_score_per_estimator.sort_values(
+				'score', ascending=self.scoreboard.lowest_is_best
+			)
+			estimators = [
+				estimator for estimator in zip(scores['estimator_name'], scores['estimator_id'])
+				if estimator in complete
+			][:num_candidates]
+
+		predictions, actual = self._out_of_fold_predictions.get_matrix(
+			estimators=estimators, training_test_ids=training_test_ids
+		)
+		metric, lowest_is_best = self._get_ensemble_metric(metric=metric)
+		return select_ensemble(
+			predictions=predictions, actual=actual, estimators=estimators, ensemble_size=ensemble_size,
+			metric=metric, lowest_is_best=lowest_is_best, problem_type=self.problem_type
+		)
+
+	def get_ensemble(self, selection=None, echo=1, **kwargs):
+		"""
+		an Ensemble of new instances of the selected estimators weighted by how many times they were picked,
+		it should be fitted on all the data
+		:type selection: atlantis.ds.ensemble.EnsembleSelection or NoneType
+		:param selection: the result of select_ensemble(**kwargs) if None
+		:rtype: atlantis.ds.ensemble.Ensemble
+		"""
+		from ...ensemble import Ensemble
+
+		if selection is None:
+			selection = self.select_ensemble(**kwargs)
+		models = [
+			self.estimators[estimator]['class'](**self.estimators[estimator]['arguments'])
+			for estimator in selection.estimators
+		]
+		return Ensemble(models=models, weights=selection.counts, problem_type=self.problem_type, echo=echo)
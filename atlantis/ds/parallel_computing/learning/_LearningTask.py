@@ -1,20 +1,28 @@
 from atlantis.ds.parallel_computing._Task import Task
 import traceback
 from pandas import DataFrame
-import shap
-from xgboost import XGBRegressor, XGBClassifier
-from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
-from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
-import matplotlib.pyplot as plt
-from ...feature_importance import get_feature_importances
 from .._get_data_from_namespace import get_obj_from_namespace, get_data_from_namespace
+from ._FoldCache import get_fold_arrays
+from ._OutOfFoldPredictions import get_compact_predictions
 
 
 class LearningTask(Task):
 	def __init__(
 			self, project_name, estimator_class, estimator_name, estimator_id, estimator_arguments,
 			training_test_slice_id, y_column, x_columns, evaluation_function,
+			training_fraction=None, rung=None, keep_test_predictions=False
 	):
+		"""
+		:type training_fraction: float or NoneType
+		:param training_fraction: fraction of the training rows used for fitting, all of them if None
+
+		:type rung: int or NoneType
+		:param rung: the rung of successive halving this task belongs to, None for a full fit
+
+		:type keep_test_predictions: bool
+		:param keep_test_predictions: 	if True, the predictions on all the test rows are sent back with the result
+										as a float32 array, see OutOfFoldPredictions
+		"""
 
 		super().__init__(project_name=project_name, task_id=None)
 		if not isinstance(estimator_id, (str, int)):
@@ -41,14 +49,32 @@ class LearningTask(Task):
 		self._y_column = y_column
 		self._x_columns = x_columns
 		self._evaluation_function = evaluation_function
+		self._training_fraction = training_fraction
+		self._rung = rung
+		self._keep_test_predictions = keep_test_predictions
+		self._test_predictions = None
 
 		self._evaluation = None
-		self._id = self.project_name, self.estimator_name, self.estimator_id, self.training_test_id, self.y_column
+		self._id = self.get_id(
+			project_name=project_name, estimator_name=estimator_name, estimator_id=estimator_id,
+			training_test_id=training_test_slice_id, y_column=y_column, rung=rung
+		)
 		self._predictions = None
 		self._trained_estimator = None
 		self._feature_importances = None
 		self._shap_values = None
 		self._training_x = None
+		self._result_store = None  # where the predictions are read from after they are spilled, see spill
+
+	@staticmethod
+	def get_id(project_name, estimator_name, estimator_id, training_test_id, y_column, rung=None):
+		"""
+		:rtype: tuple
+		"""
+		task_id = project_name, estimator_name, estimator_id, training_test_id, y_column
+		if rung is not None:
+			task_id = task_id + (rung, )
+		return task_id
 
 	@property
 	def training_test_id(self):
@@ -56,7 +82,18 @@ class LearningTask(Task):
 
 	@property
 	def time_estimate_id(self):
-		return self.estimator_name
+		if self._rung is None:
+			return self.estimator_name
+		else:
+			return f'{self.estimator_name}_rung_{self._rung}'
+
+	@property
+	def training_fraction(self):
+		return self._training_fraction
+
+	@property
+	def rung(self):
+		return self._rung
 
 	@property
 	def status(self):
@@ -81,6 +118,15 @@ class LearningTask(Task):
 	def estimator_arguments(self):
 		return self._estimator_arguments
 
+	@property
+	def cpu_count(self):
+		"""
+		n_jobs of the estimator, estimators without it get one cpu and their BLAS and OpenMP threads are limited to it
+		:rtype: int
+		"""
+		n_jobs = self._estimator_arguments.get('n_jobs')
+		return 1 if n_jobs is None else n_jobs
+
 	@property
 	def y_column(self):
 		return self._y_column
@@ -93,34 +139,112 @@ class LearningTask(Task):
 	def evaluation(self):
 		return self._evaluation
 
+	@property
+	def keep_test_predictions(self):
+		return self._keep_test_predictions
+
+	@property
+	def test_predictions(self):
+		"""
+		predictions on all the test rows in the order of the test data if keep_test_predictions is True
+		:rtype: np.ndarray or NoneType
+		"""
+		return self._test_predictions
+
+	def set_test_predictions(self, predicted):
+		"""
+		keeps a compact copy of the predictions on the test rows if the task should keep them
+		:type predicted: np.ndarray
+		"""
+		if self._keep_test_predictions:
+			self._test_predictions = get_compact_predictions(predicted)
+
 	def evaluate(self, actual, predicted):
 		self._evaluation = self._evaluation_function(actual=actual, predicted=predicted)
 
+	def set_cached_evaluation(self, evaluation):
+		"""
+		marks the task as done with the evaluation of the same task from an earlier run
+		:type evaluation: dict
+		"""
+		self._evaluation = evaluation
+		self._status = 'done'
+		self._worker_id = 'cache'
+
 	@property
 	def record(self):
 		"""
 		:rtype: dict
 		"""
 		evaluation = self.evaluation or {}
+		memory = {
+			key: value for key, value in (self.memory or {}).items()
+			if key in ('rss_before', 'rss_after', 'peak_rss', 'peak_increase', 'python_peak')
+		}
 
 		return {
 			'project_name': self.project_name,
 			'estimator_name': self.estimator_name,
 			'estimator_id': self.estimator_id,
 			'training_test_id': self._training_test_id,
+			'rung': self._rung,
+			'training_fraction': self._training_fraction,
 			'worker_id': self._worker_id,
 			'status': self._status,
 			'starting_time': self.starting_time,
 			'ending_time': self.ending_time,
 			'elapsed_ms': self.get_elapsed(unit='ms'),
+			**memory,
 			**evaluation
 		}
 
+	@property
+	def result(self):
+		"""
+		the evaluation and the status of the task, the predictions and the trained estimator only if they were made
+		:rtype: dict
+		"""
+		result = super().result
+		result['evaluation'] = self._evaluation
+		if self._test_predictions is not None:
+			result['test_predictions'] = self._test_predictions
+		if self._predictions is not None:
+			result['predictions'] = self._predictions
+			result['trained_estimator'] = self._trained_estimator
+			result['feature_importances'] = self._feature_importances
+			result['shap_values'] = self._shap_values
+			result['training_x'] = self._training_x
+		return result
+
+	def set_result(self, result):
+		super().set_result(result=result)
+		self._evaluation = result['evaluation']
+		if 'test_predictions' in result:
+			self._test_predictions = result['test_predictions']
+		if 'predictions' in result:
+			self._predictions = result['predictions']
+			self._trained_estimator = result['trained_estimator']
+			self._feature_importances = result['feature_importances']
+			self._shap_values = result['shap_values']
+			self._training_x = result['training_x']
+
+	def spill(self, result_store):
+		"""
+		drops the predictions and the feature importances after the result store has written them,
+		they are read from the result store when they are used
+		:type result_store: atlantis.ds.parallel_computing.ResultStore
+		"""
+		self._result_store = result_store
+		self._predictions = None
+		self._feature_importances = None
+
 	@property
 	def predictions(self):
 		"""
 		:rtype: DataFrame
 		"""
+		if self._predictions is None and self._result_store is not None:
+			return self._result_store.read_predictions(task_id=self.id)
 		if self._predictions is None:
 			raise RuntimeError('predictions not available. you should run do() with return_predictions=True')
 		return self._predictions
@@ -139,8 +263,49 @@ class LearningTask(Task):
 		"""
 		:rtype: dict
 		"""
+		if self._feature_importances is None and self._result_store is not None:
+			return self._result_store.read_task_feature_importances(task_id=self.id, project_name=self.project_name)
 		return self._feature_importances
 
+	def get_training_and_test(self, namespace):
+		"""
+		:type namespace: Namespace
+		:rtype: (DataFrame, Series, DataFrame, Series)
+		:return: training_x, training_y, test_x, actual_all (y of the test rows including the nulls)
+		"""
+		training_test_slice = get_obj_from_namespace(
+			namespace=namespace,
+			obj_type='tts', obj_id=self.training_test_id
+		)
+		data = get_data_from_namespace(namespace=namespace, data_id=training_test_slice.data_id)
+
+		training_data = training_test_slice.get_training_data(data=data, fraction=self.training_fraction)
+		training_data = training_data[training_data[self.y_column].notna()]
+
+		test_data = training_test_slice.get_test_data(data=data)
+		return (
+			training_data[self.x_columns], training_data[self.y_column],
+			test_data[self.x_columns], test_data[self.y_column]
+		)
+
+	def get_fold_arrays(self, namespace):
+		"""
+		numpy arrays of the training-test slice, they are kept in the fold cache of the process
+		so all the estimators fitted on the same slice share them
+		:type namespace: Namespace
+		:rtype: FoldArrays or NoneType
+		:return: None if some x columns are not numeric, then get_training_and_test should be used
+		"""
+		training_test_slice = get_obj_from_namespace(
+			namespace=namespace,
+			obj_type='tts', obj_id=self.training_test_id
+		)
+		data = get_data_from_namespace(namespace=namespace, data_id=training_test_slice.data_id)
+		return get_fold_arrays(
+			training_test_slice=training_test_slice, training_test_id=self.training_test_id, data=data,
+			x_columns=self.x_columns, y_column=self.y_column, fraction=self.training_fraction
+		)
+
 	def do(self, namespace, worker_id, return_predictions=False):
 		"""
 		:type namespace: Namespace
@@ -150,34 +315,51 @@ class LearningTask(Task):
 			self.start()
 
 			estimator = self.estimator_class(**self.estimator_arguments)
-			training_test_slice = get_obj_from_namespace(
-				namespace=namespace,
-				obj_type='tts', obj_id=self.training_test_id
-			)
-			data = get_data_from_namespace(namespace=namespace, data_id=training_test_slice.data_id)
-
-			training_data = training_test_slice.get_training_data(data=data)
-			training_data = training_data[training_data[self.y_column].notna()]
 
-			test_data = training_test_slice.get_test_data(data=data)
-
-			training_x = training_data[self.x_columns]
-			training_y = training_data[self.y_column]
-			estimator.fit(X=training_x, y=training_y)
-
-			test_x = test_data[self.x_columns]
-			actual_all = test_data[self.y_column]
-			actual_evaluation = test_data[test_data[self.y_column].notna()][self.y_column]
-			predicted_all = estimator.predict(test_x)
-			predicted_evaluation = predicted_all[test_data[self.y_column].notna()]
+			# predictions and feature importances need the data frames, scores only need the cached arrays
+			with self.trace('data'):
+				fold_arrays = None if return_predictions else self.get_fold_arrays(namespace=namespace)
+			if fold_arrays is not None:
+				with self.trace('fit'):
+					estimator.fit(X=fold_arrays.get_training_x(), y=fold_arrays.training_y)
+				with self.trace('predict'):
+					actual_evaluation = fold_arrays.test_y[fold_arrays.test_not_null]
+					predicted_all = estimator.predict(fold_arrays.get_test_x())
+					predicted_evaluation = predicted_all[fold_arrays.test_not_null]
+					self.set_test_predictions(predicted=predicted_all)
+				with self.trace('evaluate'):
+					self.evaluate(actual=actual_evaluation, predicted=predicted_evaluation)
+				if self._evaluation is None:
+					raise RuntimeError('evaluation is None')
+				self.end(worker_id=worker_id)
+				return
+
+			with self.trace('data'):
+				training_x, training_y, test_x, actual_all = self.get_training_and_test(namespace=namespace)
+			with self.trace('fit'):
+				estimator.fit(X=training_x, y=training_y)
+
+			with self.trace('predict'):
+				actual_evaluation = actual_all[actual_all.notna()]
+				predicted_all = estimator.predict(test_x)
+				predicted_evaluation = predicted_all[actual_all.notna()]
+				self.set_test_predictions(predicted=predicted_all)
 
 			if return_predictions:
-				result = test_x
+				# shap, xgboost, and the feature importances are only needed here, importing them is slow
+				import shap
+				from xgboost import XGBRegressor, XGBClassifier
+				from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
+				from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+				from ...feature_importance import get_feature_importances
+
+				result = test_x.copy()
 				result['actual'] = actual_all
 				result['predicted'] = predicted_all
 				self._trained_estimator = estimator
 				self._predictions = result
-				self._feature_importances = get_feature_importances(model=estimator, columns=self.x_columns)
+				with self.trace('feature_importances'):
+					self._feature_importances = get_feature_importances(model=estimator, columns=self.x_columns)
 				if isinstance(
 					self.trained_estimator,
 					(
@@ -186,11 +368,13 @@ class LearningTask(Task):
 						DecisionTreeRegressor, DecisionTreeClassifier
 					)
 				):
-					explainer = shap.TreeExplainer(self.trained_estimator)
-					self._shap_values = explainer.shap_values(training_x)
+					with self.trace('shap'):
+						explainer = shap.TreeExplainer(self.trained_estimator)
+						self._shap_values = explainer.shap_values(training_x)
 					self._training_x = training_x
 
-			self.evaluate(actual=actual_evaluation, predicted=predicted_evaluation)
+			with self.trace('evaluate'):
+				self.evaluate(actual=actual_evaluation, predicted=predicted_evaluation)
 			if self._evaluation is None:
 				raise RuntimeError('evaluation is None')
 
@@ -199,6 +383,9 @@ class LearningTask(Task):
 			self.add_error(error=error, trace=traceback.format_exc())
 
 	def plot_shap(self, plot_type='bar', show=True, path=None, width=16, height=12):
+		import shap
+		import matplotlib.pyplot as plt
+
 		if show:
 			shap.summary_plot(self._shap_values, self._training_x, show=show, plot_type=plot_type)
 		else:
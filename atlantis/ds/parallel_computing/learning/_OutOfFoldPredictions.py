@@ -0,0 +1,112 @@
+import numpy as np
+
+
+def get_compact_predictions(predicted):
+	"""
+	float32 copy of numeric predictions, other predictions such as str labels are kept as they are
+	:type predicted: np.ndarray or Series
+	:rtype: np.ndarray
+	"""
+	predicted = np.asarray(predicted)
+	if predicted.dtype.kind in 'biuf':
+		return predicted.astype(np.float32)
+	return predicted
+
+
+class OutOfFoldPredictions:
+	def __init__(self):
+		"""
+		predictions of estimators on the test rows of training-test slices, kept by the project in the main process
+		so that ensembles of the estimators can be built and scored without fitting them again
+		"""
+		self._predictions = {}  # key: (estimator_name, estimator_id, training_test_id), value: np.ndarray
+		self._actual = {}  # key: training_test_id, value: y of the test rows
+		self._not_null = {}  # key: training_test_id, value: mask of the test rows with a y
+
+	def __repr__(self):
+		return f'OutOfFoldPredictions: {len(self)} predictions ({self.nbytes / 2 ** 20:.1f} MB)'
+
+	def __len__(self):
+		return len(self._predictions)
+
+	def __contains__(self, key):
+		return key in self._predictions
+
+	@property
+	def nbytes(self):
+		return sum(predictions.nbytes for predictions in self._predictions.values())
+
+	@property
+	def training_test_ids(self):
+		"""
+		:rtype: list[str]
+		"""
+		return list(self._actual.keys())
+
+	def has_actual(self, training_test_id):
+		return training_test_id in self._actual
+
+	def set_actual(self, training_test_id, actual):
+		"""
+		:type training_test_id: str
+		:type actual: Series
+		:param actual: y of the test rows of the slice including the nulls, in the order of the predictions
+		"""
+		self._not_null[training_test_id] = actual.notna().to_numpy()
+		self._actual[training_test_id] = get_compact_predictions(actual)
+
+	def add(self, estimator_name, estimator_id, training_test_id, predictions):
+		"""
+		:type estimator_name: str
+		:type estimator_id: int or str
+		:type training_test_id: str
+		:type predictions: np.ndarray
+		"""
+		if training_test_id not in self._actual:
+			raise KeyError(f'actual values of training_test_id {training_test_id} should be set first')
+		if len(predictions) != len(self._actual[training_test_id]):
+			raise ValueError(
+				f'{len(predictions)} predictions for {len(self._actual[training_test_id])} rows of {training_test_id}'
+			)
+		self._predictions[(estimator_name, estimator_id, training_test_id)] = predictions
+
+	def get(self, estimator_name, estimator_id, training_test_id):
+		"""
+		:rtype: np.ndarray
+		"""
+		return self._predictions[(estimator_name, estimator_id, training_test_id)]
+
+	def get_complete_estimators(self, training_test_ids=None):
+		"""
+		estimators with predictions on all the training-test slices
+		:type training_test_ids: list[str] or NoneType
+		:rtype: list[(str, int or str)]
+		"""
+		training_test_ids = self.training_test_ids if training_test_ids is None else training_test_ids
+		counts = {}
+		for estimator_name, estimator_id, training_test_id in self._predictions.keys():
+			if training_test_id in training_test_ids:
+				key = estimator_name, estimator_id
+				counts[key] = counts.get(key, 0) + 1
+		return [estimator for estimator, count in counts.items() if count == len(training_test_ids)]
+
+	def get_matrix(self, estimators, training_test_ids=None):
+		"""
+		predictions of the estimators on the test rows of all the slices, the rows without a y are left out
+		:type estimators: list[(str, int or str)]
+		:type training_test_ids: list[str] or NoneType
+		:rtype: (np.ndarray, np.ndarray)
+		:return: predictions with one row per estimator and one column per test row, and the actual values
+		"""
+		training_test_ids = self.training_test_ids if training_test_ids is None else training_test_ids
+		actual = np.concatenate([
+			self._actual[training_test_id][self._not_null[training_test_id]] for training_test_id in training_test_ids
+		])
+		predictions = np.stack([
+			np.concatenate([
+				self._predictions[(estimator_name, estimator_id, training_test_id)][self._not_null[training_test_id]]
+				for training_test_id in training_test_ids
+			])
+			for estimator_name, estimator_id in estimators
+		])
+		return predictions, actual
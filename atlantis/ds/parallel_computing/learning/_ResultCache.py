@@ -0,0 +1,179 @@
+from pandas.util import hash_pandas_object
+from functools import partial
+from types import CodeType
+import hashlib
+import pickle
+import sqlite3
+import sys
+
+from ....hash import hash_object
+
+
+def _get_qualified_name(obj):
+	return f'{getattr(obj, "__module__", None)}.{getattr(obj, "__qualname__", repr(obj))}'
+
+
+def _get_version(obj):
+	# results of an estimator can change with the version of the library it comes from
+	module_name = getattr(obj, '__module__', None) or ''
+	module = sys.modules.get(module_name.split('.')[0])
+	return getattr(module, '__version__', None)
+
+
+def _update_with_code(hash_maker, code):
+	hash_maker.update(code.co_code)
+	hash_maker.update(repr((code.co_names, code.co_varnames)).encode())
+	for constant in code.co_consts:
+		# nested functions and comprehensions are code objects, their repr has an address
+		if isinstance(constant, CodeType):
+			_update_with_code(hash_maker=hash_maker, code=constant)
+		else:
+			hash_maker.update(repr(constant).encode())
+
+
+def get_function_fingerprint(function):
+	"""
+	hash of what a function does rather than of its name, so that lambdas of the same module
+	or a function that is edited between runs do not share a key:
+	functions are hashed by their byte code, constants, defaults, and the values they close over,
+	a functools.partial by its function and arguments, and other callables by their content pickled with dill
+	:type function: callable or NoneType
+	:rtype: str or NoneType
+	"""
+	if function is None:
+		return None
+	hash_maker = hashlib.sha256()
+	if isinstance(function, partial):
+		hash_maker.update(get_function_fingerprint(function.func).encode())
+		hash_maker.update(hash_object((function.args, function.keywords)).encode())
+	elif hasattr(function, '__code__'):
+		hash_maker.update(_get_qualified_name(function).encode())
+		_update_with_code(hash_maker=hash_maker, code=function.__code__)
+		hash_maker.update(hash_object((function.__defaults__, function.__kwdefaults__)).encode())
+		for cell in function.__closure__ or ():
+			try:
+				value = cell.cell_contents
+			except ValueError:
+				# a cell that is not filled yet
+				continue
+			if callable(value):
+				hash_maker.update(get_function_fingerprint(value).encode())
+			else:
+				hash_maker.update(hash_object(value).encode())
+	else:
+		import dill
+		try:
+			hash_maker.update(dill.dumps(function))
+		except Exception:
+			hash_maker.update(_get_qualified_name(function).encode())
+	return hash_maker.hexdigest()
+
+
+def get_data_fingerprint(data):
+	"""
+	hash of the content of a DataFrame including its index, columns, and dtypes
+	:type data: DataFrame
+	:rtype: str
+	"""
+	hash_maker = hashlib.sha256()
+	hash_maker.update(repr(list(data.columns)).encode())
+	hash_maker.update(repr([str(dtype) for dtype in data.dtypes]).encode())
+	try:
+		hash_maker.update(hash_pandas_object(data, index=True).to_numpy().tobytes())
+	except TypeError:
+		# columns with unhashable values such as lists
+		hash_maker.update(pickle.dumps(data))
+	return hash_maker.hexdigest()
+
+
+def get_task_key(task, data_fingerprint, training_test_fingerprint):
+	"""
+	the key of the result of a LearningTask, it is the same for every run that fits the same estimator
+	with the same arguments on the same rows and columns and evaluates it the same way;
+	arguments are hashed through their repr, so an argument whose repr has the address of an object,
+	e.g. an estimator instance without its own __repr__, gives a new key in every run and never hits the cache
+	:type task: LearningTask
+	:type data_fingerprint: str
+	:type training_test_fingerprint: (str, str)
+	:rtype: str
+	"""
+	items = (
+		_get_qualified_name(task.estimator_class), _get_version(task.estimator_class),
+		hash_object(task.estimator_arguments),
+		data_fingerprint, training_test_fingerprint,
+		tuple(task.x_columns), task.y_column, task.training_fraction,
+		get_function_fingerprint(task._evaluation_function)
+	)
+	return hashlib.sha256(repr(items).encode()).hexdigest()
+
+
+class ResultCache:
+	def __init__(self, path):
+		"""
+		keeps the evaluations of learning tasks in a SQLite file so that they survive between runs
+		:type path: str
+		"""
+		self._path = path
+		self._connection = sqlite3.connect(path)
+		self._connection.execute(
+			'CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, evaluation BLOB, elapsed_ms REAL)'
+		)
+		self._connection.commit()
+		self._hits = 0
+		self._misses = 0
+
+	def __repr__(self):
+		return f'ResultCache: {self._path} ({len(self)} results)'
+
+	def __len__(self):
+		return self._connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+	def __contains__(self, key):
+		return self._connection.execute('SELECT 1 FROM results WHERE key = ?', (key, )).fetchone() is not None
+
+	def __getstate__(self):
+		raise TypeError('ResultCache belongs to the main process and cannot be sent to workers')
+
+	@property
+	def path(self):
+		return self._path
+
+	@property
+	def hits(self):
+		return self._hits
+
+	@property
+	def misses(self):
+		return self._misses
+
+	def get(self, key):
+		"""
+		:type key: str
+		:rtype: dict or NoneType
+		:return: the evaluation or None if the key is not in the cache
+		"""
+		row = self._connection.execute('SELECT evaluation FROM results WHERE key = ?', (key, )).fetchone()
+		if row is None:
+			self._misses += 1
+			return None
+		self._hits += 1
+		return pickle.loads(row[0])
+
+	def put(self, key, evaluation, elapsed_ms=None):
+		"""
+		:type key: str
+		:type evaluation: dict
+		:type elapsed_ms: float or NoneType
+		"""
+		self._connection.execute(
+			'INSERT OR REPLACE INTO results (key, evaluation, elapsed_ms) VALUES (?, ?, ?)',
+			(key, pickle.dumps(evaluation), elapsed_ms)
+		)
+		self._connection.commit()
+
+	def clear(self):
+		self._connection.execute('DELETE FROM results')
+		self._connection.commit()
+
+	def close(self):
+		self._connection.close()
@@ -0,0 +1,330 @@
+import heapq
+from math import isfinite
+from numpy import random
+
+from .._TimeEstimate import MissingTimeEstimate
+
+
+class TaskScheduler:
+	METHODS = ('upper_bound', 'random', 'cost_aware')
+
+	def __init__(self, project, random_state=None):
+		"""
+		keeps the new tasks of a LearningProject in heaps so that choosing the next tasks does not sort all of them,
+		when a score arrives only the priorities of its estimator and its training-test slice change
+
+		methods:
+			upper_bound: 	estimators with the best possible score first, one task per estimator in each round,
+							training-test slices that are unmeasured or have the worst mean score first
+			random: 		uniformly random
+			cost_aware: 	like upper_bound but estimators are ranked by the expected improvement over
+							the best mean score divided by the estimated time of the estimator
+
+		:type project: LearningProject
+		:type random_state: int or NoneType
+		"""
+		self._project = project
+		self._random = random.RandomState(random_state)
+
+		self._task_ids = {}  # key: (estimator_name, estimator_id), value: {training_test_id: task_id}
+		self._locations = {}  # key: task_id, value: (estimator, training_test_id)
+		self._random_task_ids = []
+		self._random_positions = {}
+
+		self._estimator_versions = {}
+		self._training_test_versions = {}
+
+		# upper_bound uses one heap of estimators, cost_aware uses one heap per estimator name because
+		# estimators with the same name share a time estimate, so their order does not depend on time
+		self._built_methods = set()
+		self._estimator_heaps = {}  # key: heap key, value: heap of (priority, tie, estimator, version)
+		self._estimators_in_heap = {}  # key: heap key, value: set of estimators that have an entry in the heap
+		self._training_test_heaps = {}  # key: estimator, value: heap of (priority, tie, training_test_id, version)
+
+		self._incumbent = None  # best mean score
+		self._incumbent_estimator = None
+
+	def __len__(self):
+		return len(self._random_task_ids)
+
+	def seed(self, random_state):
+		self._random = random.RandomState(random_state)
+
+	@property
+	def scoreboard(self):
+		"""
+		:rtype: atlantis.ds.validation.Scoreboard
+		"""
+		return self._project.scoreboard
+
+	def add_task(self, task):
+		"""
+		:type task: LearningTask
+		"""
+		estimator = task.estimator_name, task.estimator_id
+		training_test_id = task.training_test_id
+		if estimator not in self._task_ids:
+			self._task_ids[estimator] = {}
+			self._estimator_versions[estimator] = 0
+		if training_test_id not in self._training_test_versions:
+			self._training_test_versions[training_test_id] = 0
+
+		self._task_ids[estimator][training_test_id] = task.id
+		self._locations[task.id] = estimator, training_test_id
+		self._random_positions[task.id] = len(self._random_task_ids)
+		self._random_task_ids.append(task.id)
+
+		if estimator in self._training_test_heaps:
+			self._push_training_test(estimator=estimator, training_test_id=training_test_id)
+		for method in self._built_methods:
+			heap_key = self._get_heap_key(method=method, estimator=estimator)
+			if estimator not in self._estimators_in_heap.get(heap_key, ()):
+				self._push_estimator(heap_key=heap_key, estimator=estimator)
+
+	def reset_priorities(self):
+		"""
+		drops all heaps, they are rebuilt when needed;
+		this is necessary when estimators or training-test slices are added because all the priorities change
+		"""
+		self._built_methods = set()
+		self._estimator_heaps = {}
+		self._estimators_in_heap = {}
+		self._training_test_heaps = {}
+		self._update_incumbent()
+
+	def update(self, estimator_name, estimator_id, training_test_id):
+		"""
+		marks the priorities that change when a new score arrives
+		"""
+		estimator = estimator_name, estimator_id
+		self._estimator_versions[estimator] = self._estimator_versions.get(estimator, 0) + 1
+		self._training_test_versions[training_test_id] = self._training_test_versions.get(training_test_id, 0) + 1
+
+		mean_score = self.scoreboard.get_mean_score(estimator_name=estimator_name, estimator_id=estimator_id)
+		if mean_score is None:
+			# the estimator has no score or timeout on the main scoreboard yet
+			return
+		if self._incumbent is None or self._sign() * mean_score < self._sign() * self._incumbent:
+			self._incumbent = mean_score
+			self._incumbent_estimator = estimator
+		elif estimator == self._incumbent_estimator:
+			# the best estimator got worse, another one might be the best now
+			self._update_incumbent()
+
+	def _update_incumbent(self):
+		self._incumbent_estimator, self._incumbent = self.scoreboard.get_best_mean_score()
+
+	# priorities: lower comes first
+
+	def _sign(self):
+		return 1 if self.scoreboard.lowest_is_best else -1
+
+	def _get_training_test_priority(self, training_test_id):
+		# unmeasured slices first, then the slices with the worst mean score
+		mean_score = self.scoreboard.get_mean_score_per_training_test(training_test_id=training_test_id)
+		if mean_score is None:
+			return 0, 0
+		return 1, -self._sign() * mean_score
+
+	def _get_estimator_priority(self, estimator):
+		estimator_name, estimator_id = estimator
+		best_possible = self.scoreboard.get_best_possible_score(
+			estimator_name=estimator_name, estimator_id=estimator_id
+		)
+		return self._sign() * best_possible
+
+	def _get_improvement_per_time(self, estimator):
+		"""
+		expected improvement of the estimator over the best mean score divided by its estimated time
+		:rtype: float
+		"""
+		estimator_name, estimator_id = estimator
+		if self._incumbent is None or not isfinite(self._incumbent):
+			improvement = 1
+		else:
+			best_possible = self.scoreboard.get_best_possible_score(
+				estimator_name=estimator_name, estimator_id=estimator_id
+			)
+			if isfinite(best_possible):
+				improvement = max(self._sign() * (self._incumbent - best_possible), 0)
+			else:
+				# timed out everywhere, or a worst score of inf
+				improvement = 0
+
+		estimate = self._project.get_time_estimate_by_id(time_estimate_id=estimator_name)
+		if estimate == MissingTimeEstimate() or estimate <= 0:
+			estimate = 1
+		return improvement / estimate
+
+	# heaps
+
+	@staticmethod
+	def _get_heap_key(method, estimator):
+		if method == 'cost_aware':
+			return method, estimator[0]
+		else:
+			return method
+
+	def _push_estimator(self, heap_key, estimator):
+		if heap_key not in self._estimator_heaps:
+			self._estimator_heaps[heap_key] = []
+			self._estimators_in_heap[heap_key] = set()
+		priority = self._get_estimator_priority(estimator=estimator)
+		entry = priority, self._random.uniform(), estimator, self._estimator_versions[estimator]
+		heapq.heappush(self._estimator_heaps[heap_key], entry)
+		self._estimators_in_heap[heap_key].add(estimator)
+
+	def _push_training_test(self, estimator, training_test_id):
+		priority = self._get_training_test_priority(training_test_id=training_test_id)
+		entry = priority, self._random.uniform(), training_test_id, self._training_test_versions[training_test_id]
+		heapq.heappush(self._training_test_heaps[estimator], entry)
+
+	def _build(self, method):
+		if method not in self._built_methods:
+			self._built_methods.add(method)
+			for estimator, task_ids in self._task_ids.items():
+				if len(task_ids) > 0:
+					self._push_estimator(heap_key=self._get_heap_key(method=method, estimator=estimator), estimator=estimator)
+
+	def _peek_estimator(self, heap_key):
+		"""
+		drops exhausted estimators and refreshes outdated ones at the top of the heap
+		:rtype: tuple or NoneType
+		"""
+		heap = self._estimator_heaps[heap_key]
+		while len(heap) > 0:
+			priority, tie, estimator, version = heap[0]
+			if len(self._task_ids[estimator]) == 0:
+				heapq.heappop(heap)
+				self._estimators_in_heap[heap_key].discard(estimator)
+			elif version != self._estimator_versions[estimator]:
+				heapq.heappop(heap)
+				self._push_estimator(heap_key=heap_key, estimator=estimator)
+			else:
+				return estimator
+		return None
+
+	def _pop_estimator(self, method):
+		"""
+		:rtype: tuple or NoneType
+		"""
+		self._build(method=method)
+		if method == 'cost_aware':
+			best_heap_key = None
+			best_value = None
+			for heap_key in self._estimator_heaps.keys():
+				if heap_key[0] != method:
+					continue
+				estimator = self._peek_estimator(heap_key=heap_key)
+				if estimator is None:
+					continue
+				value = self._get_improvement_per_time(estimator=estimator)
+				if best_value is None or value > best_value:
+					best_heap_key = heap_key
+					best_value = value
+		else:
+			best_heap_key = method
+			if best_heap_key not in self._estimator_heaps or self._peek_estimator(heap_key=best_heap_key) is None:
+				best_heap_key = None
+
+		if best_heap_key is None:
+			return None
+		priority, tie, estimator, version = heapq.heappop(self._estimator_heaps[best_heap_key])
+		self._estimators_in_heap[best_heap_key].discard(estimator)
+		return estimator
+
+	def _pop_task_of_estimator(self, estimator):
+		"""
+		:rtype: tuple or NoneType
+		"""
+		task_ids = self._task_ids[estimator]
+		if estimator not in self._training_test_heaps:
+			self._training_test_heaps[estimator] = []
+			for training_test_id in task_ids.keys():
+				self._push_training_test(estimator=estimator, training_test_id=training_test_id)
+
+		heap = self._training_test_heaps[estimator]
+		while len(heap) > 0:
+			priority, tie, training_test_id, version = heapq.heappop(heap)
+			if training_test_id not in task_ids:
+				continue
+			if version != self._training_test_versions[training_test_id]:
+				self._push_training_test(estimator=estimator, training_test_id=training_test_id)
+				continue
+			task_id = task_ids[training_test_id]
+			self._remove(estimator=estimator, training_test_id=training_test_id)
+			return task_id
+		return None
+
+	def remove(self, task_id):
+		"""
+		removes a task that is taken out of the project without being popped, e.g. when it joins a group
+		"""
+		if task_id in self._locations:
+			estimator, training_test_id = self._locations[task_id]
+			self._remove(estimator=estimator, training_test_id=training_test_id)
+
+	def _remove(self, estimator, training_test_id):
+		task_id = self._task_ids[estimator].pop(training_test_id)
+		del self._locations[task_id]
+
+		# swap with the last one to remove from the list in constant time
+		position = self._random_positions.pop(task_id)
+		last_task_id = self._random_task_ids.pop()
+		if last_task_id != task_id:
+			self._random_task_ids[position] = last_task_id
+			self._random_positions[last_task_id] = position
+
+	def _is_new(self, task_id):
+		return task_id in self._project._pre_to_do
+
+	def _push_back(self, method, estimators):
+		for estimator in estimators:
+			if len(self._task_ids[estimator]) > 0:
+				self._push_estimator(heap_key=self._get_heap_key(method=method, estimator=estimator), estimator=estimator)
+
+	def _pop_by_priority(self, num_tasks, method):
+		result = []
+		used = []
+		while len(result) < num_tasks and len(self) > 0:
+			estimator = self._pop_estimator(method=method)
+			if estimator is None:
+				# every estimator has given one task in this round, start the next round
+				if len(used) == 0:
+					break
+				self._push_back(method=method, estimators=used)
+				used = []
+				continue
+
+			used.append(estimator)
+			task_id = self._pop_task_of_estimator(estimator=estimator)
+			if task_id is not None and self._is_new(task_id):
+				result.append(task_id)
+
+		self._push_back(method=method, estimators=used)
+		return result
+
+	def _pop_randomly(self, num_tasks):
+		result = []
+		while len(result) < num_tasks and len(self) > 0:
+			task_id = self._random_task_ids[self._random.randint(len(self._random_task_ids))]
+			estimator, training_test_id = self._locations[task_id]
+			self._remove(estimator=estimator, training_test_id=training_test_id)
+			if self._is_new(task_id):
+				result.append(task_id)
+		return result
+
+	def pop(self, num_tasks=1, method='upper_bound'):
+		"""
+		removes the next tasks from the scheduler and returns their ids
+		:type num_tasks: int
+		:type method: str
+		:rtype: list[tuple]
+		"""
+		if method not in self.METHODS:
+			raise ValueError(f'method {method} is unknown!')
+
+		if method == 'random':
+			return self._pop_randomly(num_tasks=num_tasks)
+		else:
+			return self._pop_by_priority(num_tasks=num_tasks, method=method)
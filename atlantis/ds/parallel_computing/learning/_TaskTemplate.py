@@ -0,0 +1,106 @@
+import hashlib
+
+from ._LearningTask import LearningTask
+from ._GroupedLearningTask import GroupedLearningTask
+from ._ResultCache import get_function_fingerprint, _get_qualified_name
+from .._get_data_from_namespace import get_obj_from_namespace
+from ....hash import hash_object
+
+
+# each worker fetches a template from the namespace once and keeps only the latest template of each project
+_TEMPLATES = {}
+
+
+class TaskTemplate:
+	def __init__(self, project_name, y_column, x_columns, evaluation_function, estimators, keep_test_predictions=False):
+		"""
+		the parts of the learning tasks of a project that are the same for all of them,
+		it is put in the namespace once so that the items of the to-do queue only carry ids
+		:type project_name: str
+		:type y_column: str
+		:type x_columns: list[str]
+		:type evaluation_function: callable
+		:type estimators: dict[(str, int or str), dict]
+		:param estimators: key: (estimator_name, estimator_id), value: {'class': ..., 'arguments': ...}
+
+		:type keep_test_predictions: bool
+		:param keep_test_predictions: the full fits (rung is None) keep their predictions on the test rows
+		"""
+		self._project_name = project_name
+		self._y_column = y_column
+		self._x_columns = x_columns
+		self._evaluation_function = evaluation_function
+		self._estimators = estimators
+		self._keep_test_predictions = keep_test_predictions
+
+	@property
+	def project_name(self):
+		return self._project_name
+
+	@property
+	def estimators(self):
+		return self._estimators
+
+	@property
+	def fingerprint(self):
+		"""
+		the same for templates with the same content, so a project that goes back to the same estimators reuses its id;
+		classes and functions are also told apart by their identity, so a class that is defined again gets a new one
+		:rtype: str
+		"""
+		estimators = [
+			(key, _get_qualified_name(estimator['class']), id(estimator['class']), hash_object(estimator['arguments']))
+			for key, estimator in self._estimators.items()
+		]
+		items = (
+			self._project_name, self._y_column, repr(self._x_columns), self._keep_test_predictions,
+			get_function_fingerprint(self._evaluation_function), id(self._evaluation_function), estimators
+		)
+		return hashlib.sha256(repr(items).encode()).hexdigest()
+
+	def make_task(self, estimator_keys, training_test_id, training_fraction=None, rung=None):
+		"""
+		:type estimator_keys: tuple[tuple]
+		:param estimator_keys: one (estimator_name, estimator_id) for a LearningTask, more for a GroupedLearningTask
+		:type training_test_id: str
+		:type training_fraction: float or NoneType
+		:type rung: int or NoneType
+		:rtype: LearningTask or GroupedLearningTask
+		"""
+		tasks = []
+		for estimator_name, estimator_id in estimator_keys:
+			estimator = self._estimators[(estimator_name, estimator_id)]
+			tasks.append(LearningTask(
+				project_name=self._project_name, estimator_class=estimator['class'],
+				estimator_name=estimator_name, estimator_id=estimator_id,
+				estimator_arguments=estimator['arguments'],
+				training_test_slice_id=training_test_id,
+				y_column=self._y_column, x_columns=self._x_columns,
+				evaluation_function=self._evaluation_function,
+				training_fraction=training_fraction, rung=rung,
+				keep_test_predictions=self._keep_test_predictions and rung is None
+			))
+		if len(tasks) == 1:
+			return tasks[0]
+		return GroupedLearningTask(tasks=tasks)
+
+
+def get_task_from_to_do_item(namespace, item):
+	"""
+	builds the task of a to-do item made by LearningProject.get_to_do_item
+	:type namespace: DataStore or Namespace
+	:type item: tuple
+	:rtype: LearningTask or GroupedLearningTask
+	"""
+	template_id, estimator_keys, training_test_id, training_fraction, rung = item
+	if template_id not in _TEMPLATES:
+		template = get_obj_from_namespace(namespace=namespace, obj_type='template', obj_id=template_id)
+		# the templates the project had before are only needed by tasks that were queued before it changed
+		for other_id, other in list(_TEMPLATES.items()):
+			if other.project_name == template.project_name:
+				del _TEMPLATES[other_id]
+		_TEMPLATES[template_id] = template
+	return _TEMPLATES[template_id].make_task(
+		estimator_keys=estimator_keys, training_test_id=training_test_id,
+		training_fraction=training_fraction, rung=rung
+	)
@@ -1,3 +1,12 @@
-from ._LearningTask import LearningTask
-from ._CrossValidationProject import CrossValidationProject
-from ._LearningProject import LearningProject
+from ...._lazy import get_lazy_attributes
+
+__getattr__, __dir__ = get_lazy_attributes(
+	package_name=__name__, package_globals=globals(),
+	members={
+		'LearningTask': '._LearningTask',
+		'CrossValidationProject': '._CrossValidationProject',
+		'LearningProject': '._LearningProject',
+		'GroupedLearningTask': '._GroupedLearningTask',
+		'ResultCache': '._ResultCache',
+	}
+)
@@ -1,4 +1,4 @@
-from pandas import DataFrame, concat
+from pandas import DataFrame, MultiIndex
 import numpy as np
 
 
@@ -10,239 +10,523 @@ def get_display_function():
 		return False
 
 
-class Score:
-	def __init__(self, main_metric):
-		self._main_metric = main_metric
-		self._score_dictionary = None
-		self._score = None
-
-	@property
-	def score(self):
-		return self._score
-
-	@score.setter
-	def score(self, score):
-		if self._score is not None:
-			raise RuntimeError('cannot overwrite score!')
-		self._score = score
-
-	@property
-	def score_dictionary(self):
-		return self._score_dictionary
-
-	@score_dictionary.setter
-	def score_dictionary(self, score_dictionary):
-		if self._score_dictionary is not None:
-			raise RuntimeError('cannot overwrite score dictionary!')
-		self._score_dictionary = score_dictionary
-		self._score = score_dictionary[self._main_metric]
-
-
 class Scoreboard:
-	def __init__(self, main_metric=None, lowest_is_best=True, best_score=0):
-		self._estimators = set()
-		self._training_test_ids = set()
+	def __init__(self, main_metric=None, lowest_is_best=True, best_score=0, worst_score=None):
+		"""
+		keeps the scores in a dense matrix of estimators (rows) by training-test sets (columns)
+		with a mask of measured scores and running sums and counts per row and per column,
+		so adding a score and reading the aggregates do not go through all the scores
 
+		:param worst_score: 	the score of tasks that timed out, infinitely bad by default, see add_timeout;
+								timeouts count as this score in the means and bounds but they are kept apart
+								from the evaluations, so they do not reach evaluation_mean
+		"""
 		if not lowest_is_best and best_score == 0:
 			raise ValueError(f'best score of 0 does not work when the highest score is the best!')
 
 		self._best_score = best_score
-
-		self._all_combinations = set()
-		self._measured = {}
-		self._unmeasured = {}
-
+		if worst_score is None:
+			worst_score = np.inf if lowest_is_best else -np.inf
+		self._worst_score = worst_score
 		self._lowest_is_best = lowest_is_best
 		self._main_metric = main_metric
 
-		self._measured_data = None
-		self._mean_score_per_data = None
-		self._mean_score_per_estimator = None
-		self._best_possible_score_per_estimator = None
+		self._estimators = []
+		self._estimator_rows = {}
+		self._training_test_ids = []
+		self._training_test_columns = {}
+
+		self._scores = np.full((0, 0), np.nan)
+		self._measured = np.zeros((0, 0), dtype=bool)
+		self._timed_out = np.zeros((0, 0), dtype=bool)
+		self._score_dictionaries = {}  # None for evaluations that are read from the result store, see set_result_store
+		self._result_store = None
+		self._project_name = None
+		self._rung = None
+
+		self._score_sum_per_estimator = np.zeros(0)
+		self._score_count_per_estimator = np.zeros(0, dtype=int)
+		self._score_sum_per_training_test = np.zeros(0)
+		self._score_count_per_training_test = np.zeros(0, dtype=int)
+		self._timeout_count_per_estimator = np.zeros(0, dtype=int)
+		self._timeout_count_per_training_test = np.zeros(0, dtype=int)
+
+		# scores of fits on subsamples of the training data (successive halving), one scoreboard per rung
+		self._rung_scoreboards = {}
+
+	@property
+	def main_metric(self):
+		return self._main_metric
 
 	@property
 	def lowest_is_best(self):
 		return self._lowest_is_best
 
-	def _add_estimator_data_combination(self, estimator_name, estimator_id, training_test_id):
-		key = estimator_name, estimator_id, training_test_id
-		if key not in self._all_combinations:
-			self._all_combinations.add(key)
-			self._unmeasured[key] = Score(main_metric=self._main_metric)
+	@property
+	def best_score(self):
+		return self._best_score
+
+	@property
+	def worst_score(self):
+		return self._worst_score
+
+	@property
+	def num_estimators(self):
+		return len(self._estimators)
+
+	@property
+	def num_training_tests(self):
+		return len(self._training_test_ids)
+
+	def _reserve(self, num_rows, num_columns):
+		"""
+		makes room for more rows or columns by doubling the capacity of the arrays
+		"""
+		capacity_rows, capacity_columns = self._scores.shape
+		if num_rows <= capacity_rows and num_columns <= capacity_columns:
+			return
+
+		new_rows = max(num_rows, 2 * capacity_rows, 8) if num_rows > capacity_rows else capacity_rows
+		new_columns = max(num_columns, 2 * capacity_columns, 8) if num_columns > capacity_columns else capacity_columns
+
+		scores = np.full((new_rows, new_columns), np.nan)
+		scores[:capacity_rows, :capacity_columns] = self._scores
+		measured = np.zeros((new_rows, new_columns), dtype=bool)
+		measured[:capacity_rows, :capacity_columns] = self._measured
+		timed_out = np.zeros((new_rows, new_columns), dtype=bool)
+		timed_out[:capacity_rows, :capacity_columns] = self._timed_out
+		self._scores = scores
+		self._measured = measured
+		self._timed_out = timed_out
+
+		def extend(array, size):
+			result = np.zeros(size, dtype=array.dtype)
+			result[:len(array)] = array
+			return result
+
+		self._score_sum_per_estimator = extend(self._score_sum_per_estimator, new_rows)
+		self._score_count_per_estimator = extend(self._score_count_per_estimator, new_rows)
+		self._score_sum_per_training_test = extend(self._score_sum_per_training_test, new_columns)
+		self._score_count_per_training_test = extend(self._score_count_per_training_test, new_columns)
+		self._timeout_count_per_estimator = extend(self._timeout_count_per_estimator, new_rows)
+		self._timeout_count_per_training_test = extend(self._timeout_count_per_training_test, new_columns)
 
 	def add_estimator(self, estimator_name, estimator_id):
 		if not isinstance(estimator_name, str):
 			raise TypeError(f'estimator_name should be str but it is of type {type(estimator_name)}')
 
 		key = estimator_name, estimator_id
-		if key in self._estimators:
+		if key in self._estimator_rows:
 			raise KeyError(f'estimator {key} already exists!')
-		self._estimators.add(key)
-		for training_test_id in self.training_test_ids:
-			self._add_estimator_data_combination(
-				estimator_name=estimator_name, estimator_id=estimator_id, training_test_id=training_test_id
-			)
+		self._reserve(num_rows=self.num_estimators + 1, num_columns=self.num_training_tests)
+		self._estimator_rows[key] = self.num_estimators
+		self._estimators.append(key)
+		for rung_scoreboard in self._rung_scoreboards.values():
+			rung_scoreboard.add_estimator(estimator_name=estimator_name, estimator_id=estimator_id)
 
 	def add_training_test_id(self, training_test_id):
-		if training_test_id in self._training_test_ids:
+		if training_test_id in self._training_test_columns:
 			raise KeyError(f'training_test_id: {training_test_id} already exists!')
-		self._training_test_ids.add(training_test_id)
-		for estimator_name, estimator_id in self.estimators:
-			self._add_estimator_data_combination(
-				estimator_name=estimator_name, estimator_id=estimator_id, training_test_id=training_test_id
-			)
+		self._reserve(num_rows=self.num_estimators, num_columns=self.num_training_tests + 1)
+		self._training_test_columns[training_test_id] = self.num_training_tests
+		self._training_test_ids.append(training_test_id)
+		for rung_scoreboard in self._rung_scoreboards.values():
+			rung_scoreboard.add_training_test_id(training_test_id=training_test_id)
+
+	def set_result_store(self, result_store, project_name, rung=None):
+		"""
+		the evaluations of done tasks are not kept by the scoreboard, only their main scores,
+		the rest of the evaluation is read from the result store when evaluation_mean needs it
+		:type result_store: atlantis.ds.parallel_computing.ResultStore
+		:type project_name: str
+		:type rung: int or NoneType
+		"""
+		self._result_store = result_store
+		self._project_name = project_name
+		self._rung = rung
+		for rung_number, rung_scoreboard in self._rung_scoreboards.items():
+			rung_scoreboard.set_result_store(result_store=result_store, project_name=project_name, rung=rung_number)
 
 	@property
 	def training_test_ids(self):
 		"""
 		:rtype: set
 		"""
-		return self._training_test_ids
+		return set(self._training_test_columns.keys())
 
 	@property
 	def estimators(self):
 		"""
 		:rtype: set[(str, int)]
 		"""
-		return self._estimators
+		return set(self._estimator_rows.keys())
 
-	def make_stale(self):
-		self._measured_data = None
-		self._mean_score_per_data = None
-		self._mean_score_per_estimator = None
-		self._best_possible_score_per_estimator = None
+	def _get_cell(self, estimator_name, estimator_id, training_test_id):
+		key = estimator_name, estimator_id
+		if key not in self._estimator_rows:
+			raise KeyError(f'estimator {key} does not exist!')
+		if training_test_id not in self._training_test_columns:
+			raise KeyError(f'training_test_id: {training_test_id} does not exist!')
+		row = self._estimator_rows[key]
+		column = self._training_test_columns[training_test_id]
+		if self._measured[row, column]:
+			raise RuntimeError('cannot overwrite score!')
+		return row, column
 
 	def add_score(self, estimator_name, estimator_id, training_test_id, score_dictionary):
 		if not isinstance(score_dictionary, dict):
 			raise TypeError(f'score_dictionary should be a dict but it is of type {type(score_dictionary)}')
-		try:
-			score = self._unmeasured[(estimator_name, estimator_id, training_test_id)]
-		except KeyError as e:
-			display(self._unmeasured)
-			raise e
-		score.score_dictionary = score_dictionary
 
-		self._measured[(estimator_name, estimator_id, training_test_id)] = score
-		self.make_stale()
+		row, column = self._get_cell(
+			estimator_name=estimator_name, estimator_id=estimator_id, training_test_id=training_test_id
+		)
+		score = score_dictionary[self._main_metric]
+		self._scores[row, column] = score
+		self._measured[row, column] = True
+		if self._result_store is not None:
+			score_dictionary = None
+		self._score_dictionaries[(estimator_name, estimator_id, training_test_id)] = score_dictionary
+
+		self._score_sum_per_estimator[row] += score
+		self._score_count_per_estimator[row] += 1
+		self._score_sum_per_training_test[column] += score
+		self._score_count_per_training_test[column] += 1
+
+	def add_timeout(self, estimator_name, estimator_id, training_test_id):
+		"""
+		records the worst score for a task that timed out, or failed on a rung of successive halving;
+		it is counted apart from the sums of the scores, so that an infinite worst score does not make them nan
+		"""
+		row, column = self._get_cell(
+			estimator_name=estimator_name, estimator_id=estimator_id, training_test_id=training_test_id
+		)
+		self._scores[row, column] = self._worst_score
+		self._measured[row, column] = True
+		self._timed_out[row, column] = True
+		self._timeout_count_per_estimator[row] += 1
+		self._timeout_count_per_training_test[column] += 1
 
-		del self._unmeasured[(estimator_name, estimator_id, training_test_id)]
+	@property
+	def timed_out_mask(self):
+		"""
+		:rtype: np.ndarray
+		"""
+		return self._timed_out[:self.num_estimators, :self.num_training_tests]
+
+	def _get_totals(self, sums, counts, timeouts):
+		"""
+		sums and counts of the scores with every timeout counted as the worst score
+		"""
+		worst = np.zeros(len(sums))
+		# without where, an infinite worst score times no timeouts would be nan
+		np.multiply(float(self._worst_score), timeouts, out=worst, where=timeouts > 0)
+		return sums + worst, counts + timeouts
+
+	@property
+	def rungs(self):
+		"""
+		:rtype: list[int]
+		"""
+		return sorted(self._rung_scoreboards.keys())
+
+	def get_rung_scoreboard(self, rung):
+		"""
+		scoreboard of the fits on the training subsamples of one rung of successive halving,
+		it has the same estimators and training-test sets as this scoreboard
+		:type rung: int
+		:rtype: Scoreboard
+		"""
+		if rung not in self._rung_scoreboards:
+			rung_scoreboard = Scoreboard(
+				main_metric=self._main_metric, lowest_is_best=self._lowest_is_best, best_score=self._best_score,
+				worst_score=self._worst_score
+			)
+			for training_test_id in self._training_test_ids:
+				rung_scoreboard.add_training_test_id(training_test_id=training_test_id)
+			for estimator_name, estimator_id in self._estimators:
+				rung_scoreboard.add_estimator(estimator_name=estimator_name, estimator_id=estimator_id)
+			if self._result_store is not None:
+				rung_scoreboard.set_result_store(
+					result_store=self._result_store, project_name=self._project_name, rung=rung
+				)
+			self._rung_scoreboards[rung] = rung_scoreboard
+		return self._rung_scoreboards[rung]
 
 	def add_task_score(self, task):
 		"""
 		:type task: LearningTask
 		"""
-		if task.status == 'done':
-			self.add_score(
-				estimator_name=task.estimator_name,
-				estimator_id=task.estimator_id,
-				training_test_id=task.training_test_id,
-				score_dictionary=task.evaluation
-			)
+		if task.status == 'done' or task.status == 'timeout':
+			rung = getattr(task, 'rung', None)
+			scoreboard = self if rung is None else self.get_rung_scoreboard(rung=rung)
+			if task.status == 'done':
+				scoreboard.add_score(
+					estimator_name=task.estimator_name,
+					estimator_id=task.estimator_id,
+					training_test_id=task.training_test_id,
+					score_dictionary=task.evaluation
+				)
+			else:
+				scoreboard.add_timeout(
+					estimator_name=task.estimator_name,
+					estimator_id=task.estimator_id,
+					training_test_id=task.training_test_id
+				)
 		else:
 			raise RuntimeError(f'{task} is not done, it is {task.status}')
 
+	# arrays
+
+	@property
+	def score_matrix(self):
+		"""
+		scores of estimators (rows, in the order of estimators) on training-test sets (columns),
+		unmeasured scores are nan
+		:rtype: np.ndarray
+		"""
+		return self._scores[:self.num_estimators, :self.num_training_tests]
+
+	@property
+	def measured_mask(self):
+		"""
+		:rtype: np.ndarray
+		"""
+		return self._measured[:self.num_estimators, :self.num_training_tests]
+
+	def get_mean_score_array(self):
+		"""
+		mean of the measured scores of each estimator, nan for estimators without any score
+		:rtype: np.ndarray
+		"""
+		sums, counts = self._get_totals(
+			sums=self._score_sum_per_estimator[:self.num_estimators],
+			counts=self._score_count_per_estimator[:self.num_estimators],
+			timeouts=self._timeout_count_per_estimator[:self.num_estimators]
+		)
+		result = np.full(self.num_estimators, np.nan)
+		np.divide(sums, counts, out=result, where=counts > 0)
+		return result
+
+	def get_best_possible_score_array(self):
+		"""
+		mean score of each estimator if all of its unmeasured scores turn out to be the best score
+		:rtype: np.ndarray
+		"""
+		num_training_tests = self.num_training_tests
+		if num_training_tests == 0:
+			return np.full(self.num_estimators, float(self._best_score))
+		sums, counts = self._get_totals(
+			sums=self._score_sum_per_estimator[:self.num_estimators],
+			counts=self._score_count_per_estimator[:self.num_estimators],
+			timeouts=self._timeout_count_per_estimator[:self.num_estimators]
+		)
+		return (sums + self._best_score * (num_training_tests - counts)) / num_training_tests
+
+	def get_mean_score_per_training_test_array(self):
+		"""
+		mean of the measured scores on each training-test set, nan for sets without any score
+		:rtype: np.ndarray
+		"""
+		sums, counts = self._get_totals(
+			sums=self._score_sum_per_training_test[:self.num_training_tests],
+			counts=self._score_count_per_training_test[:self.num_training_tests],
+			timeouts=self._timeout_count_per_training_test[:self.num_training_tests]
+		)
+		result = np.full(self.num_training_tests, np.nan)
+		np.divide(sums, counts, out=result, where=counts > 0)
+		return result
+
+	# single values
+
+	def get_mean_score(self, estimator_name, estimator_id):
+		"""
+		mean of the measured scores of one estimator
+		:rtype: float or NoneType
+		"""
+		row = self._estimator_rows[(estimator_name, estimator_id)]
+		total, count = self._get_row_totals(row=row)
+		if count == 0:
+			return None
+		return total / count
+
+	def _get_row_totals(self, row):
+		timeout_count = self._timeout_count_per_estimator[row]
+		total = self._score_sum_per_estimator[row]
+		if timeout_count > 0:
+			total = total + self._worst_score * timeout_count
+		return total, self._score_count_per_estimator[row] + timeout_count
+
+	def get_score_count(self, estimator_name, estimator_id):
+		"""
+		number of training-test sets one estimator has a score for, timeouts count with the worst score
+		:rtype: int
+		"""
+		row = self._estimator_rows[(estimator_name, estimator_id)]
+		return int(self._score_count_per_estimator[row] + self._timeout_count_per_estimator[row])
+
+	def get_best_possible_score(self, estimator_name, estimator_id):
+		"""
+		mean score of one estimator if all of its unmeasured scores turn out to be the best score
+		:rtype: float
+		"""
+		row = self._estimator_rows[(estimator_name, estimator_id)]
+		num_training_tests = self.num_training_tests
+		if num_training_tests == 0:
+			return self._best_score
+		total, count = self._get_row_totals(row=row)
+		return (total + self._best_score * (num_training_tests - count)) / num_training_tests
+
+	def get_mean_score_per_training_test(self, training_test_id):
+		"""
+		mean of the measured scores of all estimators on one training-test set
+		:rtype: float or NoneType
+		"""
+		column = self._training_test_columns[training_test_id]
+		timeout_count = self._timeout_count_per_training_test[column]
+		count = self._score_count_per_training_test[column] + timeout_count
+		if count == 0:
+			return None
+		total = self._score_sum_per_training_test[column]
+		if timeout_count > 0:
+			total = total + self._worst_score * timeout_count
+		return total / count
+
+	def get_best_mean_score(self):
+		"""
+		the estimator with the best mean of measured scores and its mean score
+		:rtype: ((str, int), float) or (NoneType, NoneType)
+		"""
+		means = self.get_mean_score_array()
+		if self.num_estimators == 0 or np.isnan(means).all():
+			return None, None
+		if self.lowest_is_best:
+			row = int(np.nanargmin(means))
+		else:
+			row = int(np.nanargmax(means))
+		return self._estimators[row], means[row]
+
+	# data frames
+
+	def _get_estimator_frame(self, rows, scores):
+		return DataFrame({
+			'estimator_name': [self._estimators[row][0] for row in rows],
+			'estimator_id': [self._estimators[row][1] for row in rows],
+			'score': scores
+		})
+
 	def _get_measured_records(self, evaluation=False):
-		if len(self.training_test_ids) == 0:
+		if self.num_training_tests == 0:
 			raise RuntimeError('training_test_ids is empty')
-		if len(self.estimators) == 0:
+		if self.num_estimators == 0:
 			raise RuntimeError('estimators is empty')
 
+		stored = {}
+		if evaluation and self._result_store is not None:
+			for stored_record in self._result_store.read_evaluations(
+				project_name=self._project_name, rung=self._rung
+			).to_dict('records'):
+				# estimator ids can come back from the store as str
+				estimator = stored_record.pop('estimator_name'), str(stored_record.pop('estimator_id'))
+				key = estimator + (stored_record.pop('training_test_id'), )
+				stored[key] = {metric: value for metric, value in stored_record.items() if value == value}
+
 		records = []
-		for key, score in self._measured.items():
+		for key, score_dictionary in self._score_dictionaries.items():
 			estimator_name, estimator_id, training_test_id = key
+			row = self._estimator_rows[(estimator_name, estimator_id)]
+			column = self._training_test_columns[training_test_id]
 			record = {
 				'estimator_name': estimator_name, 'estimator_id': estimator_id,
 				'training_test_id': training_test_id,
-				'score': score.score
+				'score': self._scores[row, column]
 			}
 			if evaluation:
-				record = {**record, **score.score_dictionary}
+				if score_dictionary is None:
+					score_dictionary = stored[(estimator_name, str(estimator_id), training_test_id)]
+				record = {**record, **score_dictionary}
 			records.append(record)
 		return records
 
 	@property
 	def measured_data(self):
 		"""
+		count, mean, min, and max of the measured scores of each estimator, with timeouts as the worst score,
+		the number of timeouts, and the std of the scores that did not time out
 		:rtype: DataFrame
 		"""
-
-		if self._measured_data is None:
-			data = DataFrame.from_records(self._get_measured_records())
-			aggregate = data.groupby(['estimator_name', 'estimator_id']).agg(['count', 'mean', 'min', 'max', 'std'])
-			aggregate.sort_values(by=('score', 'mean'), ascending=self.lowest_is_best, inplace=True)
-			self._measured_data = aggregate
-		return self._measured_data
+		all_sums, all_counts = self._get_totals(
+			sums=self._score_sum_per_estimator[:self.num_estimators],
+			counts=self._score_count_per_estimator[:self.num_estimators],
+			timeouts=self._timeout_count_per_estimator[:self.num_estimators]
+		)
+		rows = np.flatnonzero(all_counts > 0)
+		scores = self.score_matrix[rows]
+		measured = self.measured_mask[rows]
+		scored = measured & ~self.timed_out_mask[rows]
+		counts = self._score_count_per_estimator[rows]
+		scored_means = self._score_sum_per_estimator[rows] / np.maximum(counts, 1)
+
+		squared_deviations = np.where(scored, (scores - scored_means[:, None]) ** 2, 0).sum(axis=1)
+		std = np.full(len(rows), np.nan)
+		np.divide(squared_deviations, counts - 1, out=std, where=counts > 1)
+		std = np.sqrt(std)
+
+		aggregate = DataFrame(
+			{
+				('score', 'count'): all_counts[rows],
+				('score', 'mean'): all_sums[rows] / all_counts[rows],
+				('score', 'min'): np.where(measured, scores, np.inf).min(axis=1, initial=np.inf),
+				('score', 'max'): np.where(measured, scores, -np.inf).max(axis=1, initial=-np.inf),
+				('score', 'std'): std,
+				('score', 'timeouts'): self._timeout_count_per_estimator[rows]
+			},
+			index=MultiIndex.from_tuples(
+				[self._estimators[row] for row in rows], names=['estimator_name', 'estimator_id']
+			) if len(rows) > 0 else None
+		)
+		aggregate.sort_values(by=('score', 'mean'), ascending=self.lowest_is_best, inplace=True)
+		return aggregate
 
 	@property
 	def evaluation_mean(self):
 		records = self._get_measured_records(evaluation=True)
-		data = DataFrame.from_records(records).groupby(['estimator_name', 'estimator_id']).mean().reset_index()
+		data = DataFrame.from_records(records).drop(columns='training_test_id')
+		data = data.groupby(['estimator_name', 'estimator_id']).mean().reset_index()
 		return data
 
-	def _get_all_records_fill_unmeasured_with_best(self):
-		records = self._get_measured_records()
-		for key in self._unmeasured.keys():
-			estimator_name, estimator_id, training_test_id = key
-			records.append({
-				'estimator_name': estimator_name, 'estimator_id':
-					estimator_id, 'training_test_id': training_test_id,
-				'score': self._best_score
-			})
-
-		return records
-
 	@property
 	def mean_score_per_data(self):
 		"""
 		:rtype: DataFrame
 		"""
-		if self._mean_score_per_data is None:
-			records = self._get_measured_records()
-			all_data_sets = DataFrame({'training_test_id': list(self.training_test_ids)})
-			if len(records) == 0:
-				all_data_sets['score'] = None
-
-			else:
-				data = DataFrame.from_records(self._get_measured_records())
-				data = data[['training_test_id', 'score']]
-				aggregate = data.groupby('training_test_id').mean().reset_index()
-
-				all_data_sets = all_data_sets.merge(aggregate, on='training_test_id', how='left')
-
-			all_data_sets.sort_values(by='score', ascending=self.lowest_is_best, inplace=True, na_position='first')
-
-			self._mean_score_per_data = all_data_sets
-		return self._mean_score_per_data
+		result = DataFrame({
+			'training_test_id': list(self._training_test_ids),
+			'score': self.get_mean_score_per_training_test_array()
+		})
+		result.sort_values(by='score', ascending=self.lowest_is_best, inplace=True, na_position='first')
+		return result
 
 	@property
 	def mean_score_per_estimator(self):
 		"""
 		:rtype: DataFrame
 		"""
-		if self._mean_score_per_estimator is None:
-			data = DataFrame.from_records(self._get_measured_records())
-			data = data[['estimator_name', 'estimator_id', 'score']]
-			self._mean_score_per_estimator = data.groupby(['estimator_name', 'estimator_id']).mean().reset_index()
-			self._mean_score_per_estimator.sort_values(by='score', ascending=self.lowest_is_best, inplace=True)
-		return self._mean_score_per_estimator
+		means = self.get_mean_score_array()
+		rows = np.flatnonzero(~np.isnan(means))
+		result = self._get_estimator_frame(rows=rows, scores=means[rows])
+		result.sort_values(by='score', ascending=self.lowest_is_best, inplace=True)
+		return result
 
 	@property
 	def best_possible_score_per_estimator(self):
 		"""
 		:rtype: DataFrame
 		"""
-		if self._best_possible_score_per_estimator is None:
-			data = DataFrame.from_records(self._get_all_records_fill_unmeasured_with_best())
-			try:
-				data = data[['estimator_name', 'estimator_id', 'score']]
-			except:
-				display(data)
-				raise
-			aggregate = data.groupby(['estimator_name', 'estimator_id']).mean().reset_index()
-			aggregate.sort_values(by='score', ascending=self.lowest_is_best, inplace=True)
-
-			self._best_possible_score_per_estimator = aggregate
-		return self._best_possible_score_per_estimator
+		result = self._get_estimator_frame(
+			rows=range(self.num_estimators), scores=self.get_best_possible_score_array()
+		)
+		result.sort_values(by='score', ascending=self.lowest_is_best, inplace=True)
+		return result
 
 	def _repr_pretty_(self, p, cycle):
 		if cycle:
@@ -261,4 +545,4 @@ class Scoreboard:
 			print(measured_data)
 		else:
 			print('scoreboard:')
-			display(measured_data)
\ No newline at end of file
+			display(measured_data)
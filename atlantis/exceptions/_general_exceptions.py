@@ -28,3 +28,7 @@ class ComparisonError(AtlanteanError):
 
 class EmptyCollectionError(AtlanteanError, ValueError):
 	pass
+
+
+class ImportTimeError(AtlanteanError, RuntimeError):
+	pass
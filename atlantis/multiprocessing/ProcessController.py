@@ -1,8 +1,11 @@
-import multiprocess
 import atexit
+import threading
+from collections import deque
 from time import sleep
 from .BaseController import BaseController
 from ._do_task import do_task
+from ._WorkerContext import get_worker_context
+from ._CpuSlots import get_cpu_slots
 from ._DEFAULT_VALUES import *
 
 
@@ -13,24 +16,44 @@ class ProcessController(BaseController):
 			max_cpu_count=MAX_CPU_COUNT,
 			sleep_time=SLEEP_TIME,
 			empty_count_limit=EMPTY_COUNT_LIMIT,
-			max_sleep_time=MAX_SLEEP_TIME
+			max_sleep_time=MAX_SLEEP_TIME,
+			worker_context=None,
+			cpu_slots=None
 	):
+		"""
+		:type worker_context: WorkerContext or NoneType
+		:param worker_context: workers are started with its context, see get_worker_context
+
+		:type cpu_slots: CpuSlots or NoneType
+		:param cpu_slots: 	a worker takes the slots of a task, see add_task, before doing it and limits its threads
+							to their cpus; the slots of the session, shared with processors, are used if None
+		"""
 		super().__init__(time_unit=time_unit)
 
-		self._manager = multiprocess.Manager()
+		self._worker_context = (worker_context or get_worker_context()).attach(owner=self)
+		context = self._worker_context.context
+
+		# workers wait on the to-do queue and wake up when a task is put in it,
+		# they write to the events pipe directly and a thread of the controller reads it, see _read_events;
+		# the state of tasks and workers is kept by the controller from the events so that nothing goes through a manager
+		self._to_do_queue = context.Queue()
+		self._queued_count = context.Value('i', 0)
+		self._events = context.SimpleQueue()
+		self._received_events = deque()
+		self._event_lock = threading.Lock()
+		self._events_arrived = threading.Event()
+		self._event_reader = threading.Thread(target=self._read_events, daemon=True)
+		self._event_reader.start()
 
-		# in parent class:
-		self._to_do_queue = self._manager.Queue()
-		self._done_queue = self._manager.Queue()
-		self._tasks_status = self._manager.dict()
-		self._incomplete_task_ids = self._manager.dict()
+		# in parent class: _done_queue, _tasks_status, _incomplete_task_ids
 
 		# not in parent class:
-		self._workers_doing = self._manager.dict()  # key: worker_id, value: task_id
-		self._worker_reports = self._manager.dict()
-		self._cpu_usage = self._manager.Value('i', 0)
+		self._workers_doing = dict()  # key: worker_id, value: task_id
+		self._worker_reports = dict()
+		self._cpu_slots = cpu_slots or get_cpu_slots()
 
-		self._keep_workers_alive = self._manager.Value('i', 1)
+		self._keep_workers_alive = context.Value('i', 1)
+		self._unfinished_count = 0  # tasks added that have neither an outcome nor a worker that died doing them
 
 		self._workers = dict()
 
@@ -41,23 +64,62 @@ class ProcessController(BaseController):
 		self._max_sleep_time = max_sleep_time
 		atexit.register(self.terminate)
 
+	def _read_events(self):
+		while True:
+			# waits for the pipe without holding the lock so that _drain_events can run meanwhile
+			self._events._reader.poll(1)
+			self._drain_events()
+
+	def _drain_events(self):
+		with self._event_lock:
+			while not self._events.empty():
+				self._received_events.append(self._events.get())
+				self._events_arrived.set()
+
+	def _receive_events(self):
+		"""
+		updates the state of tasks and workers from the events the workers have sent
+		"""
+		self._events_arrived.clear()
+		while True:
+			try:
+				event, worker_id, value = self._received_events.popleft()
+			except IndexError:
+				break
+
+			if event == 'started':
+				self._tasks_status[value] = 'started'
+				self._workers_doing[worker_id] = value
+			elif event == 'outcome':
+				self._tasks_status[value.task_id] = 'done'
+				self._workers_doing[worker_id] = None
+				self._done_queue.append(value)
+				self._unfinished_count -= 1
+			elif event == 'report':
+				self._worker_reports[worker_id] = value
+			else:
+				raise RuntimeError(f'do not know what to do with event: {event}')
+
 	@property
 	def workers_doing(self):
 		"""
 		:rtype: dict
 		"""
+		self._receive_events()
 		return self._workers_doing
 
 	@property
 	def to_do_count(self):
-		return self.to_do_queue.qsize()
+		return self._queued_count.value
 
 	@property
 	def done_count(self):
-		return self.done_queue.qsize()
+		self._receive_events()
+		return len(self._done_queue)
 
 	@property
 	def being_done_count(self):
+		self._receive_events()
 		return sum(1 for value in self._workers_doing.values() if value is not None)
 
 	@property
@@ -65,6 +127,7 @@ class ProcessController(BaseController):
 		"""
 		:rtype: dict[str, WorkerReport]
 		"""
+		self._receive_events()
 		return self._worker_reports
 
 	@property
@@ -72,15 +135,29 @@ class ProcessController(BaseController):
 		"""
 		:rtype: dict
 		"""
+		self._receive_events()
 		return dict(self._tasks_status)
 
 	@property
 	def cpu_usage(self):
-		return self._cpu_usage.value
+		"""
+		slots taken by the workers of all the controllers and processors that share the slots
+		"""
+		return self._cpu_slots.used
+
+	@property
+	def cpu_slots(self):
+		"""
+		:rtype: CpuSlots
+		"""
+		return self._cpu_slots
 
 	def _add_task_to_to_do(self, task):
+		with self._queued_count.get_lock():
+			self._queued_count.value += 1
 		self.to_do_queue.put(task)
 		self._tasks_status[task.id] = 'added'
+		self._unfinished_count += 1
 		self._task_counter += 1
 
 	def keep_workers_alive(self):
@@ -88,7 +165,7 @@ class ProcessController(BaseController):
 
 	def add_task(self, function, args=None, kwargs=None, task_id=None, cpu_count=1):
 		self.keep_workers_alive()
-		return super().add_task(function=function, args=args, kwargs=kwargs, task_id=task_id, cpu_count=1)
+		return super().add_task(function=function, args=args, kwargs=kwargs, task_id=task_id, cpu_count=cpu_count)
 
 	def let_workers_die(self):
 		self._keep_workers_alive.value = 0
@@ -111,18 +188,15 @@ class ProcessController(BaseController):
 		worker_id = self._generate_worker_id()
 		if echo:
 			print(f'adding worker {worker_id}')
-		process = multiprocess.Process(
+		process = self._worker_context.Process(
 			target=do_task,
 			kwargs={
 				'to_do_queue': self._to_do_queue,
-				'done_queue': self._done_queue,
-				'workers_doing': self._workers_doing,
-				'tasks_status': self._tasks_status,
-				'worker_reports': self._worker_reports,
+				'events': self._events,
+				'queued_count': self._queued_count,
 				'keep_workers_alive': self._keep_workers_alive,
 				'worker_id': worker_id,
-				'cpu_usage': self._cpu_usage,
-				'max_cpu_count': self._max_cpu_count,
+				'cpu_slots': self._cpu_slots,
 				'sleep_time': self._sleep_time,
 				'empty_count_limit': self._empty_count_limit,
 				'max_sleep_time': self._max_sleep_time,
@@ -137,13 +211,16 @@ class ProcessController(BaseController):
 
 	def add_workers_as_needed(self, echo=0):
 		new_worker_count = 0
-		while not self._to_do_queue.empty() and self._insufficient_workers():
+		while self.to_do_count > 0 and self._insufficient_workers():
 			sleep(self._sleep_time)
 			self.add_worker(echo=echo)
 			new_worker_count += 1
 		return new_worker_count
 
 	def remove_dead_workers(self, echo=0):
+		# the last events of a worker that died tell which task it was doing
+		self._drain_events()
+		self._receive_events()
 		dead_count = 0
 		live_workers = {}
 		for worker_id, worker in self.workers.items():
@@ -152,10 +229,12 @@ class ProcessController(BaseController):
 			else:
 				if echo:
 					print(f'removing dead worker {worker_id}')
-				if worker_id in self.workers_doing:
-					incomplete_task_id = self.workers_doing[worker_id]
+				if worker_id in self._workers_doing:
+					incomplete_task_id = self._workers_doing.pop(worker_id)
 					if incomplete_task_id is not None:
-						self.incomplete_task_ids[incomplete_task_id] = 1
+						self._incomplete_task_ids[incomplete_task_id] = 1
+						self._unfinished_count -= 1
+				self._cpu_slots.release_process(pid=worker.pid)
 				dead_count += 1
 		self._workers = live_workers
 		return dead_count
@@ -174,11 +253,16 @@ class ProcessController(BaseController):
 		terminated_count = 0
 		for worker_id, worker in self.workers.items():
 			worker.terminate()
+			worker.join(timeout=5)
+			# the slots are shared with other controllers and processors
+			self._cpu_slots.release_process(pid=worker.pid)
 			terminated_count += 1
+		self._worker_context.detach(owner=self)
 		return terminated_count
 
 	def _get_from_done_queue(self):
-		return self.done_queue.get_nowait()
+		self._receive_events()
+		return self.done_queue.popleft()
 
 	def clean_up(self, echo=0):
 		processed = self.process_done_queue(echo=echo)
@@ -240,10 +324,13 @@ class ProcessController(BaseController):
 				if echo:
 					self.write(string=status['text'])
 				d = self.clean_up(echo=0)
-				sleep(self._sleep_time)
-				if status['to_do_count'] + status['being_done_count'] == 0:
-					if status['processed_count'] >= status['done_count']:
-						break
+				# wakes up as soon as a worker sends an event instead of sleeping for the whole sleep_time
+				self._events_arrived.wait(timeout=self._sleep_time)
+				# counted from the events rather than the queue, a task taken by a worker that has not said so yet is
+				# neither in the queue nor being done
+				self._receive_events()
+				if self._unfinished_count == 0:
+					break
 
 		except KeyboardInterrupt:
 			return 0
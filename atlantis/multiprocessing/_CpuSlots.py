@@ -0,0 +1,191 @@
+from contextlib import contextmanager
+import os
+from time import monotonic, sleep
+
+from ._WorkerContext import get_worker_context
+
+try:
+	from threadpoolctl import threadpool_limits
+except ImportError:
+	threadpool_limits = None
+
+
+# read by OpenMP, MKL, OpenBLAS, BLIS, Accelerate and numexpr when they start their threads
+THREAD_ENVIRONMENT_VARIABLES = (
+	'OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'BLIS_NUM_THREADS', 'VECLIB_MAXIMUM_THREADS',
+	'NUMEXPR_NUM_THREADS'
+)
+
+# the cpus the current process is limited to, so that the limits are not set again for every task
+_PINNED_CPU_IDS = None
+
+
+def get_available_cpu_ids():
+	"""
+	:rtype: list[int]
+	"""
+	if hasattr(os, 'sched_getaffinity'):
+		return sorted(os.sched_getaffinity(0))
+	return list(range(os.cpu_count() or 1))
+
+
+def pin_threads(cpu_ids):
+	"""
+	limits the threads of BLAS, OpenMP, etc. in the current process to the number of cpus and pins it to them;
+	the environment variables reach the libraries that start their threads later, threadpoolctl the ones already loaded,
+	and joblib reads the affinity, so estimators with n_jobs=-1 use only these cpus
+	:type cpu_ids: list[int]
+	"""
+	global _PINNED_CPU_IDS
+	if cpu_ids == _PINNED_CPU_IDS:
+		return
+	thread_count = len(cpu_ids)
+	for name in THREAD_ENVIRONMENT_VARIABLES:
+		os.environ[name] = str(thread_count)
+	if threadpool_limits is not None:
+		threadpool_limits(limits=thread_count)
+	if hasattr(os, 'sched_setaffinity'):
+		os.sched_setaffinity(0, cpu_ids)
+	_PINNED_CPU_IDS = list(cpu_ids)
+
+
+class CpuSlots:
+	# seconds between two tries of a worker that waits for slots
+	POLL_INTERVAL = 0.01
+
+	def __init__(self, cpu_ids=None, context=None):
+		"""
+		one slot per cpu, shared by the workers of processors and controllers across processes:
+		a worker takes the slots a task needs before doing it, and gives them back after,
+		so that workers never run more threads than there are cpus
+		:type cpu_ids: list[int] or NoneType
+		:param cpu_ids: the cpus that are shared, the ones the current process can use if None
+
+		:type context: multiprocess.context.BaseContext or NoneType
+		:param context: the multiprocess context of the worker context of the session if None
+		"""
+		self._cpu_ids = list(cpu_ids or get_available_cpu_ids())
+		context = context or get_worker_context().context
+		# the lock is only held to read and change the slots, never while waiting for them,
+		# so a process that is killed while it waits does not block the others
+		self._state_lock = context.Lock()
+		# pid of the process that holds each slot, 0 for a free slot, guarded by _state_lock,
+		# so that the slots of a process that dies can be given back, see release_process
+		self._taken = context.Array('i', len(self._cpu_ids), lock=False)
+		self._used = context.Value('i', 0, lock=False)
+
+	def __repr__(self):
+		return f'CpuSlots: {self.used} / {self.count} used'
+
+	@property
+	def count(self):
+		return len(self._cpu_ids)
+
+	@property
+	def used(self):
+		return self._used.value
+
+	def get_slot_count(self, cpu_count):
+		"""
+		the number of slots a task with cpu_count needs, negative counts are read like n_jobs of joblib
+		:type cpu_count: int or NoneType
+		:rtype: int
+		"""
+		if cpu_count is None:
+			return 1
+		if cpu_count < 0:
+			cpu_count = self.count + 1 + cpu_count
+		return min(max(cpu_count, 1), self.count)
+
+	def acquire(self, cpu_count=1, timeout=None):
+		"""
+		waits for free slots, all the slots a task needs are taken at once
+		so two workers that need several cannot hold part of them each and wait forever
+		:type cpu_count: int or NoneType
+		:type timeout: float or NoneType
+		:rtype: list[int] or NoneType
+		:return: ids of the cpus of the slots, None if they were not free before the timeout
+		"""
+		slot_count = self.get_slot_count(cpu_count=cpu_count)
+		deadline = None if timeout is None else monotonic() + timeout
+		while True:
+			indices = self._take(slot_count=slot_count)
+			if indices is not None:
+				return [self._cpu_ids[index] for index in indices]
+			if deadline is None:
+				sleep(self.POLL_INTERVAL)
+			elif monotonic() < deadline:
+				sleep(min(self.POLL_INTERVAL, max(deadline - monotonic(), 0)))
+			else:
+				return None
+
+	def _take(self, slot_count):
+		"""
+		takes slot_count free slots for the current process if there are that many
+		:type slot_count: int
+		:rtype: list[int] or NoneType
+		"""
+		with self._state_lock:
+			indices = [index for index in range(self.count) if self._taken[index] == 0][:slot_count]
+			if len(indices) < slot_count:
+				return None
+			pid = os.getpid()
+			for index in indices:
+				self._taken[index] = pid
+			self._used.value += slot_count
+		return indices
+
+	def _free(self, indices):
+		# called with _state_lock held, so a process that is killed here cannot leave a slot free but uncounted
+		for index in indices:
+			self._taken[index] = 0
+		self._used.value -= len(indices)
+
+	def release(self, cpu_ids):
+		"""
+		gives back slots the current process holds
+		:type cpu_ids: list[int]
+		"""
+		pid = os.getpid()
+		with self._state_lock:
+			# slots the process no longer holds are skipped, e.g. after they were given back by release_process
+			self._free(indices=[index for index in map(self._cpu_ids.index, cpu_ids) if self._taken[index] == pid])
+
+	def release_process(self, pid):
+		"""
+		gives back the slots of a process that died or was killed before it released them
+		:type pid: int
+		:rtype: list[int]
+		:return: ids of the cpus of the slots that were given back
+		"""
+		with self._state_lock:
+			indices = [index for index in range(self.count) if self._taken[index] == pid]
+			self._free(indices=indices)
+		return [self._cpu_ids[index] for index in indices]
+
+	@contextmanager
+	def use(self, cpu_count=1):
+		"""
+		takes slots and pins the threads of the current process to their cpus until the block ends
+		:type cpu_count: int or NoneType
+		"""
+		cpu_ids = self.acquire(cpu_count=cpu_count)
+		try:
+			pin_threads(cpu_ids=cpu_ids)
+			yield cpu_ids
+		finally:
+			self.release(cpu_ids=cpu_ids)
+
+
+_CPU_SLOTS = None
+
+
+def get_cpu_slots():
+	"""
+	the cpu slots of the session, shared by processors and process controllers that do not get their own
+	:rtype: CpuSlots
+	"""
+	global _CPU_SLOTS
+	if _CPU_SLOTS is None:
+		_CPU_SLOTS = CpuSlots()
+	return _CPU_SLOTS
@@ -0,0 +1,148 @@
+import multiprocess
+import atexit
+from threading import Lock
+
+
+# imported once by the fork server, with the forkserver start method, so that every worker starts with them already imported
+DEFAULT_PRELOAD = ('numpy', 'pandas', 'sklearn', 'atlantis.ds.parallel_computing._worker')
+
+
+class WorkerContext:
+	def __init__(self, preload=DEFAULT_PRELOAD, start_method=None):
+		"""
+		keeps one manager process, and a warm fork server if asked for, for all the processors and controllers of a session;
+		processors share the manager instead of starting one each, and with the forkserver start method
+		workers are forked from the fork server, which has imported the preload modules once,
+		so they do not import pandas, sklearn, etc. again;
+		it is not a pool of workers: each processor or controller starts and ends its own workers,
+		attach and detach only count the owners so that the settings do not change while workers are running
+
+		:type preload: list[str] or tuple[str]
+		:param preload: modules the fork server imports, modules that cannot be imported are skipped
+
+		:type start_method: str or NoneType
+		:param start_method: 	the default start method of multiprocess if None or if it is not available;
+								forkserver and spawn start workers in a new interpreter that imports the main module,
+								so a script that uses them should start its processors under if __name__ == '__main__'
+		"""
+		if start_method not in multiprocess.get_all_start_methods():
+			start_method = None
+		self._start_method = start_method
+		self._context = multiprocess.get_context(start_method)
+		self._preload = list(preload)
+		if start_method == 'forkserver':
+			self._context.set_forkserver_preload(self._preload)
+		self._manager = None
+		self._owners = set()
+		self._lock = Lock()
+
+	def __repr__(self):
+		return f'WorkerContext: {self._start_method or "default"} ({len(self._owners)} attached)'
+
+	@property
+	def context(self):
+		"""
+		the multiprocess context that workers, queues, and locks should be made with
+		"""
+		return self._context
+
+	@property
+	def start_method(self):
+		return self._start_method
+
+	@property
+	def preload(self):
+		return self._preload
+
+	@property
+	def manager(self):
+		"""
+		:rtype: multiprocess.managers.SyncManager
+		"""
+		with self._lock:
+			if self._manager is None:
+				self._manager = self._context.Manager()
+			return self._manager
+
+	@property
+	def owner_count(self):
+		return len(self._owners)
+
+	def warm_up(self):
+		"""
+		starts the fork server and the manager now instead of when the first worker is added
+		:rtype: WorkerContext
+		"""
+		if self._start_method == 'forkserver':
+			from multiprocess import forkserver
+			forkserver.ensure_running()
+		_ = self.manager
+		return self
+
+	def attach(self, owner):
+		"""
+		:param owner: a Processor, ProcessController, or anything that starts workers with the context
+		:rtype: WorkerContext
+		"""
+		self._owners.add(id(owner))
+		return self
+
+	def detach(self, owner):
+		"""
+		the fork server and the manager stay up for the next owner, see shutdown
+		"""
+		self._owners.discard(id(owner))
+
+	def Process(self, target, kwargs=None):
+		"""
+		:rtype: multiprocess.Process
+		"""
+		return self._context.Process(target=target, kwargs=kwargs or {})
+
+	def shutdown(self):
+		"""
+		stops the manager, the next owner starts a new one
+		"""
+		with self._lock:
+			if self._manager is not None:
+				self._manager.shutdown()
+				self._manager = None
+
+
+_WORKER_CONTEXT = None
+
+
+def configure_worker_context(preload=DEFAULT_PRELOAD, start_method=None):
+	"""
+	replaces the worker context of the session, e.g. configure_worker_context(start_method='forkserver') for a warm fork server;
+	the fork server keeps the preload modules it was started with, so this should be called before the first worker is added
+	:type preload: list[str] or tuple[str]
+	:type start_method: str or NoneType
+	:rtype: WorkerContext
+	"""
+	global _WORKER_CONTEXT
+	if _WORKER_CONTEXT is not None:
+		if _WORKER_CONTEXT.owner_count > 0:
+			raise RuntimeError('the worker context cannot change while processors or controllers are attached to it')
+		_WORKER_CONTEXT.shutdown()
+	_WORKER_CONTEXT = WorkerContext(preload=preload, start_method=start_method)
+	return _WORKER_CONTEXT
+
+
+def get_worker_context():
+	"""
+	the worker context of the session, it is made with the default settings when it is first needed
+	:rtype: WorkerContext
+	"""
+	if _WORKER_CONTEXT is None:
+		configure_worker_context()
+	return _WORKER_CONTEXT
+
+
+def _shut_down_worker_context():
+	if _WORKER_CONTEXT is not None:
+		_WORKER_CONTEXT.shutdown()
+
+
+# registered before any processor so that processors terminate their workers first
+atexit.register(_shut_down_worker_context)
@@ -2,3 +2,5 @@ from .SimpleController import SimpleController
 from .ProcessController import ProcessController
 from .JobController import JobController
 from .Controller import Controller
+from ._WorkerContext import WorkerContext, get_worker_context, configure_worker_context
+from ._CpuSlots import CpuSlots, get_cpu_slots
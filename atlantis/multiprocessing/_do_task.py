@@ -1,26 +1,38 @@
-from time import sleep
+import queue
 from ._WorkerReport import WorkerReport
+from ._CpuSlots import pin_threads
 
 
 def do_task(
-		to_do_queue, done_queue, workers_doing, tasks_status, keep_workers_alive,
-		worker_reports, worker_id,
-		cpu_usage, max_cpu_count,
+		to_do_queue, events, queued_count, keep_workers_alive, worker_id,
+		cpu_slots,
 		empty_count_limit, max_sleep_time,
 		sleep_time=0.1, echo=0
 ):
 	"""
 	:type to_do_queue: multiprocessing.Queue[Task]
-	:type done_queue: multiprocessing.Queue[Outcome]
-	:type workers_doing: dict
-	:type tasks_status: dict
+
+	:type events: multiprocessing.SimpleQueue
+	:param events: 	the worker writes to the pipe of the controller directly:
+						('started', worker_id, task_id)
+						('outcome', worker_id, Outcome or TaskException)
+						('report', worker_id, WorkerReport) when the worker ends
+
+	:type queued_count: multiprocessing.Value
+	:param queued_count: number of tasks in the to-do queue, in shared memory
+
 	:type keep_workers_alive: multiprocessing.Value
-	:type worker_reports: dict
 	:type worker_id: str or int
-	:type cpu_usage: multiprocessing.Value
-	:type max_cpu_count: int
+	:type cpu_slots: CpuSlots
+	:param cpu_slots: the worker takes the slots of a task before doing it, so it waits while the cpus are busy
+
 	:type empty_count_limit: int
+	:param empty_count_limit: the worker ends after waiting this many times for max_sleep_time on an empty queue
+
 	:type max_sleep_time: float
+	:param max_sleep_time: 	seconds the worker waits for a task before it checks if it should stay alive,
+							it wakes up as soon as a task is put in the queue
+
 	:type sleep_time: float
 	:type echo: bool or int
 	:rtype:
@@ -33,46 +45,40 @@ def do_task(
 			print(x)
 
 	empty_count = 0
-	# sleep(sleep_time)
-	while max_cpu_count > cpu_usage.value:
+	while True:
 		try:
 			print_if_echo(f'{worker_id} getting task')
-			task = to_do_queue.get_nowait()
+			task = to_do_queue.get(timeout=max_sleep_time)
 			empty_count = 0
-		except Exception:
+		except queue.Empty:
 			print_if_echo(f'{worker_id} queue empty')
 			empty_count += 1
 			if keep_workers_alive.value == 0:
 				break
 			if empty_count_limit is not None and empty_count >= empty_count_limit:
 				break
-			else:
-				sleep(min(sleep_time * 2 ** empty_count, max_sleep_time))
 		else:
+			with queued_count.get_lock():
+				queued_count.value -= 1
 			print_if_echo(f'{worker_id} got task {task.id}')
+			cpu_ids = cpu_slots.acquire(cpu_count=task.cpu_count)
+			try:
+				pin_threads(cpu_ids=cpu_ids)
+				events.put(('started', worker_id, task.id))
 
-			tasks_status[task.id] = 'started'
-			workers_doing[worker_id] = task.id
-
-			print_if_echo(f'{worker_id} doing task {task.id}')
-			cpu_usage.value += task.cpu_count
-			outcome = task.do(worker_id=worker_id)
-			cpu_usage.value -= task.cpu_count
-			print_if_echo(f'{worker_id} did task {task.id}')
-
-			report.add_task_id(task_id=task.id)
-
-			print_if_echo(f'{worker_id} putting result of {task.id}')
-			done_queue.put(outcome)
+				print_if_echo(f'{worker_id} doing task {task.id}')
+				outcome = task.do(worker_id=worker_id)
+				print_if_echo(f'{worker_id} did task {task.id}')
 
-			workers_doing[worker_id] = None
-			tasks_status[task.id] = 'done'
+				report.add_task_id(task_id=task.id)
 
-			print_if_echo(f'{worker_id} waiting')
-			sleep(sleep_time)
+				print_if_echo(f'{worker_id} putting result of {task.id}')
+				events.put(('outcome', worker_id, outcome))
+			finally:
+				cpu_slots.release(cpu_ids=cpu_ids)
 
 	print_if_echo(f'{worker_id} out of the loop')
 	report.end()
 	print_if_echo(f'{worker_id} putting report')
-	worker_reports[worker_id] = report
+	events.put(('report', worker_id, report))
 	return True
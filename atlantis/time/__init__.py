@@ -15,4 +15,9 @@ from .time import convert, get_elapsed, get_elapsed_months, get_elapsed_years
 from .time import Timer
 from .time import MeasurementSet
 from .time import measure
-from .estimate import Estimator
+from .._lazy import get_lazy_attributes
+
+# Estimator imports sklearn, it is imported when it is first used
+__getattr__, __dir__ = get_lazy_attributes(
+	package_name=__name__, package_globals=globals(), members={'Estimator': '.estimate'}
+)
@@ -0,0 +1,65 @@
+import subprocess
+import sys
+
+from ..exceptions import ImportTimeError
+
+
+# seconds, a cold import in a new interpreter should stay under these
+DEFAULT_BUDGETS = {
+	'atlantis': 0.2,
+	'atlantis.time': 1.0,
+}
+
+
+def measure_import_time(module_name, repeat=3):
+	"""
+	imports a module in a new interpreter, so that nothing is imported before, and measures how long it takes
+	:type module_name: str
+	:type repeat: int
+	:param repeat: the import is measured this many times and the fastest is kept to ignore noise
+	:rtype: float
+	:return: seconds
+	"""
+	code = (
+		'from time import perf_counter\n'
+		'start = perf_counter()\n'
+		f'import {module_name}\n'
+		'print(perf_counter() - start)\n'
+	)
+	times = []
+	for i in range(repeat):
+		output = subprocess.run(
+			[sys.executable, '-c', code], capture_output=True, text=True, check=True
+		).stdout
+		times.append(float(output.strip().splitlines()[-1]))
+	return min(times)
+
+
+def check_import_times(budgets=None, repeat=3, echo=True):
+	"""
+	raises ImportTimeError if importing any of the modules takes longer than its budget
+	:type budgets: dict[str, float] or NoneType
+	:param budgets: key: module name, value: seconds, DEFAULT_BUDGETS if None
+	:type repeat: int
+	:type echo: bool
+	:rtype: dict[str, float]
+	:return: the import time of each module in seconds
+	"""
+	budgets = DEFAULT_BUDGETS if budgets is None else budgets
+	result = {}
+	over_budget = []
+	for module_name, budget in budgets.items():
+		seconds = measure_import_time(module_name=module_name, repeat=repeat)
+		result[module_name] = seconds
+		if echo:
+			print(f'import {module_name}: {seconds:.3f}s (budget: {budget}s)')
+		if seconds > budget:
+			over_budget.append(f'{module_name} took {seconds:.3f}s, the budget is {budget}s')
+
+	if len(over_budget) > 0:
+		raise ImportTimeError('imports over budget: ' + '; '.join(over_budget))
+	return result
+
+
+if __name__ == '__main__':
+	check_import_times()
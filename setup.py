@@ -16,9 +16,11 @@ setup(
 	author='Idin',
 	author_email='py@idin.ca',
 	license='MIT',
-	packages=find_packages(exclude=("jupyter", ".idea", ".git", "data_files")),
+	packages=find_packages(exclude=("jupyter", ".idea", ".git", "data_files", "tests")),
 	install_requires=['base32hex', 'geopy', 'pandas', 'joblib', 'numpy', 'sklearn', 'multiprocess'],
+	extras_require={'result_store': ['pyarrow'], 'thread_limits': ['threadpoolctl'], 'tests': ['pytest']},
+	entry_points={'console_scripts': ['atlantis-worker=atlantis.ds.parallel_computing._remote_worker:main']},
 	package_data={'atlantis': ['data_files/*.pickle']},
-	python_requires='~=3.6',
+	python_requires='>=3.9',
 	zip_safe=False
 )
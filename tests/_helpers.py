@@ -0,0 +1,54 @@
+import time
+from sklearn.linear_model import Lasso
+
+
+class SleepyLasso(Lasso):
+	"""
+	a Lasso that sleeps before it is fitted, to make tasks that time out or run for long
+	"""
+	def __init__(self, alpha=1.0, sleep_seconds=0.0):
+		super().__init__(alpha=alpha)
+		self.sleep_seconds = sleep_seconds
+
+	def fit(self, X, y, *args, **kwargs):
+		time.sleep(self.sleep_seconds)
+		return super().fit(X, y, *args, **kwargs)
+
+
+def make_data(num_rows=300, num_x_columns=4):
+	from atlantis.ds.synthetic_data import create_data
+	data = create_data(num_rows=num_rows, num_x_columns=num_x_columns, noise=1)
+	return data.drop(columns=[column for column in data.columns if data[column].dtype == object])
+
+
+def wait_for_tasks(processor, time_limit=60):
+	"""
+	receives events until no task is pending
+	:type processor: atlantis.ds.parallel_computing.Processor
+	"""
+	start = time.time()
+	while processor.count_to_do() > 0:
+		if time.time() - start > time_limit:
+			raise TimeoutError(f'{processor.count_to_do()} tasks are still pending after {time_limit} seconds')
+		processor.receive_events()
+		time.sleep(0.05)
+
+
+class FailingLasso(Lasso):
+	"""
+	a Lasso that cannot be fitted
+	"""
+	def fit(self, X, y, *args, **kwargs):
+		raise ValueError('this estimator always fails')
+
+
+def process_until_done(processor, time_limit=60):
+	"""
+	processes done tasks, errors included, until no task is pending, also the ones produced by processing
+	:type processor: atlantis.ds.parallel_computing.Processor
+	"""
+	wait_for_tasks(processor=processor, time_limit=time_limit)
+	processor.process_done_tasks(ignore_errors=True, echo=False)
+	while processor.count_to_do() > 0:
+		wait_for_tasks(processor=processor, time_limit=time_limit)
+		processor.process_done_tasks(ignore_errors=True, echo=False)
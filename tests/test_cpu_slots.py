@@ -0,0 +1,92 @@
+import os
+import signal
+import time
+
+import multiprocess
+
+from atlantis.multiprocessing import CpuSlots, ProcessController
+
+
+def _hold_slots(cpu_slots, cpu_count, started):
+	cpu_slots.acquire(cpu_count=cpu_count)
+	started.set()
+	time.sleep(60)
+
+
+def _wait_for_slots(cpu_slots, started):
+	started.set()
+	cpu_slots.acquire(cpu_count=1)
+
+
+def _start(target, *args):
+	context = multiprocess.get_context('fork')
+	started = context.Event()
+	process = context.Process(target=target, args=args + (started,), daemon=True)
+	process.start()
+	assert started.wait(timeout=10)
+	return process
+
+
+def _kill(process, signal_number=signal.SIGKILL):
+	os.kill(process.pid, signal_number)
+	process.join(timeout=10)
+
+
+def test_slots_are_taken_all_at_once():
+	cpu_slots = CpuSlots(cpu_ids=[0, 1])
+	first = cpu_slots.acquire(cpu_count=1)
+	assert cpu_slots.acquire(cpu_count=2, timeout=0.1) is None
+	# a failed try holds no slot
+	assert cpu_slots.used == 1
+	second = cpu_slots.acquire(cpu_count=1, timeout=0.1)
+	assert sorted(first + second) == [0, 1]
+	cpu_slots.release(cpu_ids=first)
+	cpu_slots.release(cpu_ids=second)
+	assert cpu_slots.used == 0
+
+
+def test_slots_of_a_killed_process_are_given_back():
+	cpu_slots = CpuSlots(cpu_ids=[0, 1], context=multiprocess.get_context('fork'))
+	holder = _start(_hold_slots, cpu_slots, 2)
+	assert cpu_slots.used == 2
+	_kill(holder)
+	assert cpu_slots.release_process(pid=holder.pid) == [0, 1]
+	assert cpu_slots.acquire(cpu_count=2, timeout=1) == [0, 1]
+
+
+def test_killing_a_process_while_it_waits_does_not_block_the_others():
+	cpu_slots = CpuSlots(cpu_ids=[0], context=multiprocess.get_context('fork'))
+	cpu_ids = cpu_slots.acquire(cpu_count=1)
+	for signal_number in (signal.SIGKILL, signal.SIGTERM):
+		waiter = _start(_wait_for_slots, cpu_slots)
+		time.sleep(0.2)
+		_kill(waiter, signal_number=signal_number)
+		assert waiter.exitcode == -signal_number
+		assert cpu_slots.release_process(pid=waiter.pid) == []
+
+	cpu_slots.release(cpu_ids=cpu_ids)
+	assert cpu_slots.acquire(cpu_count=1, timeout=1) == [0]
+
+
+def _square(x):
+	return x * x
+
+
+def test_a_terminated_controller_does_not_block_the_next_one():
+	cpu_slots = CpuSlots(cpu_ids=[0])
+	cpu_ids = cpu_slots.acquire(cpu_count=1)
+	controller = ProcessController(max_cpu_count=1, cpu_slots=cpu_slots)
+	controller.add_task(_square, args=(2, ))
+	controller.add_worker()
+	# the worker waits for the slot the test holds until it is terminated
+	time.sleep(0.5)
+	assert controller.terminate() == 1
+	cpu_slots.release(cpu_ids=cpu_ids)
+
+	controller = ProcessController(max_cpu_count=1, cpu_slots=cpu_slots)
+	for x in range(3):
+		controller.add_task(_square, args=(x, ))
+	controller.do(echo=0)
+	controller.terminate()
+	assert sorted(outcome.result for outcome in controller.processed.values()) == [0, 1, 4]
+	assert cpu_slots.used == 0
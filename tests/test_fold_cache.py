@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from pandas import DataFrame
+from sklearn.linear_model import Lasso
+
+from atlantis.ds.validation import CrossValidation, EstimatorRepository
+from atlantis.ds.parallel_computing import Processor
+from atlantis.ds.parallel_computing.learning._FoldCache import FoldArrays
+
+from ._helpers import make_data, wait_for_tasks
+
+
+class FrameLasso(Lasso):
+	"""
+	a Lasso that only accepts data frames, like estimators that need the names of the columns
+	"""
+	def fit(self, X, y, *args, **kwargs):
+		if not isinstance(X, DataFrame):
+			raise TypeError(f'X is of type {type(X)}')
+		return super().fit(X, y, *args, **kwargs)
+
+	def predict(self, X):
+		if list(X.columns) != list(self.feature_names_in_):
+			raise ValueError(f'{list(X.columns)} are not the columns the estimator was fitted on')
+		return super().predict(X)
+
+
+def test_fold_arrays_keep_the_names_of_the_columns():
+	fold_arrays = FoldArrays(
+		training_x=np.arange(6, dtype=float).reshape(3, 2), training_y=np.arange(3, dtype=float),
+		test_x=np.arange(4, dtype=float).reshape(2, 2), test_y=np.arange(2, dtype=float),
+		test_not_null=np.ones(2, dtype=bool), x_columns=['a', 'b']
+	)
+	training_x = fold_arrays.get_training_x()
+	assert list(training_x.columns) == ['a', 'b']
+	assert np.shares_memory(training_x.to_numpy(), fold_arrays.training_x)
+	assert list(fold_arrays.get_test_x().columns) == ['a', 'b']
+
+
+@pytest.mark.parametrize('group_estimator_families', [False, True])
+def test_estimators_are_fitted_on_data_frames(group_estimator_families):
+	processor = Processor()
+	try:
+		repository = EstimatorRepository()
+		repository.append(FrameLasso, {'alpha': [0.1, 1.0]})
+		project = processor.create_cross_validation_project(
+			name='frames', y_column='y', problem_type='regression', group_estimator_families=group_estimator_families
+		)
+		project.add_estimator_repository(repository=repository)
+		project.add_validation(data=make_data(), validation=CrossValidation(num_splits=2), random_state=42)
+		processor.add_workers(num_workers=1)
+		project.send_to_do(num_tasks=100, echo=False)
+		wait_for_tasks(processor=processor)
+		processor.process_done_tasks(echo=False)
+		assert set(processor.task_table['status']) == {'done'}
+	finally:
+		processor.terminate(echo=False)
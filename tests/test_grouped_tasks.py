@@ -0,0 +1,54 @@
+import pytest
+from sklearn.linear_model import Lasso
+
+from atlantis.ds.validation import CrossValidation, EstimatorRepository
+from atlantis.ds.parallel_computing import Processor
+
+from ._helpers import make_data, wait_for_tasks
+
+
+@pytest.fixture
+def processor():
+	processor = Processor()
+	yield processor
+	processor.terminate(echo=False)
+
+
+def _create_project(processor, alphas):
+	repository = EstimatorRepository()
+	repository.append(Lasso, {'alpha': alphas})
+	project = processor.create_cross_validation_project(
+		name='grouped', y_column='y', problem_type='regression', group_estimator_families=True
+	)
+	project.add_estimator_repository(repository=repository)
+	project.add_validation(data=make_data(), validation=CrossValidation(num_splits=2), random_state=42)
+	processor.add_workers(num_workers=1)
+	project.send_to_do(num_tasks=100, echo=False)
+	wait_for_tasks(processor=processor)
+	return project
+
+
+def test_members_are_timed_separately(processor):
+	project = _create_project(processor=processor, alphas=[1.0, 0.1, 0.01])
+	processor.process_done_tasks(echo=False)
+
+	for training_test_id, members in processor.task_table.groupby('training_test_id'):
+		# the path of lasso goes from the largest alpha down
+		members = members.sort_values('estimator_id')
+		assert members['starting_time'].is_unique
+		for previous, current in zip(members.iloc[:-1].itertuples(), members.iloc[1:].itertuples()):
+			assert current.starting_time >= previous.ending_time
+	# the estimator gets a time estimate from its grouped members
+	assert 'Lasso' in project.time_estimates
+	assert 'Lasso_group' in project.time_estimates
+
+
+def test_members_done_before_an_error_keep_their_scores(processor):
+	# a negative alpha is invalid, it is the last step of the path
+	project = _create_project(processor=processor, alphas=[1.0, 0.1, -1.0])
+	processor.process_done_tasks(ignore_errors=True, echo=False)
+
+	scoreboard = project.scoreboard
+	assert scoreboard.get_score_count(estimator_name='Lasso', estimator_id='Lasso_1') == 2
+	assert scoreboard.get_score_count(estimator_name='Lasso', estimator_id='Lasso_2') == 2
+	assert scoreboard.get_score_count(estimator_name='Lasso', estimator_id='Lasso_3') == 0
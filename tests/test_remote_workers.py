@@ -0,0 +1,82 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+from atlantis.ds.validation import CrossValidation, EstimatorRepository
+from atlantis.ds.parallel_computing import Processor
+from atlantis.ds.parallel_computing._Coordinator import Coordinator
+
+from ._helpers import SleepyLasso, make_data, wait_for_tasks
+
+
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def processor():
+	processor = Processor()
+	yield processor
+	processor.terminate(echo=False)
+
+
+def _start_remote_worker(processor, host, port):
+	python_path = os.pathsep.join([REPOSITORY_DIRECTORY] + [path for path in sys.path if path != ''])
+	return subprocess.Popen(
+		[
+			sys.executable, '-m', 'atlantis.ds.parallel_computing._remote_worker', '--connect', f'{host}:{port}',
+			'--authkey', processor.authkey, '--workers', '1', '--heartbeat-interval', '0.5'
+		],
+		start_new_session=True, env={**os.environ, 'PYTHONPATH': python_path}
+	)
+
+
+def test_heartbeats_of_lost_workers_are_ignored(processor):
+	coordinator = Coordinator(processor=processor)
+	coordinator.heartbeat(worker_id='unknown')
+	assert 'unknown' not in processor._remote_last_seen
+
+	worker_id = coordinator.register_worker(host='elsewhere')
+	processor._handle_lost_remote_worker(worker_id=worker_id)
+	coordinator.heartbeat(worker_id=worker_id)
+	assert worker_id not in processor._remote_last_seen
+	assert not coordinator.should_proceed(worker_id=worker_id)
+	assert processor.worker_status_table.set_index('id').loc[worker_id, 'status'] == 'crashed'
+
+
+def test_remote_workers_are_stopped_on_timeouts(processor):
+	repository = EstimatorRepository()
+	repository.append(SleepyLasso, {'sleep_seconds': [30]})
+	processor.set_timeout(2, estimator_class=SleepyLasso)
+	host, port = processor.serve(host='127.0.0.1', port=0, heartbeat_timeout=10, echo=False)
+	project = processor.create_cross_validation_project(name='remote', y_column='y', problem_type='regression')
+	project.add_estimator_repository(repository=repository)
+	project.add_validation(data=make_data(), validation=CrossValidation(num_splits=2), random_state=42)
+	project.send_to_do(num_tasks=100, echo=False)
+
+	remote = _start_remote_worker(processor=processor, host=host, port=port)
+	try:
+		start = time.time()
+		while len(processor._started) == 0:
+			assert time.time() - start < 60, 'the remote worker did not start a task'
+			processor.receive_events()
+			time.sleep(0.1)
+		remote_worker_id = next(iter(processor._started))
+		assert remote_worker_id in processor.remote_workers
+		# the task the remote worker did not get is done by a local worker
+		processor.add_workers(num_workers=1)
+
+		wait_for_tasks(processor=processor)
+		processor.process_done_tasks(echo=False)
+		task_table = processor.task_table
+		assert set(task_table['status']) == {'timeout'}
+		assert remote_worker_id in set(task_table['worker_id'])
+		worker_status = processor.worker_status_table.set_index('id')
+		assert worker_status.loc[remote_worker_id, 'status'] == 'killed'
+		assert not processor._proceed_worker[remote_worker_id]
+	finally:
+		os.killpg(remote.pid, signal.SIGKILL)
+		remote.wait(timeout=10)
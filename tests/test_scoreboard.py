@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from atlantis.ds.validation._Scoreboard import Scoreboard
+
+
+def make_scoreboard(worst_score=None, training_test_ids=('a', 'b', 'c'), estimators=('good', 'slow')):
+	scoreboard = Scoreboard(main_metric='rmse', worst_score=worst_score)
+	for training_test_id in training_test_ids:
+		scoreboard.add_training_test_id(training_test_id=training_test_id)
+	for estimator_name in estimators:
+		scoreboard.add_estimator(estimator_name=estimator_name, estimator_id=1)
+	return scoreboard
+
+
+def test_training_test_ids_and_estimators_are_sets():
+	scoreboard = make_scoreboard()
+	assert scoreboard.training_test_ids == {'a', 'b', 'c'}
+	assert scoreboard.estimators | {('other', 1)} == {('good', 1), ('slow', 1), ('other', 1)}
+
+
+def test_timeouts_count_as_the_infinite_worst_score():
+	scoreboard = make_scoreboard()
+	for training_test_id, score in zip('abc', (2.0, 3.0, 4.0)):
+		scoreboard.add_score('good', 1, training_test_id, {'rmse': score})
+	# the slow estimator has one good fold and times out on the other two
+	scoreboard.add_score('slow', 1, 'a', {'rmse': 1.0})
+	scoreboard.add_timeout('slow', 1, 'b')
+	scoreboard.add_timeout('slow', 1, 'c')
+
+	assert scoreboard.get_mean_score('slow', 1) == np.inf
+	assert scoreboard.get_score_count('slow', 1) == 3
+	assert scoreboard.get_best_mean_score() == (('good', 1), 3.0)
+	assert scoreboard.mean_score_per_estimator['estimator_name'].tolist() == ['good', 'slow']
+	assert scoreboard.get_best_possible_score('slow', 1) == np.inf
+	assert not np.isnan(scoreboard.get_mean_score_per_training_test_array()).any()
+
+	measured_data = scoreboard.measured_data
+	assert measured_data.loc[('slow', 1), ('score', 'timeouts')] == 2
+	assert measured_data.loc[('slow', 1), ('score', 'count')] == 3
+	assert measured_data.loc[('good', 1), ('score', 'std')] == pytest.approx(1.0)
+
+
+def test_timeouts_stay_out_of_the_evaluations():
+	scoreboard = make_scoreboard()
+	scoreboard.add_score('good', 1, 'a', {'rmse': 2.0, 'mae': 1.0})
+	scoreboard.add_timeout('slow', 1, 'a')
+	evaluation_mean = scoreboard.evaluation_mean
+	assert evaluation_mean['estimator_name'].tolist() == ['good']
+	assert evaluation_mean['mae'].tolist() == [1.0]
+
+
+def test_timeouts_with_a_finite_worst_score():
+	scoreboard = make_scoreboard(worst_score=10.0)
+	scoreboard.add_score('good', 1, 'a', {'rmse': 2.0})
+	scoreboard.add_score('slow', 1, 'a', {'rmse': 1.0})
+	scoreboard.add_timeout('slow', 1, 'b')
+
+	assert scoreboard.get_mean_score('slow', 1) == pytest.approx(5.5)
+	assert scoreboard.get_mean_score_array()[1] == pytest.approx(5.5)
+	# (1 + 10 + best score of 0 for the unmeasured set) / 3
+	assert scoreboard.get_best_possible_score('slow', 1) == pytest.approx(11 / 3)
+	assert scoreboard.get_best_possible_score_array()[1] == pytest.approx(11 / 3)
+	assert scoreboard.get_mean_score_per_training_test('b') == pytest.approx(10.0)
+
+
+def test_a_timeout_cannot_overwrite_a_score():
+	scoreboard = make_scoreboard()
+	scoreboard.add_score('good', 1, 'a', {'rmse': 2.0})
+	with pytest.raises(RuntimeError):
+		scoreboard.add_timeout('good', 1, 'a')
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from atlantis.ds.validation import CrossValidation, EstimatorRepository
+from atlantis.ds.parallel_computing import Processor
+from sklearn.linear_model import Lasso
+
+from ._helpers import SleepyLasso, FailingLasso, make_data, process_until_done
+
+
+@pytest.fixture
+def processor():
+	processor = Processor()
+	yield processor
+	processor.terminate(echo=False)
+
+
+def test_rungs_complete_when_tasks_time_out_or_fail(processor):
+	repository = EstimatorRepository()
+	repository.append(Lasso, {'alpha': [0.01, 0.1, 1.0, 10.0]})
+	repository.append(SleepyLasso, {'sleep_seconds': [30]})
+	repository.append(FailingLasso, {'alpha': [0.1]})
+	processor.set_timeout(1, estimator_class=SleepyLasso)
+	project = processor.create_cross_validation_project(
+		name='halving', y_column='y', problem_type='regression',
+		successive_halving=True, min_training_fraction=1 / 3, halving_factor=3
+	)
+	project.add_estimator_repository(repository=repository)
+	project.add_validation(data=make_data(), validation=CrossValidation(num_splits=2), random_state=42)
+	processor.add_workers(num_workers=2)
+	project.send_to_do(num_tasks=100, echo=False)
+	process_until_done(processor=processor)
+
+	assert project.rung_fractions == [1 / 3, 1]
+	rung_scoreboard = project.scoreboard.get_rung_scoreboard(rung=0)
+	for estimator_name in ('SleepyLasso', 'FailingLasso'):
+		estimator_id = f'{estimator_name}_1'
+		assert rung_scoreboard.get_score_count(estimator_name=estimator_name, estimator_id=estimator_id) == 2
+		assert rung_scoreboard.get_mean_score(estimator_name=estimator_name, estimator_id=estimator_id) == np.inf
+
+	# 6 estimators on the first rung, the best 2 of them are promoted to the full training data;
+	# promotion is asynchronous, so the best of the first 3 that complete the rung can be promoted too
+	measured = project.scoreboard.measured_data
+	assert measured.shape[0] in (2, 3)
+	assert set(measured.index.get_level_values('estimator_name')) == {'Lasso'}
+	assert (measured[('score', 'count')] == 2).all()
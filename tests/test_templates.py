@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+
+import pytest
+from sklearn.linear_model import Lasso, Ridge
+
+from atlantis.ds.evaluation import evaluate_regression
+from atlantis.ds.validation import CrossValidation
+from atlantis.ds.parallel_computing import Processor
+from atlantis.ds.parallel_computing.learning import _TaskTemplate
+from atlantis.ds.parallel_computing.learning._TaskTemplate import TaskTemplate, get_task_from_to_do_item
+
+from ._helpers import make_data, wait_for_tasks
+
+
+def _make_template(estimators):
+	return TaskTemplate(
+		project_name='templates', y_column='y', x_columns=['x_1', 'x_2'], evaluation_function=evaluate_regression,
+		estimators=estimators
+	)
+
+
+def test_templates_with_the_same_content_have_the_same_fingerprint():
+	lasso = {('Lasso', 'Lasso_1'): {'class': Lasso, 'arguments': {'alpha': 0.1}}}
+	ridge = {('Lasso', 'Lasso_1'): {'class': Ridge, 'arguments': {'alpha': 0.1}}}
+	assert _make_template(estimators=lasso).fingerprint == _make_template(estimators=dict(lasso)).fingerprint
+	assert _make_template(estimators=lasso).fingerprint != _make_template(estimators=ridge).fingerprint
+	other_alpha = {('Lasso', 'Lasso_1'): {'class': Lasso, 'arguments': {'alpha': 1.0}}}
+	assert _make_template(estimators=lasso).fingerprint != _make_template(estimators=other_alpha).fingerprint
+
+
+def test_workers_keep_only_the_latest_template_of_a_project():
+	namespace = SimpleNamespace()
+	for alpha in (0.1, 1.0):
+		estimators = {('Lasso', 'Lasso_1'): {'class': Lasso, 'arguments': {'alpha': alpha}}}
+		setattr(namespace, f'template_{alpha}', _make_template(estimators=estimators))
+		task = get_task_from_to_do_item(namespace=namespace, item=(alpha, (('Lasso', 'Lasso_1'), ), 'fold_1', None, None))
+		assert task.estimator_arguments == {'alpha': alpha}
+		assert list(_TaskTemplate._TEMPLATES.keys()) == [alpha]
+	_TaskTemplate._TEMPLATES.clear()
+
+
+@pytest.fixture
+def processor():
+	processor = Processor()
+	yield processor
+	processor.terminate(echo=False)
+
+
+def _get_template_ids(processor):
+	return {name for name in processor.obj_directory if name.startswith('template_')}
+
+
+def test_templates_that_are_no_longer_used_are_removed(processor):
+	project = processor.create_cross_validation_project(name='templates', y_column='y', problem_type='regression')
+	project.add_validation(data=make_data(), validation=CrossValidation(num_splits=2), random_state=42)
+	processor.add_workers(num_workers=1)
+
+	template_ids = []
+	for number, alpha in enumerate((1.0, 0.1, 0.01), start=1):
+		project.add_estimator(estimator_class=Lasso, estimator_id=f'Lasso_{number}', estimator_arguments={'alpha': alpha})
+		project.send_to_do(num_tasks=100, echo=False)
+		wait_for_tasks(processor=processor)
+		processor.process_done_tasks(echo=False)
+		template_ids.append(_get_template_ids(processor=processor))
+
+	# only the template of the current estimators is left in the namespace
+	assert all(len(ids) == 1 for ids in template_ids)
+	assert len(set.union(*template_ids)) == 3
+	assert set(processor.task_table['status']) == {'done'}
+	assert len(processor.task_table) == 6
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from atlantis.ds.validation import CrossValidation, EstimatorRepository
+from atlantis.ds.parallel_computing import Processor
+from sklearn.linear_model import Lasso
+
+from ._helpers import SleepyLasso, make_data, wait_for_tasks
+
+
+@pytest.fixture
+def processor():
+	processor = Processor()
+	yield processor
+	processor.terminate(echo=False)
+
+
+def test_first_score_of_an_estimator_is_a_timeout(processor):
+	repository = EstimatorRepository()
+	repository.append(Lasso, {'alpha': [0.1]})
+	repository.append(SleepyLasso, {'sleep_seconds': [30]})
+	processor.set_timeout(1, estimator_class=SleepyLasso)
+	project = processor.create_cross_validation_project(name='timeouts', y_column='y', problem_type='regression')
+	project.add_estimator_repository(repository=repository)
+	project.add_validation(data=make_data(), validation=CrossValidation(num_splits=2), random_state=42)
+	processor.add_workers(num_workers=2)
+	project.send_to_do(num_tasks=10, echo=False)
+
+	wait_for_tasks(processor=processor)
+	processor.process_done_tasks(echo=False)
+
+	statuses = processor.task_table.groupby('estimator_name')['status'].agg(set).to_dict()
+	assert statuses == {'Lasso': {'done'}, 'SleepyLasso': {'timeout'}}
+	assert processor.count_done() == 4
+	scoreboard = project.scoreboard
+	assert scoreboard.get_mean_score('SleepyLasso', 'SleepyLasso_1') == np.inf
+	assert project.get_best_estimator()['name'] == 'Lasso'
+	# the killed workers were replaced
+	assert processor.get_worker_count() == 2
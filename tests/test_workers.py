@@ -0,0 +1,72 @@
+import os
+import signal
+import time
+
+import pytest
+
+from atlantis.ds.validation import CrossValidation, EstimatorRepository
+from atlantis.ds.parallel_computing import Processor
+
+from ._helpers import SleepyLasso, make_data, wait_for_tasks
+
+
+@pytest.fixture
+def processor():
+	processor = Processor()
+	yield processor
+	processor.terminate(echo=False)
+
+
+def _send_sleepy_tasks(processor, sleep_seconds, num_splits=2):
+	repository = EstimatorRepository()
+	repository.append(SleepyLasso, {'sleep_seconds': [sleep_seconds]})
+	project = processor.create_cross_validation_project(name='workers', y_column='y', problem_type='regression')
+	project.add_estimator_repository(repository=repository)
+	project.add_validation(data=make_data(), validation=CrossValidation(num_splits=num_splits), random_state=42)
+	project.send_to_do(num_tasks=100, echo=False)
+	return project
+
+
+def _wait_for_a_started_task(processor, time_limit=30):
+	"""
+	:rtype: str
+	:return: id of a worker that has started a task
+	"""
+	start = time.time()
+	while len(processor._started) == 0:
+		if time.time() - start > time_limit:
+			raise TimeoutError('no task started')
+		processor.receive_events()
+		time.sleep(0.05)
+	return next(iter(processor._started))
+
+
+def test_tasks_of_a_crashed_worker_are_requeued(processor):
+	processor.add_workers(num_workers=2)
+	project = _send_sleepy_tasks(processor=processor, sleep_seconds=1)
+	worker_id = _wait_for_a_started_task(processor=processor)
+	os.kill(processor._processes[worker_id].pid, signal.SIGKILL)
+
+	wait_for_tasks(processor=processor)
+	processor.process_done_tasks(echo=False)
+	worker_status = processor.worker_status_table.set_index('id')
+	assert worker_status.loc[worker_id, 'status'] == 'crashed'
+	assert worker_status.loc[worker_id, 'replaced_by'] is not None
+	assert project.scoreboard.get_score_count(estimator_name='SleepyLasso', estimator_id='SleepyLasso_1') == 2
+	assert processor.get_worker_count() == 2
+
+
+def test_terminating_a_worker_requeues_its_started_task(processor):
+	processor.set_timeout(3, estimator_class=SleepyLasso)
+	processor.add_workers(num_workers=2)
+	project = _send_sleepy_tasks(processor=processor, sleep_seconds=0.5)
+	worker_id = _wait_for_a_started_task(processor=processor)
+	processor.terminate(worker_id=worker_id, echo=False)
+	assert worker_id not in processor._started
+
+	# the terminated worker is not timed out later
+	time.sleep(3.5)
+	wait_for_tasks(processor=processor)
+	processor.process_done_tasks(echo=False)
+	assert set(processor.task_table['status']) == {'done'}
+	assert project.scoreboard.get_score_count(estimator_name='SleepyLasso', estimator_id='SleepyLasso_1') == 2